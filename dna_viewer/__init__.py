@@ -1,15 +1,31 @@
 from importlib import reload
+from importlib.util import find_spec
 from .config.character import BuildOptions
+from .config.dna import DataLayer, LoadOptions
 from .reader.dna import load_dna
-from .ui import dna_viewer_window
-reload(dna_viewer_window)
-from .ui.dna_viewer_window import show_dna_viewer_window
-from .util.assemble import assemble_rig
-from .util.mesh import (
-    build_meshes,
-    create_build_options,
-    get_mesh_index,
-    get_mesh_lods,
-    get_mesh_names,
-)
-from .util.mesh_helper import print_mesh_indices_containing_string, print_meshes
+from .util.baking import AnimationBaker
+from .util.behavior_graph import BehaviorGraph, IncrementalEvaluation
+from .util.cache import DNACache, purge_cache
+from .util.calibration import BatchCalibration, load_command_specs
+from .util.catalog import Catalog
+from .util.deformation import DeformationEngine
+from .util.reference import get_reference_stats, unload
+from .util.rig_logic_evaluator import RigLogicEvaluator
+
+# outside of Maya (e.g. plain Python batch tools) only the readers and utilities above are available
+MAYA_AVAILABLE = find_spec("maya") is not None
+
+if MAYA_AVAILABLE:
+    from .ui import dna_viewer_window
+    reload(dna_viewer_window)
+    from .ui.dna_viewer_window import show_dna_viewer_window
+    from .util.assemble import assemble_rig
+    from .util.mesh import (
+        build_meshes,
+        create_build_options,
+        get_mesh_index,
+        get_mesh_lods,
+        get_mesh_names,
+    )
+    from .util.mesh_helper import print_mesh_indices_containing_string, print_meshes
+    from .util.scene_sync import SceneChanges, SceneSnapshot, SceneSync
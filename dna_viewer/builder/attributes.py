@@ -0,0 +1,150 @@
+import logging
+import time
+from typing import List, Tuple
+
+from maya import cmds
+from maya.api.OpenMaya import (
+    MDGModifier,
+    MFnDependencyNode,
+    MFnNumericAttribute,
+    MFnNumericData,
+    MObject,
+    MSelectionList,
+    MTime,
+)
+from maya.api.OpenMayaAnim import MFnAnimCurve
+
+
+class AttributeBuilder:
+    """
+    A builder class used for adding many attributes and their starting key frames through a single MDGModifier,
+    instead of one cmds.addAttr or cmds.setKeyframe call per attribute
+
+    Attributes
+    ----------
+    @type dg_modifier: MDGModifier
+    @param dg_modifier: The modifier collecting all queued changes
+
+    @type key_frames: List[Tuple[str, float]]
+    @param key_frames: The node names whose keyable attributes get keyed, with the frame of the key
+
+    @type attribute_count: int
+    @param attribute_count: The number of attributes created
+
+    @type node_count: int
+    @param node_count: The number of animation curve nodes created
+
+    @type elapsed: float
+    @param elapsed: The time spent building in seconds
+    """
+
+    def __init__(self) -> None:
+        self.dg_modifier = MDGModifier()
+        self.key_frames: List[Tuple[str, float]] = []
+        self.attribute_count = 0
+        self.node_count = 0
+        self.elapsed = 0.0
+
+    @staticmethod
+    def get_node(node_name: str) -> MObject:
+        """
+        Gets the dependency node with the given name.
+
+        @type node_name: str
+        @param node_name: The name of the node
+
+        @rtype: MObject
+        @returns: The node
+        """
+
+        selection = MSelectionList()
+        selection.add(node_name)
+        return selection.getDependNode(0)
+
+    def add_float_attributes(
+        self,
+        node_name: str,
+        attribute_names: List[str],
+        min_value: float = 0.0,
+        max_value: float = 1.0,
+    ) -> None:
+        """
+        Queues keyable float attributes on a node, attributes the node already has are skipped.
+
+        @type node_name: str
+        @param node_name: The name of the node
+
+        @type attribute_names: List[str]
+        @param attribute_names: The long names of the attributes
+
+        @type min_value: float
+        @param min_value: The minimum value of the attributes
+
+        @type max_value: float
+        @param max_value: The maximum value of the attributes
+        """
+
+        start = time.perf_counter()
+        node = AttributeBuilder.get_node(node_name)
+        fn_node = MFnDependencyNode(node)
+        for attribute_name in attribute_names:
+            if fn_node.hasAttribute(attribute_name):
+                continue
+            fn_attribute = MFnNumericAttribute()
+            attribute = fn_attribute.create(
+                attribute_name, attribute_name, MFnNumericData.kFloat, 0.0
+            )
+            fn_attribute.setMin(min_value)
+            fn_attribute.setMax(max_value)
+            fn_attribute.keyable = True
+            self.dg_modifier.addAttribute(node, attribute)
+            self.attribute_count += 1
+        self.elapsed += time.perf_counter() - start
+
+    def add_key_frames(self, node_name: str, frame: float = 0.0) -> None:
+        """
+        Queues a linear key at the given frame for every keyable attribute of a node that is not driven yet,
+        like cmds.setKeyframe on the selected node does.
+
+        @type node_name: str
+        @param node_name: The name of the node
+
+        @type frame: float
+        @param frame: The frame of the keys
+        """
+
+        self.key_frames.append((node_name, frame))
+
+    def create_key_frames(self) -> None:
+        """Creates the animation curves of the queued key frames on the modifier"""
+
+        for node_name, frame in self.key_frames:
+            fn_node = MFnDependencyNode(AttributeBuilder.get_node(node_name))
+            key_time = MTime(frame, MTime.uiUnit())
+            for attribute_name in cmds.listAttr(node_name, keyable=True) or []:
+                plug = fn_node.findPlug(attribute_name, False)
+                if plug.isDestination:
+                    continue
+                fn_curve = MFnAnimCurve()
+                fn_curve.create(plug, modifier=self.dg_modifier)
+                fn_curve.addKey(
+                    key_time,
+                    plug.asDouble(),
+                    MFnAnimCurve.kTangentLinear,
+                    MFnAnimCurve.kTangentLinear,
+                )
+                self.node_count += 1
+        self.key_frames = []
+
+    def build(self) -> None:
+        """Creates the queued attributes, then the animation curves of the queued key frames, and logs the totals"""
+
+        start = time.perf_counter()
+        self.dg_modifier.doIt()
+        if self.key_frames:
+            self.create_key_frames()
+            self.dg_modifier.doIt()
+        self.elapsed += time.perf_counter() - start
+        logging.info(
+            f"created {self.attribute_count} attribute(s) and {self.node_count} animation curve node(s) in {self.elapsed:.3f}s"
+        )
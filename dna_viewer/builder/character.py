@@ -4,6 +4,7 @@ from typing import Dict, List, Optional
 from maya.api.OpenMaya import MObject
 
 from ..config.character import Character as CharacterConfig
+from ..const.space import FIXED_JOINT_NAME
 from ..model.dna import DNA
 from ..util.character_creator import CharacterCreator
 from ..util.error import DNAViewerError
@@ -65,8 +66,7 @@ class Character:
 
         creator.create_character_node()
         creator.add_joints_to_character()
-        joint_name = "spine_04"
-        Character.fix_joint_position(joint_name)
+        Character.fix_joint_position(FIXED_JOINT_NAME)
         creator.create_ctrl_attributes_on_joint()
         creator.create_animated_map_attributes()
         creator.add_key_frames()
@@ -75,6 +75,8 @@ class Character:
         creator.create_character_meshes()
 
         creator.add_gui()
+        # the control, animated map and root joint attributes, and the root joint keys, are created in one pass
+        creator.build_attributes()
         creator.add_analog_gui()
         creator.add_rig_logic_node()
         creator.run_additional_assembly_script()
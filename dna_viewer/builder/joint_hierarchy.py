@@ -0,0 +1,176 @@
+from typing import List, Sequence
+
+import numpy as np
+from maya.api.OpenMaya import (
+    MAngle,
+    MDagModifier,
+    MDGModifier,
+    MDistance,
+    MFnDependencyNode,
+    MObject,
+)
+
+from ..const.scene_sync import JOINT_ORIENT_ATTRIBUTE, TRANSLATE_ATTRIBUTE
+from ..model.joint import Joint as JointModel
+from ..util.error import DNAViewerError
+
+TRANSFORM_ATTRIBUTES = tuple(
+    f"{attribute}{axis}"
+    for attribute in (TRANSLATE_ATTRIBUTE, JOINT_ORIENT_ATTRIBUTE)
+    for axis in "XYZ"
+)
+
+
+class JointHierarchy:
+    """
+    A builder class used for adding all joints to the scene at once. The joints are created in topological order of
+    their parent indices through a single MDagModifier, then their translations and orients are set through a single
+    MDGModifier.
+
+    Attributes
+    ----------
+    @type joints: List[JointModel]
+    @param joints: data representing the joints
+
+    @type parent_indices: List[int]
+    @param parent_indices: The parent joint index of each joint, root joints are their own parents
+
+    @type linear_modifier: float
+    @param linear_modifier: The linear modifier that should be applied to the joints
+
+    @type angle_modifier: float
+    @param angle_modifier: The angle modifier that should be applied to the joints
+
+    @type joint_objects: List[MObject]
+    @param joint_objects: The created joints by joint index
+    """
+
+    def __init__(
+        self,
+        joints: List[JointModel],
+        parent_indices: Sequence[int],
+        linear_modifier: float,
+        angle_modifier: float,
+    ) -> None:
+        if len(joints) != len(parent_indices):
+            raise DNAViewerError(
+                f"Got {len(parent_indices)} parent indices for {len(joints)} joints"
+            )
+        self.joints = joints
+        self.parent_indices = list(parent_indices)
+        self.linear_modifier = linear_modifier
+        self.angle_modifier = angle_modifier
+        self.joint_objects: List[MObject] = []
+
+    @staticmethod
+    def get_build_order(parent_indices: Sequence[int]) -> np.ndarray:
+        """
+        Sorts the joints so every parent comes before its children, breadth first from the root joints.
+
+        @type parent_indices: Sequence[int]
+        @param parent_indices: The parent joint index of each joint, root joints are their own parents
+
+        @rtype: np.ndarray
+        @returns: The joint indices in build order
+        """
+
+        parents = np.asarray(parent_indices, dtype=np.int64)
+        joint_count = len(parents)
+        if joint_count and (parents.min() < 0 or parents.max() >= joint_count):
+            raise DNAViewerError("Joint parent indices are out of range")
+
+        joint_indices = np.arange(joint_count)
+        is_child = parents != joint_indices
+        child_order = np.argsort(parents[is_child], kind="stable")
+        children = joint_indices[is_child][child_order]
+        child_offsets = np.searchsorted(
+            parents[is_child][child_order], np.arange(joint_count + 1)
+        )
+
+        order = [joint_indices[~is_child]]
+        while len(order[-1]):
+            level = order[-1]
+            order.append(
+                np.concatenate(
+                    [children[child_offsets[i] : child_offsets[i + 1]] for i in level]
+                )
+            )
+
+        order = np.concatenate(order)
+        if len(order) != joint_count:
+            raise DNAViewerError(
+                "Joint hierarchy contains cycles, not every joint leads to a root joint"
+            )
+        return order
+
+    def get_translations(self) -> np.ndarray:
+        """
+        Gets the translations of the joints in scene units.
+
+        @rtype: np.ndarray
+        @returns: (N, 3) array of the joint translations in internal units
+        """
+
+        translations = np.array(
+            [
+                [joint.translation.x, joint.translation.y, joint.translation.z]
+                for joint in self.joints
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        return (
+            translations
+            * self.linear_modifier
+            * MDistance(1.0, MDistance.uiUnit()).asCentimeters()
+        )
+
+    def get_orients(self) -> np.ndarray:
+        """
+        Gets the orients of the joints in scene units.
+
+        @rtype: np.ndarray
+        @returns: (N, 3) array of the joint orients in internal units
+        """
+
+        orients = np.array(
+            [
+                [joint.orientation.x, joint.orientation.y, joint.orientation.z]
+                for joint in self.joints
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        return orients * self.angle_modifier * MAngle(1.0, MAngle.uiUnit()).asRadians()
+
+    def create_joints(self) -> None:
+        """Creates the whole joint hierarchy with one MDagModifier"""
+
+        self.joint_objects = [MObject.kNullObj] * len(self.joints)
+        dag_modifier = MDagModifier()
+        for joint_index in self.get_build_order(self.parent_indices).tolist():
+            parent_index = self.parent_indices[joint_index]
+            parent = (
+                MObject.kNullObj
+                if parent_index == joint_index
+                else self.joint_objects[parent_index]
+            )
+            joint_object = dag_modifier.createNode("joint", parent)
+            dag_modifier.renameNode(joint_object, self.joints[joint_index].name)
+            self.joint_objects[joint_index] = joint_object
+        dag_modifier.doIt()
+
+    def set_transforms(self) -> None:
+        """Sets the translations and orients of all created joints with one MDGModifier"""
+
+        values = np.concatenate([self.get_translations(), self.get_orients()], axis=1)
+        dg_modifier = MDGModifier()
+        for joint_object, joint_values in zip(self.joint_objects, values.tolist()):
+            node = MFnDependencyNode(joint_object)
+            for attribute, value in zip(TRANSFORM_ATTRIBUTES, joint_values):
+                dg_modifier.newPlugValueDouble(node.findPlug(attribute, False), value)
+        dg_modifier.doIt()
+
+    def process(self) -> None:
+        """Starts adding all the provided joints to the scene"""
+
+        self.create_joints()
+        self.set_transforms()
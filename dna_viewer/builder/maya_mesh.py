@@ -1,5 +1,5 @@
 from importlib import reload
-from typing import List
+from typing import List, Optional
 from ..model import mesh
 reload(mesh)
 
@@ -9,6 +9,7 @@ from ..config.mesh import Mesh as MeshConfig
 from ..model.dna import DNA
 from ..model.mesh import Mesh as MeshModel
 from ..util.mesh_blend_shape import MeshBlendShape
+from ..util.mesh_finalizer import MeshFinalizer
 from ..util.mesh_neutral import MeshNeutral
 from ..util.mesh_normals import MeshNormals
 from ..util.mesh_skin import MeshSkin
@@ -51,7 +52,8 @@ class MayaMesh:
         @rtype: om.MObject
         @returns: the instance of the created mesh object
         """
-        MeshNeutral.prepare_mesh(self.config, self.dna, self.data)
+        if not self.data.prepared:
+            MeshNeutral.prepare_mesh(self.config, self.dna, self.data)
         self.fn_mesh, self.mesh_object = MeshNeutral.create_mesh_object(
             self.config, self.data
         )
@@ -63,10 +65,42 @@ class MayaMesh:
         )
         return self.mesh_object
 
-    def add_blend_shapes(self, add_mesh_name_to_blend_shape_channel_name: bool) -> None:
-        """Adds blend shapes to the mesh"""
+    def add_blend_shapes(
+        self,
+        add_mesh_name_to_blend_shape_channel_name: bool,
+        chunk_size: int = 64,
+        drop_consumed: bool = False,
+        inject_targets: bool = True,
+    ) -> None:
+        """
+        Adds blend shapes to the mesh
+
+        @type add_mesh_name_to_blend_shape_channel_name: bool
+        @param add_mesh_name_to_blend_shape_channel_name: A flag representing whether mash name of blend shape channel is added to name when creating it
+
+        @type chunk_size: int
+        @param chunk_size: The maximum number of blend shape targets held in memory at once
+
+        @type drop_consumed: bool
+        @param drop_consumed: A flag representing whether blend shape targets held by the DNA are removed once consumed
+
+        @type inject_targets: bool
+        @param inject_targets: A flag representing whether targets are written straight into the blend shape node instead of being created from derived meshes
+        """
 
-        if self.dna.has_blend_shapes(self.config.mesh_index):
+        if not self.dna.has_blend_shapes(self.config.mesh_index):
+            return
+
+        if inject_targets:
+            MeshBlendShape.inject_blend_shape_targets(
+                self.config,
+                self.dna,
+                self.data,
+                add_mesh_name_to_blend_shape_channel_name,
+                chunk_size,
+                drop_consumed,
+            )
+        else:
             MeshBlendShape.create_all_derived_meshes(
                 self.config,
                 self.dna,
@@ -74,13 +108,17 @@ class MayaMesh:
                 self.fn_mesh,
                 self.dag_modifier,
                 add_mesh_name_to_blend_shape_channel_name,
+                chunk_size,
+                drop_consumed,
             )
             MeshBlendShape.create_blend_shape_node(
                 self.dna.get_mesh_name(self.config.mesh_index),
                 self.data.derived_mesh_names,
             )
 
-    def add_skin(self, joint_names: List[str], joint_ids: List[int]) -> None:
+    def add_skin(
+        self, joint_names: List[str], joint_ids: List[int], bulk_weights: bool = True
+    ) -> None:
         """
         Adds skin to the mesh
 
@@ -89,6 +127,9 @@ class MayaMesh:
 
         @type joint_ids: List[int]
         @param joint_ids: Joint indices needed for setting skin weights
+
+        @type bulk_weights: bool
+        @param bulk_weights: A flag representing whether skin weights are set in blocks through MFnSkinCluster.setWeights instead of one attribute at a time
         """
 
         mesh_name = self.dna.get_mesh_name(self.config.mesh_index)
@@ -96,11 +137,27 @@ class MayaMesh:
         MeshSkin.add_skin_cluster(
             self.dna, self.config.mesh_index, mesh_name, joint_names
         )
-        MeshSkin.set_skin_weights(
-            self.dna, self.config.mesh_index, mesh_name, joint_ids
-        )
+        if bulk_weights:
+            MeshSkin.set_skin_weights_bulk(
+                self.dna,
+                self.config.mesh_index,
+                mesh_name,
+                joint_ids,
+                self.data.skin_weight_arrays,
+            )
+        else:
+            MeshSkin.set_skin_weights(
+                self.dna, self.config.mesh_index, mesh_name, joint_ids
+            )
 
-    def add_normals(self) -> None:
-        """Add normals to the mesh"""
+    def add_normals(self, finalizer: Optional[MeshFinalizer] = None) -> None:
+        """
+        Add normals to the mesh
 
-        MeshNormals.add_normals(self.config, self.dna, self.data, self.fn_mesh)
+        @type finalizer: Optional[MeshFinalizer]
+        @param finalizer: Queues the soft edge and history bake of the mesh when given, otherwise they run right away
+        """
+
+        MeshNormals.add_normals(
+            self.config, self.dna, self.data, self.fn_mesh, finalizer=finalizer
+        )
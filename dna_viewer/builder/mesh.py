@@ -1,12 +1,14 @@
 import logging
-from typing import List
+from typing import List, Optional
 
 from ..builder.maya_mesh import MayaMesh as MayaMeshBuilder
 from ..config.character import BuildOptions, Character, SpaceModifiers
 from ..config.mesh import Mesh as MeshConfig
 from ..model.dna import DNA
+from ..util.mesh_finalizer import MeshFinalizer
+from ..util.mesh_neutral import MeshNeutral
+from ..util.mesh_normals import MeshNormals
 from ..util.mesh_skin import MeshSkin
-from ..util.reference import get_geometry_reader
 
 
 class Mesh:
@@ -41,6 +43,9 @@ class Mesh:
 
     @type dna: DNA
     @param dna: The DNA object that was loaded in
+
+    @type finalizer: Optional[MeshFinalizer]
+    @param finalizer: Collects the finalization steps of the mesh, they run right away if None
     """
 
     def __init__(
@@ -48,6 +53,7 @@ class Mesh:
         character_config: Character,
         dna: DNA,
         mesh_index: int,
+        finalizer: Optional[MeshFinalizer] = None,
     ) -> None:
         self.mesh_index: int = mesh_index
         self.joint_ids: List[int] = []
@@ -61,12 +67,52 @@ class Mesh:
         )
         self.dna = dna
         self.mesh = MayaMeshBuilder(self.config, self.dna)
+        self.finalizer = finalizer
+
+    def prepare(self) -> "Mesh":
+        """
+        Computes all mesh data that does not need maya, so it can run in a worker thread ahead of the build. The
+        build reuses the prepared data instead of computing it again.
+
+        @rtype: Mesh
+        @returns: The builder itself
+        """
+
+        data = self.mesh.data
+        MeshNeutral.prepare_mesh(self.config, self.dna, data)
+        MeshNeutral.get_vertex_position_array(self.config, data)
+        MeshNeutral.prepare_texture_coordinates(self.config, self.dna, data)
+        if self.options.add_normals:
+            MeshNormals.get_face_vertex_normals(self.config, self.dna, data)
+        if (
+            self.options.add_skin
+            and self.options.add_joints
+            and self.options.bulk_skin_weights
+        ):
+            data.skin_weight_arrays = self.dna.get_skin_weight_arrays_for_mesh(
+                self.mesh_index
+            )
+        data.prepared = True
+        return self
 
     def build(self) -> None:
         """Starts the build process, creates the neutral mesh, then adds normals, blends shapes and skin if needed"""
 
+        self.build_geometry()
+        self.build_deformers()
+
+    def build_geometry(self) -> None:
+        """
+        Creates the neutral mesh and adds normals if needed. When a finalizer is used, its soft edge step has to run
+        before build_deformers
+        """
+
         self.create_neutral_mesh()
         self.add_normals()
+
+    def build_deformers(self) -> None:
+        """Adds blend shapes and skin to the mesh if needed"""
+
         self.add_blend_shapes()
         self.add_skin()
 
@@ -80,20 +126,18 @@ class Mesh:
 
         if self.options.add_normals:
             logging.info("adding normals...")
-            self.mesh.add_normals()
+            self.mesh.add_normals(self.finalizer)
 
     def add_blend_shapes(self) -> None:
-        """Reads in the blend shapes, then adds them to the mesh if it is set in the build options"""
+        """Adds the blend shapes to the mesh if it is set in the build options, the targets are streamed in chunks"""
 
         if self.options.add_blend_shapes:
-            logging.info("reading blend shapes...")
-            geometry_reader = get_geometry_reader(self.mesh_index, self.dna.path)
-            geometry_reader.read_blend_shapes(
-                self.dna.get_mesh_data(self.mesh_index), self.mesh_index
-            )
             logging.info("adding blend shapes...")
             self.mesh.add_blend_shapes(
-                self.options.add_mesh_name_to_blend_shape_channel_name
+                self.options.add_mesh_name_to_blend_shape_channel_name,
+                self.options.blend_shape_chunk_size,
+                self.options.drop_consumed_blend_shapes,
+                self.options.inject_blend_shape_targets,
             )
 
     def add_skin(self) -> None:
@@ -104,4 +148,6 @@ class Mesh:
                 self.dna,
                 self.mesh_index,
             )
-            self.mesh.add_skin(self.joint_names, self.joint_ids)
+            self.mesh.add_skin(
+                self.joint_names, self.joint_ids, self.options.bulk_skin_weights
+            )
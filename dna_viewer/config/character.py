@@ -7,6 +7,7 @@ from ..config.aas import AdditionalAssemblyScript
 from ..config.analog_gui import AnalogGui
 from ..config.gui import Gui
 from ..config.rig_logic import RigLogic
+from ..const.mesh import PIPELINE_MAX_PENDING, PIPELINE_WORKERS
 from ..model.dna import DNA
 
 
@@ -58,6 +59,30 @@ class BuildOptions:
 
     @type add_mesh_name_to_blend_shape_channel_name: bool
     @param add_mesh_name_to_blend_shape_channel_name: A flag representing whether mash name of blend shape channel is added to name when creating it
+
+    @type blend_shape_chunk_size: int
+    @param blend_shape_chunk_size: The maximum number of blend shape targets held in memory at once while creating derived meshes
+
+    @type drop_consumed_blend_shapes: bool
+    @param drop_consumed_blend_shapes: A flag representing whether blend shape targets already held by the DNA are removed from it once their derived meshes were created
+
+    @type inject_blend_shape_targets: bool
+    @param inject_blend_shape_targets: A flag representing whether blend shape targets are written straight into the blend shape node instead of being created from derived meshes
+
+    @type bulk_skin_weights: bool
+    @param bulk_skin_weights: A flag representing whether skin weights are set in blocks through MFnSkinCluster.setWeights instead of one attribute at a time
+
+    @type batch_joints: bool
+    @param batch_joints: A flag representing whether the joint hierarchy is created at once through a single MDagModifier instead of one cmds.joint call per joint
+
+    @type batch_attributes: bool
+    @param batch_attributes: A flag representing whether control and animated map attributes and their key frames are created through a single MDGModifier instead of one command per attribute
+
+    @type pipeline_workers: int
+    @param pipeline_workers: The number of worker threads preparing mesh data while the maya nodes of earlier meshes are created, 0 prepares every mesh on the main thread
+
+    @type pipeline_max_pending: int
+    @param pipeline_max_pending: The maximum number of prepared meshes held in memory waiting to be built
     """
 
     add_joints: bool = field(default=False)
@@ -68,6 +93,14 @@ class BuildOptions:
     add_animated_map_attributes_on_root_joint: bool = field(default=False)
     add_key_frames: bool = field(default=False)
     add_mesh_name_to_blend_shape_channel_name: bool = field(default=False)
+    blend_shape_chunk_size: int = field(default=64)
+    drop_consumed_blend_shapes: bool = field(default=False)
+    inject_blend_shape_targets: bool = field(default=True)
+    bulk_skin_weights: bool = field(default=True)
+    batch_joints: bool = field(default=True)
+    batch_attributes: bool = field(default=True)
+    pipeline_workers: int = field(default=PIPELINE_WORKERS)
+    pipeline_max_pending: int = field(default=PIPELINE_MAX_PENDING)
 
 
 @dataclass
@@ -160,15 +193,19 @@ class Character:
         self.create_display_layers = value
         return self
 
-    def with_joints(self) -> "Character":
+    def with_joints(self, batch: bool = True) -> "Character":
         """
         Set the flag that represents if joints should be created
 
+        @type batch: bool
+        @param batch: A flag representing whether the joint hierarchy is created at once through a single MDagModifier, False creates the joints one cmds.joint call at a time
+
         @rtype: Character
         @returns: The instance of the changed object
         """
 
         self.options.add_joints = True
+        self.options.batch_joints = batch
         return self
 
     def with_gui_path(self, gui_path: str) -> "Character":
@@ -229,26 +266,74 @@ class Character:
         self.analog_gui_options = AnalogGui(gui_path=analog_gui_path)
         return self
 
-    def with_blend_shapes(self) -> "Character":
+    def with_blend_shapes(self, inject_targets: bool = True) -> "Character":
         """
         Set the flag that represents if blend shapes should be created
 
+        @type inject_targets: bool
+        @param inject_targets: A flag representing whether blend shape targets are written straight into the blend shape node, False creates them from derived meshes
+
         @rtype: Character
         @returns: The instance of the changed object
         """
 
         self.options.add_blend_shapes = True
+        self.options.inject_blend_shape_targets = inject_targets
         return self
 
-    def with_skin(self) -> "Character":
+    def with_blend_shape_streaming(
+        self, chunk_size: int, drop_consumed: bool = False
+    ) -> "Character":
+        """
+        Set how blend shape targets are streamed while creating derived meshes
+
+        @type chunk_size: int
+        @param chunk_size: The maximum number of blend shape targets held in memory at once
+
+        @type drop_consumed: bool
+        @param drop_consumed: A flag representing whether blend shape targets already held by the DNA are removed from it once consumed
+
+        @rtype: Character
+        @returns: The instance of the changed object
+        """
+
+        self.options.blend_shape_chunk_size = chunk_size
+        self.options.drop_consumed_blend_shapes = drop_consumed
+        return self
+
+    def with_skin(self, bulk_weights: bool = True) -> "Character":
         """
         Set the flag that represents if skin should be created
 
+        @type bulk_weights: bool
+        @param bulk_weights: A flag representing whether skin weights are set in blocks through MFnSkinCluster.setWeights, False sets them one attribute at a time
+
         @rtype: Character
         @returns: The instance of the changed object
         """
 
         self.options.add_skin = True
+        self.options.bulk_skin_weights = bulk_weights
+        return self
+
+    def with_pipeline(
+        self, workers: int, max_pending: int = PIPELINE_MAX_PENDING
+    ) -> "Character":
+        """
+        Set how mesh data is prepared in worker threads while the maya nodes of earlier meshes are created
+
+        @type workers: int
+        @param workers: The number of worker threads, 0 prepares every mesh on the main thread
+
+        @type max_pending: int
+        @param max_pending: The maximum number of prepared meshes held in memory waiting to be built
+
+        @rtype: Character
+        @returns: The instance of the changed object
+        """
+
+        self.options.pipeline_workers = workers
+        self.options.pipeline_max_pending = max_pending
         return self
 
     def with_normals(self) -> "Character":
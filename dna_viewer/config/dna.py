@@ -0,0 +1,262 @@
+import os
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import List, Optional
+
+from ..const.cache import DEFAULT_CACHE_MAX_ENTRIES, DEFAULT_CACHE_MAX_SIZE
+
+
+class DataLayer(Enum):
+    """
+    An enum used to represent the parts of the DNA file that should be loaded.
+
+    Attributes
+    ----------
+    @descriptor: the descriptor part (name, archetype, units, LOD count...)
+    @definition: the definition part (names of meshes, joints, controls and their LOD mappings)
+    @behavior: the behavior part (RigLogic data)
+    @geometry: the geometry part without blend shape deltas (topology and skin weights)
+    @blend_shapes: the blend shape deltas of the geometry part
+    """
+
+    descriptor = 0
+    definition = 1
+    behavior = 2
+    geometry = 3
+    blend_shapes = 4
+
+
+ALL_LAYERS = [
+    DataLayer.descriptor,
+    DataLayer.definition,
+    DataLayer.behavior,
+    DataLayer.geometry,
+    DataLayer.blend_shapes,
+]
+
+
+@dataclass
+class LoadOptions:
+    """
+    A class used to represent the options used when loading a DNA file
+
+    Attributes
+    ----------
+    @type layers: List[DataLayer]
+    @param layers: The parts of the DNA file that should be loaded, the stream is opened with the narrowest layer that contains all of them
+
+    @type lods: Optional[List[int]]
+    @param lods: The LODs whose meshes should be available, all LODs if None
+
+    @type meshes: Optional[List[int]]
+    @param meshes: The mesh indices that should be available, all meshes of the selected LODs if None
+
+    @type lazy: bool
+    @param lazy: A flag representing whether mesh geometry is read on first access instead of while loading
+
+    @type memory_mapped: bool
+    @param memory_mapped: A flag representing whether the DNA file is memory mapped instead of read through a file stream
+
+    @type cache: bool
+    @param cache: A flag representing whether the decoded DNA is stored in and loaded from the on-disk cache
+
+    @type cache_dir: Optional[str]
+    @param cache_dir: The cache directory, the cache directory of the user if None
+
+    @type cache_max_size: int
+    @param cache_max_size: The maximum disk space of the cache in bytes
+
+    @type cache_max_entries: int
+    @param cache_max_entries: The maximum number of DNA files kept in the cache
+
+    @type cache_verify: bool
+    @param cache_verify: A flag representing whether the content hash of the DNA file is checked on every cache hit
+
+    @type workers: int
+    @param workers: The number of workers decoding the meshes, with more than one all meshes are read up front in parallel
+
+    @type use_processes: bool
+    @param use_processes: A flag representing whether the workers are processes instead of threads
+    """
+
+    layers: List[DataLayer] = field(default_factory=lambda: list(ALL_LAYERS))
+    lods: Optional[List[int]] = field(default=None)
+    meshes: Optional[List[int]] = field(default=None)
+    lazy: bool = field(default=True)
+    memory_mapped: bool = field(default=False)
+    cache: bool = field(default=False)
+    cache_dir: Optional[str] = field(default=None)
+    cache_max_size: int = field(default=DEFAULT_CACHE_MAX_SIZE)
+    cache_max_entries: int = field(default=DEFAULT_CACHE_MAX_ENTRIES)
+    cache_verify: bool = field(default=False)
+    workers: int = field(default=1)
+    use_processes: bool = field(default=False)
+
+    def with_layers(self, layers: List[DataLayer]) -> "LoadOptions":
+        """
+        Set the parts of the DNA file that should be loaded
+
+        @type layers: List[DataLayer]
+        @param layers: The parts of the DNA file that should be loaded
+
+        @rtype: LoadOptions
+        @returns: The instance of the changed object
+        """
+
+        self.layers = list(layers)
+        return self
+
+    def with_lods(self, lods: List[int]) -> "LoadOptions":
+        """
+        Set the LODs whose meshes should be available
+
+        @type lods: List[int]
+        @param lods: The LOD numbers
+
+        @rtype: LoadOptions
+        @returns: The instance of the changed object
+        """
+
+        self.lods = list(lods)
+        return self
+
+    def with_meshes(self, meshes: List[int]) -> "LoadOptions":
+        """
+        Set the mesh indices that should be available
+
+        @type meshes: List[int]
+        @param meshes: The mesh indices
+
+        @rtype: LoadOptions
+        @returns: The instance of the changed object
+        """
+
+        self.meshes = list(meshes)
+        return self
+
+    def with_lazy(self, value: bool) -> "LoadOptions":
+        """
+        Set the flag that represents if mesh geometry is read on first access
+
+        @type value: bool
+        @param value: The flag that represents if mesh geometry is read on first access
+
+        @rtype: LoadOptions
+        @returns: The instance of the changed object
+        """
+
+        self.lazy = value
+        return self
+
+    def with_memory_mapped(self, value: bool) -> "LoadOptions":
+        """
+        Set the flag that represents if the DNA file is memory mapped
+
+        @type value: bool
+        @param value: The flag that represents if the DNA file is memory mapped
+
+        @rtype: LoadOptions
+        @returns: The instance of the changed object
+        """
+
+        self.memory_mapped = value
+        return self
+
+    def with_cache(self, value: bool, cache_dir: Optional[str] = None) -> "LoadOptions":
+        """
+        Set the flag that represents if the on-disk cache is used
+
+        @type value: bool
+        @param value: The flag that represents if the on-disk cache is used
+
+        @type cache_dir: Optional[str]
+        @param cache_dir: The cache directory, the current one is kept if None
+
+        @rtype: LoadOptions
+        @returns: The instance of the changed object
+        """
+
+        self.cache = value
+        if cache_dir is not None:
+            self.cache_dir = cache_dir
+        return self
+
+    def with_cache_limits(self, max_size: int, max_entries: int) -> "LoadOptions":
+        """
+        Set the limits above which the least recently used cache entries are evicted
+
+        @type max_size: int
+        @param max_size: The maximum disk space of the cache in bytes
+
+        @type max_entries: int
+        @param max_entries: The maximum number of DNA files kept in the cache
+
+        @rtype: LoadOptions
+        @returns: The instance of the changed object
+        """
+
+        self.cache_max_size = max_size
+        self.cache_max_entries = max_entries
+        return self
+
+    def with_cache_verify(self, value: bool) -> "LoadOptions":
+        """
+        Set the flag that represents if the content hash is checked on every cache hit
+
+        @type value: bool
+        @param value: The flag that represents if the content hash is checked on every cache hit
+
+        @rtype: LoadOptions
+        @returns: The instance of the changed object
+        """
+
+        self.cache_verify = value
+        return self
+
+    def with_workers(self, workers: int, use_processes: bool = False) -> "LoadOptions":
+        """
+        Set the number of workers decoding the meshes in parallel
+
+        @type workers: int
+        @param workers: The number of workers, all CPU cores if less than 1
+
+        @type use_processes: bool
+        @param use_processes: A flag representing whether the workers are processes instead of threads
+
+        @rtype: LoadOptions
+        @returns: The instance of the changed object
+        """
+
+        self.workers = workers if workers > 0 else os.cpu_count() or 1
+        self.use_processes = use_processes
+        return self
+
+    def has_layer(self, layer: DataLayer) -> bool:
+        """
+        Checks if the given layer needs to be read, taking into account the layers it is required by
+
+        @type layer: DataLayer
+        @param layer: The layer that is checked
+
+        @rtype: bool
+        @returns: True if the layer needs to be read
+        """
+
+        if layer == DataLayer.descriptor:
+            return True
+        if layer == DataLayer.definition:
+            return any(
+                value in self.layers
+                for value in (
+                    DataLayer.definition,
+                    DataLayer.behavior,
+                    DataLayer.geometry,
+                    DataLayer.blend_shapes,
+                )
+            )
+        if layer == DataLayer.geometry:
+            return (
+                DataLayer.geometry in self.layers
+                or DataLayer.blend_shapes in self.layers
+            )
+        return layer in self.layers
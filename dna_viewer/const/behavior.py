@@ -0,0 +1,17 @@
+# joint outputs hold translation, rotation and scale XYZ for every joint
+JOINT_ATTRIBUTE_NAMES = ("tx", "ty", "tz", "rx", "ry", "rz", "sx", "sy", "sz")
+JOINT_ATTRIBUTE_COUNT = len(JOINT_ATTRIBUTE_NAMES)
+
+# the precision RigLogic evaluates in
+EVALUATION_DTYPE = "float32"
+
+# the frames read, evaluated and written at once by a baking worker
+DEFAULT_BAKE_CHUNK_SIZE = 4096
+BAKE_MANIFEST_NAME = "bake.json"
+BAKE_MANIFEST_VERSION = 1
+# control animation columns that do not hold control values
+BAKE_FRAME_COLUMN = "frame"
+# the arrays of a .npz control animation
+BAKE_VALUES_KEY = "values"
+BAKE_NAMES_KEY = "names"
+BAKE_OUTPUTS = ("joints", "blend_shapes", "animated_maps")
@@ -0,0 +1,27 @@
+# the default cache directory is created under the cache directory of the current user
+CACHE_DIR_NAME = "dna_viewer"
+CACHE_MANIFEST_NAME = "manifest.json"
+CACHE_LOCK_NAME = "manifest.lock"
+CACHE_MODEL_NAME = "model.pkl"
+CACHE_ARRAYS_DIR_NAME = "arrays"
+CACHE_VERSION = 3
+CACHE_INLINE_ARRAY_SIZE = 16 * 1024
+
+DEFAULT_CACHE_MAX_SIZE = 8 * 1024**3
+DEFAULT_CACHE_MAX_ENTRIES = 64
+
+HASH_CHUNK_SIZE = 1024**2
+
+# the names an entry may use for its key and its array files
+CACHE_KEY_PATTERN = r"[0-9a-f]{40}"
+CACHE_ARRAY_NAME_PATTERN = r"[0-9]+\.npy"
+# the modules NumPy pickles its array reconstruction functions from, depending on its version
+CACHE_NUMPY_MODULES = (
+    "numpy",
+    "numpy.core.multiarray",
+    "numpy.core.numeric",
+    "numpy._core.multiarray",
+    "numpy._core.numeric",
+)
+# seconds between attempts to lock the manifest where locking does not block
+CACHE_LOCK_RETRY_INTERVAL = 0.05
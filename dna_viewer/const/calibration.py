@@ -0,0 +1,5 @@
+CALIBRATION_MANIFEST_NAME = ".dnacalib_manifest.json"
+CALIBRATION_MANIFEST_VERSION = 1
+
+COMMAND_CLASS_SUFFIX = "Command"
+COMMAND_ENUM_PREFIXES = ("VectorOperation_",)
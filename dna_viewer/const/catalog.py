@@ -0,0 +1,5 @@
+CATALOG_VERSION = 1
+
+MESH_NAME_KIND = "mesh"
+JOINT_NAME_KIND = "joint"
+BLEND_SHAPE_CHANNEL_NAME_KIND = "blend_shape_channel"
@@ -0,0 +1,14 @@
+# UVs of the same vertex closer than this are welded into one, the distance polyMergeUV was called with
+UV_MERGE_DISTANCE = 0.01
+
+# finalization steps queued per mesh while building and run once for all queued meshes, in this order
+SOFT_EDGE_STEP = "soft_edge"
+BAKE_HISTORY_STEP = "bake_history"
+FINALIZATION_STEPS = (SOFT_EDGE_STEP, BAKE_HISTORY_STEP)
+
+SOFT_EDGE_ANGLE = 180
+
+# meshes prepared ahead of the build in worker threads, 0 workers prepares them on the main thread while building
+PIPELINE_WORKERS = 2
+# the maximum number of prepared meshes held in memory waiting to be built
+PIPELINE_MAX_PENDING = 2
@@ -20,3 +20,8 @@ FACIAL_ROOT_JOINT = "FACIAL_C_FacialRoot"
 MESH_NAME = "<mesh_name>"
 DERIVED_MESH_NAME = "<derived_mesh_name}>"
 BLEND_SHAPE_NAMING = f"{MESH_NAME}__{DERIVED_MESH_NAME}"
+
+# the fully weighted in-between of a blend shape target, {} is the target index
+BLEND_SHAPE_INPUT_TARGET_ITEM = (
+    "inputTarget[0].inputTargetGroup[{}].inputTargetItem[6000]"
+)
@@ -0,0 +1,2 @@
+DEFAULT_REFERENCE_MAX_ENTRIES = 8
+DEFAULT_REFERENCE_MAX_BYTES = 4 * 1024**3
@@ -0,0 +1,4 @@
+DEFAULT_SYNC_TOLERANCE = 1e-4
+
+TRANSLATE_ATTRIBUTE = "translate"
+JOINT_ORIENT_ATTRIBUTE = "jointOrient"
@@ -0,0 +1 @@
+SKIN_WEIGHT_BLOCK_SIZE = 4096
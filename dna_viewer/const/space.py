@@ -3,3 +3,12 @@ from maya.api.OpenMaya import MSpace
 WORLD = MSpace.kWorld
 OBJECT = MSpace.kObject
 TRANSFORM = MSpace.kTransform
+
+# euler xyz rotation in degrees applied to the DNA vertex positions when meshes are built
+DEFAULT_MESH_ROTATION = (90.0, 0.0, 0.0)
+
+# the joint turned by Character.fix_joint_position after the joints are built, its translation is rotated by
+# FIXED_JOINT_TRANSLATION_ROTATION (Y and Z swapped) and FIXED_JOINT_ORIENT_ROTATION is frozen into its joint orient
+FIXED_JOINT_NAME = "spine_04"
+FIXED_JOINT_TRANSLATION_ROTATION = (90.0, 0.0, 0.0)
+FIXED_JOINT_ORIENT_ROTATION = (0.0, 0.0, -90.0)
@@ -1,6 +1,9 @@
 from dataclasses import dataclass, field
 from typing import List, Optional
 
+import numpy as np
+from scipy.sparse import csr_matrix
+
 
 @dataclass
 class ConditionalTable:
@@ -54,12 +57,16 @@ class PSDMatrix:
 
     @type values: List[float]
     @param values: The list of values, that can be accessed from the row and column index
+
+    @type matrix: Optional[csr_matrix]
+    @param matrix: The (controls, controls) matrix of the values, the row of a PSD holds the weights of its inputs
     """
 
     count: Optional[int] = field(default=None)
     rows: List[int] = field(default_factory=list)
     columns: List[int] = field(default_factory=list)
     values: List[float] = field(default_factory=list)
+    matrix: Optional[csr_matrix] = field(default=None)
 
 
 @dataclass
@@ -83,6 +90,12 @@ class JointGroup:
 
     @type outputs: List[int]
     @param outputs: The indices of outputs
+
+    @type matrix: Optional[csr_matrix]
+    @param matrix: The (outputs, controls) matrix of the values, the rows used by a LOD come first
+
+    @type output_indices: Optional[np.ndarray]
+    @param output_indices: The joint row of every row of the matrix
     """
 
     lods: List[int] = field(default_factory=list)
@@ -90,6 +103,8 @@ class JointGroup:
     joints: List[int] = field(default_factory=list)
     inputs: List[int] = field(default_factory=list)
     outputs: List[int] = field(default_factory=list)
+    matrix: Optional[csr_matrix] = field(default=None)
+    output_indices: Optional[np.ndarray] = field(default=None)
 
 
 @dataclass
@@ -186,3 +201,127 @@ class Behavior:
     blend_shapes: BlendShapesData = field(default_factory=BlendShapesData)
     animated_maps: AnimatedMapsData = field(default_factory=AnimatedMapsData)
     joints: JointsData = field(default_factory=JointsData)
+
+
+@dataclass
+class ConditionalTableArrays:
+    """
+    A model class for holding a conditional table compiled for vectorized evaluation
+
+    Attributes
+    ----------
+    @type inputs: np.ndarray
+    @param inputs: The (E,) input index of each entry
+
+    @type from_values: np.ndarray
+    @param from_values: The (E,) lower bound of the range of each entry
+
+    @type to_values: np.ndarray
+    @param to_values: The (E,) upper bound of the range of each entry
+
+    @type slope_values: np.ndarray
+    @param slope_values: The (E,) slope of each entry
+
+    @type cut_values: np.ndarray
+    @param cut_values: The (E,) cut of each entry
+
+    @type includes_from: np.ndarray
+    @param includes_from: The (E,) flags of entries whose range also contains its lower bound, set when no other range of the same input and output ends there
+
+    @type output_matrix: csr_matrix
+    @param output_matrix: The (outputs, E) matrix summing the entries into their outputs
+    """
+
+    inputs: np.ndarray
+    from_values: np.ndarray
+    to_values: np.ndarray
+    slope_values: np.ndarray
+    cut_values: np.ndarray
+    includes_from: np.ndarray
+    output_matrix: csr_matrix
+
+
+@dataclass
+class BehaviorLOD:
+    """
+    A model class for holding the behavior of a single LOD compiled for vectorized evaluation
+
+    Attributes
+    ----------
+    @type lod: int
+    @param lod: The LOD index
+
+    @type joint_matrix: csr_matrix
+    @param joint_matrix: The (joint rows, controls) matrix of all joint groups, cut to the rows used by the LOD
+
+    @type blend_shape_inputs: np.ndarray
+    @param blend_shape_inputs: The control index of each blend shape channel used by the LOD
+
+    @type blend_shape_outputs: np.ndarray
+    @param blend_shape_outputs: The blend shape channel index of each blend shape channel used by the LOD
+
+    @type animated_maps: ConditionalTableArrays
+    @param animated_maps: The animated map conditional table, cut to the entries used by the LOD
+    """
+
+    lod: int
+    joint_matrix: csr_matrix
+    blend_shape_inputs: np.ndarray
+    blend_shape_outputs: np.ndarray
+    animated_maps: ConditionalTableArrays
+
+
+@dataclass
+class BehaviorOutputs:
+    """
+    A model class for holding the evaluated outputs of the behavior for a batch of poses
+
+    Attributes
+    ----------
+    @type controls: np.ndarray
+    @param controls: The (N, raw controls + PSDs) raw control values followed by the PSD values
+
+    @type joints: np.ndarray
+    @param joints: The (N, joint rows) joint deltas, 9 values (translation, rotation, scale) per joint
+
+    @type blend_shapes: np.ndarray
+    @param blend_shapes: The (N, blend shape channels) blend shape channel weights
+
+    @type animated_maps: np.ndarray
+    @param animated_maps: The (N, animated maps) animated map values
+    """
+
+    controls: np.ndarray
+    joints: np.ndarray
+    blend_shapes: np.ndarray
+    animated_maps: np.ndarray
+
+
+@dataclass
+class BehaviorSelection:
+    """
+    A model class for holding the indices of the behavior inputs and outputs that depend on each other
+
+    Attributes
+    ----------
+    @type gui_controls: np.ndarray
+    @param gui_controls: The GUI control indices
+
+    @type controls: np.ndarray
+    @param controls: The raw control and PSD indices
+
+    @type joint_attributes: np.ndarray
+    @param joint_attributes: The joint rows, 9 per joint (translation, rotation, scale)
+
+    @type blend_shapes: np.ndarray
+    @param blend_shapes: The blend shape channel indices
+
+    @type animated_maps: np.ndarray
+    @param animated_maps: The animated map indices
+    """
+
+    gui_controls: np.ndarray
+    controls: np.ndarray
+    joint_attributes: np.ndarray
+    blend_shapes: np.ndarray
+    animated_maps: np.ndarray
@@ -1,14 +1,30 @@
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
 
 from ..config.units import AngleUnit, LinearUnit
-from ..model.behavior import Behavior
+from ..model.behavior import Behavior, JointGroup
 from ..model.definition import Definition
 from ..model.descriptor import Descriptor
-from ..model.geometry import UV, BlendShape, Geometry, Layout, Mesh, Point3
+from ..model.geometry import (
+    UV,
+    BlendShape,
+    BlendShapeTargets,
+    Geometry,
+    LazyMeshes,
+    Layout,
+    Mesh,
+    Point3,
+)
 from ..model.joint import Joint
+from ..model.mesh import FaceVertexArrays
+from ..reader.geometry import Geometry as GeometryReader
+from ..util.behavior_matrix import BehaviorMatrix
 from ..util.conversion import Conversion
 from ..util.error import DNAViewerError
+from ..util.reference import get_geometry_reader
 
 
 @dataclass
@@ -70,6 +86,9 @@ class DNA(BaseDNA):
 
         return joints
 
+    def get_joint_parent_indices(self) -> List[int]:
+        return self.definition.joints.parent_index
+
     def get_all_skin_weights_joint_indices_for_mesh(
         self, mesh_index: int
     ) -> List[List[int]]:
@@ -78,26 +97,39 @@ class DNA(BaseDNA):
     def get_blend_shape_target_deltas_with_vertex_id(
         self, mesh_index: int, blend_shape_target_index: int
     ) -> List[Tuple[int, Point3]]:
-        blend_shape = self.geometry.meshes[mesh_index].blend_shapes[
-            blend_shape_target_index
-        ]
-        indices = list(blend_shape.deltas.keys())
+        blend_shape = self.geometry.meshes[
+            mesh_index
+        ].blend_shape_targets.get_blend_shape(blend_shape_target_index)
+        return list(blend_shape.deltas.items())
+
+    def get_blend_shape_target_delta_arrays(
+        self, mesh_index: int, blend_shape_target_index: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Gets the deltas of a blend shape target as arrays, without building a Point3 per vertex
 
-        deltas: List[Point3] = []
-        for i in indices:
-            deltas.append(blend_shape.deltas[i])
+        @type mesh_index: int
+        @param mesh_index: The mesh index
 
-        if not deltas:
-            return []
+        @type blend_shape_target_index: int
+        @param blend_shape_target_index: The blend shape target index
 
-        return list(zip(indices, deltas))
+        @rtype: Tuple[np.ndarray, np.ndarray]
+        @returns: (D,) vertex indices and (D, 3) deltas of the target
+        """
+
+        blend_shape_targets = self.geometry.meshes[mesh_index].blend_shape_targets
+        return (
+            blend_shape_targets.get_vertex_indices(blend_shape_target_index),
+            blend_shape_targets.get_deltas(blend_shape_target_index),
+        )
 
     def get_all_skin_weights_values_for_mesh(
         self, mesh_index: int
     ) -> List[List[float]]:
         skin_weight_values = []
         mesh = self.geometry.meshes[mesh_index]
-        for i in range(len(mesh.topology.positions)):
+        for i in range(len(mesh.topology.position_array)):
             skin_weight_values.append(mesh.skin_weights.values[i])
 
         return skin_weight_values
@@ -105,7 +137,9 @@ class DNA(BaseDNA):
     def get_skin_weight_matrix_for_mesh(
         self, mesh_index: int
     ) -> List[List[Tuple[int, float]]]:
-        vertex_position_count = len(self.geometry.meshes[mesh_index].topology.positions)
+        vertex_position_count = len(
+            self.geometry.meshes[mesh_index].topology.position_array
+        )
 
         joint_indices = self.get_all_skin_weights_joint_indices_for_mesh(mesh_index)
         if len(joint_indices) != vertex_position_count:
@@ -136,26 +170,90 @@ class DNA(BaseDNA):
             weight_matrix.append(vertex_weights)
         return weight_matrix
 
-    def get_vertex_texture_coordinates_for_mesh(self, mesh_index: int) -> List[UV]:
+    def get_skin_weight_arrays_for_mesh(
+        self, mesh_index: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Gets the skin weights of the mesh as flat arrays, the influences of vertex i are
+        joint_indices[offsets[i]:offsets[i + 1]] with the matching values.
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+
+        @rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+        @returns: The (V + 1) offsets, the joint indices and the skin weight values
+        """
+
+        skin_weights = self.geometry.meshes[mesh_index].skin_weights
+        vertex_position_count = len(
+            self.geometry.meshes[mesh_index].topology.position_array
+        )
+        if len(skin_weights.joint_indices) != vertex_position_count:
+            raise DNAViewerError(
+                "Number of joint indices and vertex count don't match!"
+            )
+        if len(skin_weights.values) != vertex_position_count:
+            raise DNAViewerError(
+                "Number of skin weight values and vertex count don't match!"
+            )
+
+        counts = np.fromiter(
+            (len(indices) for indices in skin_weights.joint_indices),
+            dtype=np.int64,
+            count=vertex_position_count,
+        )
+        if vertex_position_count and not counts.min():
+            raise DNAViewerError("JointIndexArray for vertex can't be less than one!")
+        offsets = np.zeros(vertex_position_count + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        joint_indices = np.fromiter(
+            (index for indices in skin_weights.joint_indices for index in indices),
+            dtype=np.int64,
+            count=offsets[-1],
+        )
+        values = np.fromiter(
+            (value for vertex_values in skin_weights.values for value in vertex_values),
+            dtype=np.float64,
+        )
+        if len(values) != len(joint_indices):
+            raise DNAViewerError(
+                "Number of skin weight values and joint indices count don't match for vertex!"
+            )
+        return offsets, joint_indices, values
+
+    def get_vertex_texture_coordinates_for_mesh(self, mesh_index: int) -> Sequence[UV]:
         return self.geometry.meshes[mesh_index].topology.texture_coordinates
 
-    def get_vertex_normals_for_mesh(self, mesh_index: int) -> List[Point3]:
+    def get_vertex_texture_coordinate_array_for_mesh(
+        self, mesh_index: int
+    ) -> np.ndarray:
+        return self.geometry.meshes[mesh_index].topology.texture_coordinate_array
+
+    def get_vertex_normals_for_mesh(self, mesh_index: int) -> Sequence[Point3]:
         return self.geometry.meshes[mesh_index].topology.normals
 
+    def get_vertex_normal_array_for_mesh(self, mesh_index: int) -> np.ndarray:
+        return self.geometry.meshes[mesh_index].topology.normal_array
+
     def get_raw_control_names(self) -> List[str]:
         return self.definition.raw_control_names
 
     def get_animated_map_names(self) -> List[str]:
         return self.definition.animated_maps.names
 
-    def get_vertex_positions_for_mesh_index(self, mesh_index: int) -> List[Point3]:
+    def get_vertex_positions_for_mesh_index(self, mesh_index: int) -> Sequence[Point3]:
         return self.geometry.meshes[mesh_index].topology.positions
 
+    def get_vertex_position_array_for_mesh_index(self, mesh_index: int) -> np.ndarray:
+        return self.geometry.meshes[mesh_index].topology.position_array
+
     def get_vertex_layout_positions_for_mesh_index(self, mesh_index: int) -> List[int]:
-        return [
-            item.position_index
-            for item in self.geometry.meshes[mesh_index].topology.layouts
-        ]
+        return self.geometry.meshes[
+            mesh_index
+        ].topology.layout_position_indices.tolist()
+
+    def get_vertex_layout_array_for_mesh_index(self, mesh_index: int) -> np.ndarray:
+        return self.geometry.meshes[mesh_index].topology.layout_array
 
     def get_faces(self, mesh_index: int) -> List[List[int]]:
         return self.geometry.meshes[mesh_index].topology.face_vertex_layouts
@@ -171,6 +269,12 @@ class DNA(BaseDNA):
                 raise DNAViewerError(
                     "get_polygon_faces_and_connects -> Must provide either mesh_index or dna_faces and dna_vertex_layout_positions"
                 )
+        elif dna_faces is None and dna_vertex_layout_positions is None:
+            face_vertex_arrays = self.get_face_vertex_arrays(mesh_index)
+            return (
+                face_vertex_arrays.polygon_faces.tolist(),
+                face_vertex_arrays.polygon_connects.tolist(),
+            )
         if dna_faces is None:
             dna_faces = self.get_faces(mesh_index)
         if dna_vertex_layout_positions is None:
@@ -178,25 +282,46 @@ class DNA(BaseDNA):
                 self.get_vertex_layout_positions_for_mesh_index(mesh_index)
             )
 
-        polygon_faces = []
-        polygon_connects = []
-        for vertices_layout_index_array in dna_faces:
-            polygon_faces.append(len(vertices_layout_index_array))
-            for vertex_layout_index_array in vertices_layout_index_array:
-                polygon_connects.append(
-                    dna_vertex_layout_positions[vertex_layout_index_array]
-                )
-
-        return polygon_faces, polygon_connects
+        polygon_faces = [len(face) for face in dna_faces]
+        face_layouts = np.fromiter(
+            (layout for face in dna_faces for layout in face),
+            dtype=np.int64,
+            count=sum(polygon_faces),
+        )
+        polygon_connects = np.asarray(dna_vertex_layout_positions)[face_layouts]
+
+        return polygon_faces, polygon_connects.tolist()
+
+    def get_face_vertex_arrays(self, mesh_index: int) -> FaceVertexArrays:
+        """
+        Resolves the layouts of all face vertices of the mesh in a single pass over the flat topology arrays
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+
+        @rtype: FaceVertexArrays
+        @returns: The per face vertex arrays of the mesh
+        """
+
+        topology = self.geometry.meshes[mesh_index].topology
+        face_sizes = topology.face_sizes.astype(np.int32)
+        layouts = topology.layout_array[topology.face_layout_array]
+        return FaceVertexArrays(
+            polygon_faces=face_sizes,
+            polygon_connects=layouts[:, 0].astype(np.int32),
+            face_ids=np.repeat(np.arange(len(face_sizes), dtype=np.int32), face_sizes),
+            texture_coordinate_indices=layouts[:, 1].astype(np.int32),
+            normals=topology.normal_array[layouts[:, 2]],
+        )
 
-    def get_layouts_for_mesh_index(self, mesh_index: int) -> List[Layout]:
+    def get_layouts_for_mesh_index(self, mesh_index: int) -> Sequence[Layout]:
         return self.geometry.meshes[mesh_index].topology.layouts
 
     def get_texture_coordinate_index(self, mesh_index: int, layout_id: int) -> int:
-        return (
-            self.geometry.meshes[mesh_index]
-            .topology.layouts[layout_id]
-            .texture_coordinate_index
+        return int(
+            self.geometry.meshes[mesh_index].topology.layout_texture_coordinate_indices[
+                layout_id
+            ]
         )
 
     def get_normal_for_mesh_index_and_layout(
@@ -204,11 +329,65 @@ class DNA(BaseDNA):
     ) -> Point3:
         return self.geometry.meshes[mesh_index].topology.normals[layout.normal_index]
 
+    def get_geometry_reader(self, mesh_index: int) -> GeometryReader:
+        """
+        Gets the geometry reader of the mesh, from the stream reader owned by this model if it has one
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+
+        @rtype: GeometryReader
+        @returns: The geometry reader
+        """
+
+        meshes = self.geometry.meshes
+        if isinstance(meshes, LazyMeshes):
+            return get_geometry_reader(mesh_index, self.path, owner=meshes)
+        return get_geometry_reader(mesh_index, self.path)
+
     def has_blend_shapes(self, mesh_index: int) -> bool:
-        return (
-            len([bs.channel for bs in self.geometry.meshes[mesh_index].blend_shapes])
-            > 0
-        )
+        return self.get_blend_shape_target_count(mesh_index) > 0
+
+    def get_blend_shape_target_count(self, mesh_index: int) -> int:
+        mesh = self.geometry.meshes[mesh_index]
+        if mesh.blend_shapes_read:
+            return len(mesh.blend_shape_targets)
+        return self.get_geometry_reader(mesh_index).get_blend_shape_target_count()
+
+    def iter_blend_shape_targets(
+        self, mesh_index: int, chunk_size: int = 64, drop_consumed: bool = False
+    ) -> Iterator[Tuple[int, BlendShapeTargets]]:
+        """
+        Yields the blend shape targets of the mesh in bounded chunks. Targets that were not read in yet are streamed
+        from the geometry reader without being attached to the mesh, otherwise the chunks are views of the read targets.
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+
+        @type chunk_size: int
+        @param chunk_size: The maximum number of targets in a chunk
+
+        @type drop_consumed: bool
+        @param drop_consumed: A flag representing whether read targets are removed from the mesh once all chunks were consumed
+
+        @rtype: Iterator[Tuple[int, BlendShapeTargets]]
+        @returns: The index of the first target in the chunk and the targets of the chunk
+        """
+
+        mesh = self.geometry.meshes[mesh_index]
+        if not mesh.blend_shapes_read:
+            yield from self.get_geometry_reader(mesh_index).iter_blend_shape_targets(
+                chunk_size
+            )
+            return
+
+        blend_shape_targets = mesh.blend_shape_targets
+        for start in range(0, len(blend_shape_targets), chunk_size):
+            yield start, blend_shape_targets.get_targets(
+                start, min(start + chunk_size, len(blend_shape_targets))
+            )
+        if drop_consumed:
+            mesh.blend_shape_targets = BlendShapeTargets()
 
     def get_maximum_influence_per_vertex(self, mesh_index: int) -> int:
         return self.geometry.meshes[
@@ -242,6 +421,91 @@ class DNA(BaseDNA):
     def get_lod_count(self) -> int:
         return self.descriptor.lod_count
 
+    def get_psd_matrix(self) -> csr_matrix:
+        """
+        Gets the PSD matrix, the row of a PSD holds the weights of its raw control inputs
+
+        @rtype: csr_matrix
+        @returns: The (controls, controls) PSD matrix
+        """
+
+        psd = self.behavior.psd
+        if psd.matrix is None:
+            psd.matrix = BehaviorMatrix.create_psd_matrix(
+                psd, self.behavior.joints.joint_column_count
+            )
+        return psd.matrix
+
+    def get_joint_group_count(self) -> int:
+        return len(self.behavior.joints.joint_groups)
+
+    def get_joint_group(self, joint_group_index: int) -> JointGroup:
+        """
+        Gets a joint group, its matrix and output indices are created if the model was not read with them
+
+        @type joint_group_index: int
+        @param joint_group_index: The joint group index
+
+        @rtype: JointGroup
+        @returns: The joint group
+        """
+
+        joint_group = self.behavior.joints.joint_groups[joint_group_index]
+        if joint_group.matrix is None:
+            joint_group.matrix = BehaviorMatrix.create_joint_group_matrix(
+                joint_group, self.behavior.joints.joint_column_count
+            )
+            joint_group.output_indices = np.asarray(joint_group.outputs, dtype=np.int32)
+        return joint_group
+
+    def get_joint_group_row_count(self, joint_group_index: int, lod: int) -> int:
+        lods = self.behavior.joints.joint_groups[joint_group_index].lods
+        return lods[lod] if lod < len(lods) else 0
+
+    def get_joint_group_matrix(
+        self, joint_group_index: int, lod: Optional[int] = None
+    ) -> csr_matrix:
+        """
+        Gets the matrix of a joint group, or the rows of it used by a LOD as a view sharing the data of the matrix
+
+        @type joint_group_index: int
+        @param joint_group_index: The joint group index
+
+        @type lod: Optional[int]
+        @param lod: The LOD index, all rows if None
+
+        @rtype: csr_matrix
+        @returns: The (outputs, controls) matrix of the joint group
+        """
+
+        matrix = self.get_joint_group(joint_group_index).matrix
+        if lod is None:
+            return matrix
+        return BehaviorMatrix.get_row_view(
+            matrix, self.get_joint_group_row_count(joint_group_index, lod)
+        )
+
+    def get_joint_group_output_indices(
+        self, joint_group_index: int, lod: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Gets the joint row of every row of the joint group matrix
+
+        @type joint_group_index: int
+        @param joint_group_index: The joint group index
+
+        @type lod: Optional[int]
+        @param lod: The LOD index, all rows if None
+
+        @rtype: np.ndarray
+        @returns: The joint rows, a view for a LOD
+        """
+
+        output_indices = self.get_joint_group(joint_group_index).output_indices
+        if lod is None:
+            return output_indices
+        return output_indices[: self.get_joint_group_row_count(joint_group_index, lod)]
+
     def get_mesh_indices_for_lod(self, lod: int) -> List[int]:
         return self.definition.meshes.indices_for_lod[lod]
 
@@ -270,14 +534,17 @@ class DNA(BaseDNA):
     def get_blend_shapes(self, mesh_index: int) -> List[BlendShape]:
         return self.geometry.meshes[mesh_index].blend_shapes
 
+    def get_blend_shape_targets(self, mesh_index: int) -> BlendShapeTargets:
+        return self.geometry.meshes[mesh_index].blend_shape_targets
+
     def get_mesh_data(self, mesh_index: int) -> Mesh:
         return self.geometry.meshes[mesh_index]
 
     def get_mesh_id_from_mesh_name(self, mesh_name: str) -> Optional[int]:
-        for mesh_id, mesh in enumerate(self.geometry.meshes.values()):
-            if mesh.name == mesh_name:
+        for mesh_id, name in enumerate(self.definition.meshes.names):
+            if name == mesh_name:
                 return mesh_id
         return None
 
     def get_mesh_count(self) -> int:
-        return len(self.geometry.meshes.values())
+        return len(self.definition.meshes.names)
@@ -1,5 +1,22 @@
+import threading
 from dataclasses import dataclass, field
-from typing import Dict, List
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Union,
+)
+
+import numpy as np
+
+from ..util.error import DNAViewerError
 
 
 @dataclass
@@ -64,34 +81,168 @@ class Layout:
     normal_index: int = field(default=0)
 
 
+class Point3ArrayView(Sequence):
+    """
+    A read-only sequence of Point3 objects backed by an (N, 3) array, used by code that still indexes .x/.y/.z
+
+    Attributes
+    ----------
+    @type array: np.ndarray
+    @param array: The (N, 3) array holding the x, y and z values
+    """
+
+    def __init__(self, array: np.ndarray) -> None:
+        self.array = array
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Point3, "Point3ArrayView"]:
+        if isinstance(index, slice):
+            return Point3ArrayView(self.array[index])
+        x, y, z = self.array[index]
+        return Point3(x=float(x), y=float(y), z=float(z))
+
+
+class UVArrayView(Sequence):
+    """
+    A read-only sequence of UV objects backed by an (M, 2) array, used by code that still indexes .u/.v
+
+    Attributes
+    ----------
+    @type array: np.ndarray
+    @param array: The (M, 2) array holding the u and v values
+    """
+
+    def __init__(self, array: np.ndarray) -> None:
+        self.array = array
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[UV, "UVArrayView"]:
+        if isinstance(index, slice):
+            return UVArrayView(self.array[index])
+        u, v = self.array[index]
+        return UV(u=float(u), v=float(v))
+
+
+class LayoutArrayView(Sequence):
+    """
+    A read-only sequence of Layout objects backed by an (L, 3) array, used by code that still accesses layouts one by one
+
+    Attributes
+    ----------
+    @type array: np.ndarray
+    @param array: The (L, 3) array holding the position, texture coordinate and normal indices
+    """
+
+    def __init__(self, array: np.ndarray) -> None:
+        self.array = array
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Layout, "LayoutArrayView"]:
+        if isinstance(index, slice):
+            return LayoutArrayView(self.array[index])
+        position_index, texture_coordinate_index, normal_index = self.array[index]
+        return Layout(
+            position_index=int(position_index),
+            texture_coordinate_index=int(texture_coordinate_index),
+            normal_index=int(normal_index),
+        )
+
+
 @dataclass
 class Topology:
     """
-    A model class for holding data about the topology
+    A model class for holding data about the topology, stored column-wise in NumPy arrays
 
     Attributes
     ----------
-    @type positions: List[Point3]
-    @param positions: List of points in space representing the positions
+    @type position_array: np.ndarray
+    @param position_array: (N, 3) float32 array of the vertex positions
+
+    @type texture_coordinate_array: np.ndarray
+    @param texture_coordinate_array: (M, 2) float32 array of the texture coordinates
 
-    @type texture_coordinates: List[UV]
-    @param texture_coordinates: List of UVs representing the positions
+    @type normal_array: np.ndarray
+    @param normal_array: (K, 3) float32 array of the vertex normals
 
-    @type normals: List[Point3]
-    @param normals: List of 3 dimensional vectors representing the normals
+    @type layout_array: np.ndarray
+    @param layout_array: (L, 3) uint32 array of position, texture coordinate and normal indices per layout
 
-    @type layouts: List[Layout]
-    @param layouts: The list of Layout mappings
+    @type face_layout_array: np.ndarray
+    @param face_layout_array: (V,) uint32 array of the layout indices of all face vertices, face after face
 
-    @type face_vertex_layouts: List[List[int]]
-    @param face_vertex_layouts: List of face vertex layout indices by face index
+    @type face_offsets: np.ndarray
+    @param face_offsets: (F + 1,) uint32 array of the start offsets of each face's layout indices
     """
 
-    positions: List[Point3] = field(default_factory=list)
-    texture_coordinates: List[UV] = field(default_factory=list)
-    normals: List[Point3] = field(default_factory=list)
-    layouts: List[Layout] = field(default_factory=list)
-    face_vertex_layouts: List[List[int]] = field(default_factory=list)
+    position_array: np.ndarray = field(
+        default_factory=partial(np.zeros, (0, 3), dtype=np.float32)
+    )
+    texture_coordinate_array: np.ndarray = field(
+        default_factory=partial(np.zeros, (0, 2), dtype=np.float32)
+    )
+    normal_array: np.ndarray = field(
+        default_factory=partial(np.zeros, (0, 3), dtype=np.float32)
+    )
+    layout_array: np.ndarray = field(
+        default_factory=partial(np.zeros, (0, 3), dtype=np.uint32)
+    )
+    face_layout_array: np.ndarray = field(
+        default_factory=partial(np.zeros, 0, dtype=np.uint32)
+    )
+    face_offsets: np.ndarray = field(
+        default_factory=partial(np.zeros, 1, dtype=np.uint32)
+    )
+
+    @property
+    def positions(self) -> Point3ArrayView:
+        return Point3ArrayView(self.position_array)
+
+    @property
+    def texture_coordinates(self) -> UVArrayView:
+        return UVArrayView(self.texture_coordinate_array)
+
+    @property
+    def normals(self) -> Point3ArrayView:
+        return Point3ArrayView(self.normal_array)
+
+    @property
+    def layouts(self) -> LayoutArrayView:
+        return LayoutArrayView(self.layout_array)
+
+    @property
+    def face_vertex_layouts(self) -> List[List[int]]:
+        """
+        The face vertex layout indices by face index, built on access for code that still iterates faces one by one
+
+        @rtype: List[List[int]]
+        @returns: List of face vertex layout indices by face index
+        """
+
+        layouts = self.face_layout_array.tolist()
+        offsets = self.face_offsets.tolist()
+        return [layouts[start:end] for start, end in zip(offsets, offsets[1:])]
+
+    @property
+    def face_sizes(self) -> np.ndarray:
+        return np.diff(self.face_offsets)
+
+    @property
+    def layout_position_indices(self) -> np.ndarray:
+        return self.layout_array[:, 0]
+
+    @property
+    def layout_texture_coordinate_indices(self) -> np.ndarray:
+        return self.layout_array[:, 1]
+
+    @property
+    def layout_normal_indices(self) -> np.ndarray:
+        return self.layout_array[:, 2]
 
 
 @dataclass
@@ -104,12 +255,138 @@ class BlendShape:
     @type channel: int
     @param channel: The index pointing to the blend shape name
 
-    @type deltas: Dict[int, Point3]
-    @param deltas: A mapping of blend shape indices to the coordinate differences that are made by the blend shape
+    @type vertex_indices: np.ndarray
+    @param vertex_indices: (D,) uint32 array of the vertex indices affected by the blend shape
+
+    @type delta_array: np.ndarray
+    @param delta_array: (D, 3) float32 array of the coordinate differences that are made by the blend shape
     """
 
     channel: int = field(default=None)
-    deltas: Dict[int, Point3] = field(default_factory=dict)
+    vertex_indices: np.ndarray = field(
+        default_factory=partial(np.zeros, 0, dtype=np.uint32)
+    )
+    delta_array: np.ndarray = field(
+        default_factory=partial(np.zeros, (0, 3), dtype=np.float32)
+    )
+
+    @property
+    def deltas(self) -> Dict[int, Point3]:
+        """
+        A mapping of vertex indices to the coordinate differences, built on access for code that still expects it
+
+        @rtype: Dict[int, Point3]
+        @returns: Mapping of vertex indices to deltas
+        """
+
+        return {
+            vertex_index: Point3(x=x, y=y, z=z)
+            for vertex_index, (x, y, z) in zip(
+                self.vertex_indices.tolist(), self.delta_array.tolist()
+            )
+        }
+
+
+@dataclass
+class BlendShapeTargets:
+    """
+    A model class for holding all blend shape targets of a mesh in a sparse, CSR-like layout.
+    The deltas of target i are stored in the rows offsets[i]:offsets[i + 1] of vertex_indices and deltas.
+
+    Attributes
+    ----------
+    @type channels: np.ndarray
+    @param channels: (T,) uint16 array of the blend shape channel index of each target
+
+    @type offsets: np.ndarray
+    @param offsets: (T + 1,) uint32 array of the start offsets of each target's deltas
+
+    @type vertex_indices: np.ndarray
+    @param vertex_indices: (D,) uint32 array of the vertex indices of all deltas
+
+    @type deltas: np.ndarray
+    @param deltas: (D, 3) float32 array of all deltas
+    """
+
+    channels: np.ndarray = field(default_factory=partial(np.zeros, 0, dtype=np.uint16))
+    offsets: np.ndarray = field(default_factory=partial(np.zeros, 1, dtype=np.uint32))
+    vertex_indices: np.ndarray = field(
+        default_factory=partial(np.zeros, 0, dtype=np.uint32)
+    )
+    deltas: np.ndarray = field(
+        default_factory=partial(np.zeros, (0, 3), dtype=np.float32)
+    )
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def get_vertex_indices(self, target_index: int) -> np.ndarray:
+        """
+        Gets the vertex indices of a single target as a view into the shared array
+
+        @type target_index: int
+        @param target_index: The blend shape target index
+
+        @rtype: np.ndarray
+        @returns: (D_i,) view of the vertex indices
+        """
+
+        return self.vertex_indices[
+            self.offsets[target_index] : self.offsets[target_index + 1]
+        ]
+
+    def get_deltas(self, target_index: int) -> np.ndarray:
+        """
+        Gets the deltas of a single target as a view into the shared array
+
+        @type target_index: int
+        @param target_index: The blend shape target index
+
+        @rtype: np.ndarray
+        @returns: (D_i, 3) view of the deltas
+        """
+
+        return self.deltas[self.offsets[target_index] : self.offsets[target_index + 1]]
+
+    def get_targets(self, start: int, end: int) -> "BlendShapeTargets":
+        """
+        Gets a range of targets as a new object sharing memory with this one
+
+        @type start: int
+        @param start: The index of the first target in the range
+
+        @type end: int
+        @param end: The index after the last target in the range
+
+        @rtype: BlendShapeTargets
+        @returns: The targets in the range
+        """
+
+        first_delta = self.offsets[start]
+        last_delta = self.offsets[end]
+        return BlendShapeTargets(
+            channels=self.channels[start:end],
+            offsets=self.offsets[start : end + 1] - first_delta,
+            vertex_indices=self.vertex_indices[first_delta:last_delta],
+            deltas=self.deltas[first_delta:last_delta],
+        )
+
+    def get_blend_shape(self, target_index: int) -> BlendShape:
+        """
+        Gets a single target as a blend shape model sharing memory with this object
+
+        @type target_index: int
+        @param target_index: The blend shape target index
+
+        @rtype: BlendShape
+        @returns: The blend shape model
+        """
+
+        return BlendShape(
+            channel=int(self.channels[target_index]),
+            vertex_indices=self.get_vertex_indices(target_index),
+            delta_array=self.get_deltas(target_index),
+        )
 
 
 @dataclass
@@ -150,14 +427,163 @@ class Mesh:
     @type skin_weights: SkinWeightsData
     @param skin_weights: Data representing skin weights
 
-    @type blend_shapes: List[BlendShape]
-    @param blend_shapes: The list of blend shapes for the mesh
+    @type blend_shape_targets: BlendShapeTargets
+    @param blend_shape_targets: The sparse blend shape target data for the mesh
+
+    @type blend_shapes_read: bool
+    @param blend_shapes_read: A flag representing whether blend_shape_targets was already read from the DNA
     """
 
     name: str = field(default=None)
     topology: Topology = field(default_factory=Topology)
     skin_weights: SkinWeightsData = field(default_factory=SkinWeightsData)
-    blend_shapes: List[BlendShape] = field(default_factory=list)
+    blend_shape_targets: BlendShapeTargets = field(default_factory=BlendShapeTargets)
+    blend_shapes_read: bool = field(default=False)
+
+    @property
+    def blend_shapes(self) -> List[BlendShape]:
+        return [
+            self.blend_shape_targets.get_blend_shape(target_index)
+            for target_index in range(len(self.blend_shape_targets))
+        ]
+
+
+class LazyMeshes(MutableMapping):
+    """
+    A mapping of mesh indices to mesh models, where a mesh is read in on its first access
+
+    Attributes
+    ----------
+    @type indices: List[int]
+    @param indices: The mesh indices available in the mapping, in loading order
+
+    @type loader: Optional[Callable[[int], Mesh]]
+    @param loader: The function used for reading in the mesh with the given index, None once unloaded
+
+    @type loaded: Dict[int, Mesh]
+    @param loaded: The meshes that have already been read in
+
+    @type lock: threading.RLock
+    @param lock: Guards reading in a mesh, so a mesh accessed from several threads is only read in once
+
+    @type geometry_readers: Dict[int, Any]
+    @param geometry_readers: The geometry readers of the read in meshes, kept for streaming their blend shapes later
+
+    @type reader_factory: Optional[Callable[[int], Any]]
+    @param reader_factory: The function creating the geometry reader of a mesh, opening the stream reader if needed
+
+    @type closer: Optional[Callable[[], None]]
+    @param closer: The function dropping the stream reader the meshes are read with
+
+    @type unloaded: bool
+    @param unloaded: A flag representing whether the stream reader was dropped for good
+    """
+
+    def __init__(
+        self,
+        indices: Iterable[int],
+        loader: Callable[[int], Mesh],
+        reader_factory: Optional[Callable[[int], Any]] = None,
+        closer: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.indices: List[int] = list(dict.fromkeys(indices))
+        self.loader: Optional[Callable[[int], Mesh]] = loader
+        self.loaded: Dict[int, Mesh] = {}
+        self.lock = threading.RLock()
+        self.geometry_readers: Dict[int, Any] = {}
+        self.reader_factory = reader_factory
+        self.closer = closer
+        self.unloaded = False
+
+    def __getitem__(self, mesh_index: int) -> Mesh:
+        if mesh_index not in self.loaded:
+            with self.lock:
+                if mesh_index not in self.loaded:
+                    if mesh_index not in self.indices:
+                        raise KeyError(mesh_index)
+                    if self.loader is None:
+                        raise DNAViewerError(
+                            f"Mesh {mesh_index} was not read in before the DNA was unloaded"
+                        )
+                    self.loaded[mesh_index] = self.loader(mesh_index)
+        return self.loaded[mesh_index]
+
+    def __setitem__(self, mesh_index: int, mesh: Mesh) -> None:
+        if mesh_index not in self.indices:
+            self.indices.append(mesh_index)
+        self.loaded[mesh_index] = mesh
+
+    def __delitem__(self, mesh_index: int) -> None:
+        self.indices.remove(mesh_index)
+        self.loaded.pop(mesh_index, None)
+
+    def __contains__(self, mesh_index: object) -> bool:
+        return mesh_index in self.indices
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.indices)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def is_loaded(self, mesh_index: int) -> bool:
+        """
+        Checks if the mesh with the given index has already been read in
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+
+        @rtype: bool
+        @returns: True if the mesh was already read in
+        """
+
+        return mesh_index in self.loaded
+
+    def load_all(self) -> None:
+        """Reads in all the meshes that were not read in yet"""
+
+        for mesh_index in self.indices:
+            self[mesh_index]
+
+    def get_geometry_reader(self, mesh_index: int) -> Any:
+        """
+        Gets the geometry reader of the mesh, creating it if it was not created yet or was released
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+
+        @rtype: Any
+        @returns: The geometry reader
+        """
+
+        geometry_reader = self.geometry_readers.get(mesh_index)
+        if geometry_reader is not None:
+            return geometry_reader
+        if self.reader_factory is None or mesh_index not in self.indices:
+            state = "was unloaded" if self.unloaded else "has no stream reader"
+            raise DNAViewerError(
+                f"No geometry reader for mesh {mesh_index}, the DNA {state}"
+            )
+        return self.reader_factory(mesh_index)
+
+    def release(self) -> None:
+        """Drops the geometry readers and the stream reader, they are opened again when a mesh needs them"""
+
+        self.geometry_readers.clear()
+        if self.closer is not None:
+            self.closer()
+
+    def unload(self) -> None:
+        """Drops the geometry readers and the stream reader for good, meshes that were not read in yet can not be"""
+
+        closer = self.closer
+        self.loader = None
+        self.reader_factory = None
+        self.closer = None
+        self.unloaded = True
+        self.geometry_readers.clear()
+        if closer is not None:
+            closer()
 
 
 @dataclass
@@ -167,8 +593,8 @@ class Geometry:
 
     Attributes
     ----------
-    @type meshes: Dict[int, Mesh]
+    @type meshes: MutableMapping[int, Mesh]
     @param meshes: Mapping of mesh indices to mesh models
     """
 
-    meshes: Dict[int, Mesh] = field(default_factory=dict)
+    meshes: MutableMapping[int, Mesh] = field(default_factory=dict)
@@ -1,9 +1,77 @@
 from dataclasses import dataclass, field
-from typing import List
+from functools import partial
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
 
 from ..model.geometry import Point3
 
 
+@dataclass
+class FaceVertexArrays:
+    """
+    A model class for holding the per face vertex data of a mesh in flat arrays, ready for the bulk MFnMesh calls
+
+    Attributes
+    ----------
+    @type polygon_faces: np.ndarray
+    @param polygon_faces: (F,) int32 array of the number of vertices of each face
+
+    @type polygon_connects: np.ndarray
+    @param polygon_connects: (V,) int32 array of the vertex index of each face vertex, also used as the vertex ids of the normals
+
+    @type face_ids: np.ndarray
+    @param face_ids: (V,) int32 array of the face index of each face vertex
+
+    @type texture_coordinate_indices: np.ndarray
+    @param texture_coordinate_indices: (V,) int32 array of the DNA texture coordinate index of each face vertex
+
+    @type normals: np.ndarray
+    @param normals: (V, 3) float32 array of the normal of each face vertex
+    """
+
+    polygon_faces: np.ndarray = field(
+        default_factory=partial(np.zeros, 0, dtype=np.int32)
+    )
+    polygon_connects: np.ndarray = field(
+        default_factory=partial(np.zeros, 0, dtype=np.int32)
+    )
+    face_ids: np.ndarray = field(default_factory=partial(np.zeros, 0, dtype=np.int32))
+    texture_coordinate_indices: np.ndarray = field(
+        default_factory=partial(np.zeros, 0, dtype=np.int32)
+    )
+    normals: np.ndarray = field(
+        default_factory=partial(np.zeros, (0, 3), dtype=np.float32)
+    )
+
+
+@dataclass
+class DeformationArrays:
+    """
+    A model class for holding the data of a mesh prepared for deforming it without maya
+
+    Attributes
+    ----------
+    @type neutral: np.ndarray
+    @param neutral: (V, 3) array of the neutral vertex positions
+
+    @type blend_shape_matrix: csr_matrix
+    @param blend_shape_matrix: (V * 3, blend shape channels) matrix of the deltas of every channel, the rows are the XYZ coordinates of the vertices
+
+    @type joint_indices: np.ndarray
+    @param joint_indices: (V, K) array of the joints influencing each vertex, padded with joint 0
+
+    @type joint_weights: np.ndarray
+    @param joint_weights: (V, K) array of the skin weights of the influences, padded with 0
+    """
+
+    neutral: np.ndarray
+    blend_shape_matrix: csr_matrix
+    joint_indices: np.ndarray
+    joint_weights: np.ndarray
+
+
 @dataclass
 class Mesh:
     """
@@ -31,6 +99,30 @@ class Mesh:
 
     @type derived_mesh_names: List[str]
     @param derived_mesh_names: List of mesh names
+
+    @type face_vertex_arrays: Optional[FaceVertexArrays]
+    @param face_vertex_arrays: The per face vertex arrays, computed once per mesh
+
+    @type vertex_transform: Optional[np.ndarray]
+    @param vertex_transform: The 3x3 matrix combining the unit scale and rotation applied to DNA positions and deltas
+
+    @type vertex_position_array: Optional[np.ndarray]
+    @param vertex_position_array: The (N, 3) transformed neutral vertex positions, computed once per mesh
+
+    @type texture_coordinates: Optional[np.ndarray]
+    @param texture_coordinates: The (U, 2) welded UVs of the mesh
+
+    @type texture_coordinate_indices: Optional[np.ndarray]
+    @param texture_coordinate_indices: The (V,) UV index of each face vertex
+
+    @type face_vertex_normals: Optional[np.ndarray]
+    @param face_vertex_normals: The (V, 3) normal of each face vertex, rotated like the vertex positions
+
+    @type skin_weight_arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]
+    @param skin_weight_arrays: The offsets, joint indices and values of the skin weights
+
+    @type prepared: bool
+    @param prepared: A flag representing whether all data that does not need maya was already computed
     """
 
     dna_vertex_positions: List[Point3] = field(default_factory=list)
@@ -40,3 +132,13 @@ class Mesh:
     polygon_connects: List[int] = field(default_factory=list)
     vertex_normals: List[Point3] = field(default_factory=list)
     derived_mesh_names: List[str] = field(default_factory=list)
+    face_vertex_arrays: Optional[FaceVertexArrays] = field(default=None)
+    vertex_transform: Optional[np.ndarray] = field(default=None)
+    vertex_position_array: Optional[np.ndarray] = field(default=None)
+    texture_coordinates: Optional[np.ndarray] = field(default=None)
+    texture_coordinate_indices: Optional[np.ndarray] = field(default=None)
+    face_vertex_normals: Optional[np.ndarray] = field(default=None)
+    skin_weight_arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = field(
+        default=None
+    )
+    prepared: bool = field(default=False)
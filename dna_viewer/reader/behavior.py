@@ -1,10 +1,12 @@
 from typing import Optional
 
+import numpy as np
 from dna import BinaryStreamReader
 
 from ..model.behavior import AnimatedMapsData
 from ..model.behavior import Behavior as BehaviorModel
 from ..model.behavior import BlendShapesData, ConditionalTable, JointGroup, PSDMatrix
+from ..util.behavior_matrix import BehaviorMatrix
 
 
 class Behavior:
@@ -61,6 +63,9 @@ class Behavior:
             columns=self.reader.getPSDColumnIndices(),
             values=self.reader.getPSDValues(),
         )
+        self.behavior.psd.matrix = BehaviorMatrix.create_psd_matrix(
+            self.behavior.psd, self.reader.getJointColumnCount()
+        )
 
     def add_joints(self) -> None:
         """Reads in the joints part of the behavior"""
@@ -72,15 +77,18 @@ class Behavior:
                 self.reader.getJointVariableAttributeIndices(lod)
             )
         for joint_group_index in range(self.reader.getJointGroupCount()):
-            self.behavior.joints.joint_groups.append(
-                JointGroup(
-                    lods=self.reader.getJointGroupLODs(joint_group_index),
-                    inputs=self.reader.getJointGroupInputIndices(joint_group_index),
-                    outputs=self.reader.getJointGroupOutputIndices(joint_group_index),
-                    values=self.reader.getJointGroupValues(joint_group_index),
-                    joints=self.reader.getJointGroupJointIndices(joint_group_index),
-                )
+            joint_group = JointGroup(
+                lods=self.reader.getJointGroupLODs(joint_group_index),
+                inputs=self.reader.getJointGroupInputIndices(joint_group_index),
+                outputs=self.reader.getJointGroupOutputIndices(joint_group_index),
+                values=self.reader.getJointGroupValues(joint_group_index),
+                joints=self.reader.getJointGroupJointIndices(joint_group_index),
+            )
+            joint_group.matrix = BehaviorMatrix.create_joint_group_matrix(
+                joint_group, self.behavior.joints.joint_column_count
             )
+            joint_group.output_indices = np.asarray(joint_group.outputs, dtype=np.int32)
+            self.behavior.joints.joint_groups.append(joint_group)
 
     def add_blend_shapes(self) -> None:
         """Reads in the blend shapes part of the behavior"""
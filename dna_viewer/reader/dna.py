@@ -1,22 +1,127 @@
 import logging
-from typing import Optional
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
+from itertools import repeat
+from typing import Dict, List, Optional
 
+from dna import BinaryStreamReader
+
+from ..config.dna import DataLayer, LoadOptions
 from ..model.behavior import Behavior as BehaviorModel
 from ..model.definition import Definition as DefinitionModel
 from ..model.descriptor import Descriptor as DescriptorModel
 from ..model.dna import DNA as DNAModel
 from ..model.geometry import Geometry as GeometryModel
-from ..model.geometry import Mesh
+from ..model.geometry import LazyMeshes, Mesh
 from ..reader.behavior import Behavior as BehaviorReader
 from ..reader.definition import Definition as DefinitionReader
 from ..reader.descriptor import Descriptor as DescriptorReader
 from ..reader.geometry import Geometry as GeometryReader
+from ..util.cache import DNACache
 from ..util.reader import Reader
-from ..util.reference import set_geometry_reader
+from ..util.reference import set_geometry_reader, track_stream_reader
+
+worker_state = threading.local()
+
+
+def load_dna(
+    dna_path: str = None,
+    layers: Optional[List[DataLayer]] = None,
+    lods: Optional[List[int]] = None,
+    meshes: Optional[List[int]] = None,
+    options: Optional[LoadOptions] = None,
+    memory_mapped: Optional[bool] = None,
+    cache: Optional[bool] = None,
+    workers: Optional[int] = None,
+) -> DNAModel:
+    """
+    Loads in the DNA from the given file path
+
+    @type dna_path: str
+    @param dna_path: The path of the DNA file
+
+    @type layers: Optional[List[DataLayer]]
+    @param layers: The parts of the DNA that should be loaded, overrides the value in options
+
+    @type lods: Optional[List[int]]
+    @param lods: The LODs whose meshes should be available, overrides the value in options
+
+    @type meshes: Optional[List[int]]
+    @param meshes: The mesh indices that should be available, overrides the value in options
+
+    @type options: Optional[LoadOptions]
+    @param options: The load options, all layers with lazily read meshes if None
+
+    @type memory_mapped: Optional[bool]
+    @param memory_mapped: A flag representing whether the DNA file is memory mapped, overrides the value in options
+
+    @type cache: Optional[bool]
+    @param cache: A flag representing whether the on-disk cache is used, overrides the value in options
+
+    @type workers: Optional[int]
+    @param workers: The number of workers decoding the meshes in parallel, overrides the value in options
+
+    @rtype: DNAModel
+    @returns: An object representing the DNA data
+    """
+
+    options = replace(options) if options else LoadOptions()
+    if layers is not None:
+        options.with_layers(layers)
+    if lods is not None:
+        options.with_lods(lods)
+    if meshes is not None:
+        options.with_meshes(meshes)
+    if memory_mapped is not None:
+        options.with_memory_mapped(memory_mapped)
+    if cache is not None:
+        options.with_cache(cache)
+    if workers is not None:
+        options.with_workers(workers, options.use_processes)
+    return DNA.load_dna(path=dna_path, options=options)
+
+
+def init_mesh_worker(path: str, layer: int, memory_mapped: bool) -> None:
+    """
+    Opens the stream reader used by the current mesh decoding worker
+
+    @type path: str
+    @param path: The path of the DNA file
+
+    @type layer: int
+    @param layer: The dna.DataLayer_* value the stream reader is opened with
+
+    @type memory_mapped: bool
+    @param memory_mapped: A flag representing whether the DNA file is memory mapped
+    """
+
+    worker_state.stream_reader = Reader.create_stream_reader(
+        path, layer, memory_mapped=memory_mapped
+    )
+
+
+def read_mesh_in_worker(mesh_index: int, with_blend_shapes: bool) -> Mesh:
+    """
+    Reads the geometry for a given mesh index with the stream reader of the current worker
 
+    @type mesh_index: int
+    @param mesh_index: The mesh index
 
-def load_dna(dna_path: str = None) -> DNAModel:
-    return DNA.load_dna(path=dna_path)
+    @type with_blend_shapes: bool
+    @param with_blend_shapes: A flag representing whether the blend shapes of the mesh are read as well
+
+    @rtype: Mesh
+    @returns: Mesh data
+    """
+
+    reader = GeometryReader(
+        stream_reader=worker_state.stream_reader, mesh_index=mesh_index
+    )
+    mesh = reader.read()
+    if with_blend_shapes:
+        reader.read_blend_shapes(mesh, mesh_index)
+    return mesh
 
 
 class DNA:
@@ -25,26 +130,148 @@ class DNA:
     """
 
     @staticmethod
-    def load_dna(path: str) -> DNAModel:
+    def load_dna(path: str, options: Optional[LoadOptions] = None) -> DNAModel:
         """
         Loads in the DNA from the given file path
 
-        @type dna: DNAModel
-        @param dna: The DNA data
+        @type path: str
+        @param path: The path of the DNA file
+
+        @type options: Optional[LoadOptions]
+        @param options: The load options
 
         @rtype: DNA
         @returns: An object representing the DNA data
         """
 
         logging.info(f"loading DNA {path}")
-        reader = DNA(path)
+        options = options or LoadOptions()
+        if options.cache:
+            return DNA.load_cached_dna(path, options)
+        reader = DNA(path, options)
         return reader.read()
 
-    def __init__(self, path: str) -> None:
-        self.stream_reader = Reader.create_stream_reader(path)
+    @staticmethod
+    def load_cached_dna(path: str, options: LoadOptions) -> DNAModel:
+        """
+        Loads in the DNA from the on-disk cache. On a cache miss the whole file is decoded, including the blend shapes, and stored in the cache.
+
+        @type path: str
+        @param path: The path of the DNA file
+
+        @type options: LoadOptions
+        @param options: The load options
+
+        @rtype: DNA
+        @returns: An object representing the DNA data
+        """
+
+        cache = DNACache(
+            cache_dir=options.cache_dir or DNACache.get_default_cache_dir(),
+            max_size=options.cache_max_size,
+            max_entries=options.cache_max_entries,
+            verify=options.cache_verify,
+        )
+        dna = cache.load(path)
+        if dna is None:
+            reader = DNA(
+                path,
+                LoadOptions(
+                    lazy=False, memory_mapped=options.memory_mapped
+                ).with_workers(options.workers, options.use_processes),
+            )
+            dna = reader.read_all()
+            cache.store(path, dna)
+        dna.path = path
+        return DNA.select(dna, options)
+
+    @staticmethod
+    def select(dna: DNAModel, options: LoadOptions) -> DNAModel:
+        """
+        Drops the parts of a fully read DNA that were not requested in the load options
+
+        @type dna: DNAModel
+        @param dna: The fully read DNA data
+
+        @type options: LoadOptions
+        @param options: The load options
+
+        @rtype: DNAModel
+        @returns: The DNA data containing only the requested parts
+        """
+
+        meshes = dna.geometry.meshes
+        dna.geometry = GeometryModel()
+        if options.has_layer(DataLayer.geometry):
+            dna.geometry.meshes = {
+                mesh_index: meshes[mesh_index]
+                for mesh_index in DNA.select_mesh_indices(dna, options)
+            }
+        if not options.has_layer(DataLayer.behavior):
+            dna.behavior = None
+        if not options.has_layer(DataLayer.definition):
+            dna.definition = None
+        return dna
+
+    @staticmethod
+    def select_mesh_indices(dna: DNAModel, options: LoadOptions) -> List[int]:
+        """
+        Gets the indices of the meshes that should be available, ordered by LOD
+
+        @type dna: DNAModel
+        @param dna: The DNA data containing the descriptor and definition
+
+        @type options: LoadOptions
+        @param options: The load options containing the requested LODs and meshes
+
+        @rtype: List[int]
+        @returns: The mesh indices
+        """
+
+        lods = (
+            options.lods
+            if options.lods is not None
+            else range(dna.descriptor.lod_count)
+        )
+        mesh_indices = []
+        for lod in lods:
+            for mesh_index in dna.definition.meshes.indices_for_lod[lod]:
+                if options.meshes is None or mesh_index in options.meshes:
+                    mesh_indices.append(mesh_index)
+        return mesh_indices
+
+    def __init__(self, path: str, options: Optional[LoadOptions] = None) -> None:
+        self.options = options or LoadOptions()
+        self.layer = Reader.get_data_layer(self.options)
+        self.stream_reader: Optional[BinaryStreamReader] = Reader.create_stream_reader(
+            path, self.layer, memory_mapped=self.options.memory_mapped
+        )
+        self.stream_lock = threading.Lock()
         self.path = path
         self.dna: Optional[DNAModel] = None
 
+    def get_stream_reader(self) -> BinaryStreamReader:
+        """
+        Gets the stream reader of the DNA file, opening it again if it was released
+
+        @rtype: BinaryStreamReader
+        @returns: The stream reader
+        """
+
+        with self.stream_lock:
+            if self.stream_reader is None:
+                logging.info(f"opening the stream reader of {self.path} again")
+                self.stream_reader = Reader.create_stream_reader(
+                    self.path, self.layer, memory_mapped=self.options.memory_mapped
+                )
+            return self.stream_reader
+
+    def release_stream_reader(self) -> None:
+        """Drops the stream reader, geometry readers still in use keep it alive until they are done"""
+
+        with self.stream_lock:
+            self.stream_reader = None
+
     def read(self) -> DNAModel:
         """
         Reads in the base DNA data as well as the meshes
@@ -58,22 +285,130 @@ class DNA:
         self.load_meshes()
         return self.dna
 
+    def read_all(self) -> DNAModel:
+        """
+        Reads in the DNA data together with the blend shapes of every mesh, leaving no part to be read later
+
+        @rtype: DNAModel
+        @returns: The DNA data
+        """
+
+        self.dna = DNAModel(path=self.path)
+        self.read_base()
+        mesh_indices = self.get_mesh_indices()
+        if self.options.workers > 1:
+            self.dna.geometry.meshes = self.read_meshes_in_parallel(
+                mesh_indices, with_blend_shapes=True
+            )
+        else:
+            self.dna.geometry.meshes = {
+                mesh_index: self.read_geometry_for_mesh_index(
+                    mesh_index, with_blend_shapes=True
+                )
+                for mesh_index in mesh_indices
+            }
+        return self.dna
+
     def read_base(self) -> None:
-        """Reads in the base DNA data without the mesh data"""
+        """Reads in the base DNA data without the mesh data, skipping the layers that were not requested"""
 
         self.dna.descriptor = self.read_descriptor()
-        self.dna.definition = self.read_definition()
-        self.dna.behavior = self.read_behavior()
+        if self.options.has_layer(DataLayer.definition):
+            self.dna.definition = self.read_definition()
+        if self.options.has_layer(DataLayer.behavior):
+            self.dna.behavior = self.read_behavior()
         self.dna.geometry = GeometryModel()
 
+    def get_mesh_indices(self) -> List[int]:
+        """
+        Gets the indices of the meshes that should be available, ordered by LOD
+
+        @rtype: List[int]
+        @returns: The mesh indices
+        """
+
+        return DNA.select_mesh_indices(self.dna, self.options)
+
     def load_meshes(self) -> None:
-        """Loads all the mesh data"""
+        """
+        Loads the mesh data, if lazy loading is set the meshes are read on first access.
+        With more than one worker all meshes are read up front in parallel.
+        """
+
+        if not self.options.has_layer(DataLayer.geometry):
+            return
+
+        mesh_indices = self.get_mesh_indices()
+        self.dna.geometry.meshes = LazyMeshes(
+            indices=mesh_indices,
+            loader=self.load_mesh,
+            reader_factory=self.create_geometry_reader,
+            closer=self.release_stream_reader,
+        )
+        track_stream_reader(self.path, self.dna.geometry.meshes)
+        if self.options.workers > 1:
+            self.dna.geometry.meshes.update(self.read_meshes_in_parallel(mesh_indices))
+        elif not self.options.lazy:
+            self.dna.geometry.meshes.load_all()
+
+    def read_meshes_in_parallel(
+        self, mesh_indices: List[int], with_blend_shapes: bool = False
+    ) -> Dict[int, Mesh]:
+        """
+        Reads the geometry for the given mesh indices in a thread or process pool, where every worker opens its own stream reader
+
+        @type mesh_indices: List[int]
+        @param mesh_indices: The mesh indices
 
-        for lod in range(self.dna.descriptor.lod_count):
-            for mesh_index in self.dna.definition.meshes.indices_for_lod[lod]:
-                self.dna.geometry.meshes[mesh_index] = self.load_mesh(
-                    mesh_index=mesh_index
+        @type with_blend_shapes: bool
+        @param with_blend_shapes: A flag representing whether the blend shapes of the meshes are read as well
+
+        @rtype: Dict[int, Mesh]
+        @returns: Mapping of mesh indices to mesh data, in the order of the given mesh indices
+        """
+
+        if not mesh_indices:
+            return {}
+
+        executor_class = (
+            ProcessPoolExecutor if self.options.use_processes else ThreadPoolExecutor
+        )
+        logging.info(
+            f"reading {len(mesh_indices)} meshes with {self.options.workers} workers"
+        )
+        with executor_class(
+            max_workers=min(self.options.workers, len(mesh_indices)),
+            initializer=init_mesh_worker,
+            initargs=(self.path, self.layer, self.options.memory_mapped),
+        ) as executor:
+            meshes = list(
+                executor.map(
+                    read_mesh_in_worker, mesh_indices, repeat(with_blend_shapes)
                 )
+            )
+        return dict(zip(mesh_indices, meshes))
+
+    def create_geometry_reader(self, mesh_index: int) -> GeometryReader:
+        """
+        Creates the geometry reader of a mesh and hands it to the lazily read meshes of the DNA model, which keep it
+        for streaming the blend shapes of the mesh later. Meshes read in with their blend shapes need no reader.
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+
+        @rtype: GeometryReader
+        @returns: The geometry reader
+        """
+
+        geometry_reader = GeometryReader(
+            stream_reader=self.get_stream_reader(), mesh_index=mesh_index
+        )
+        meshes = self.dna.geometry.meshes
+        if isinstance(meshes, LazyMeshes):
+            set_geometry_reader(
+                dna_path=self.path, geometry_reader=geometry_reader, owner=meshes
+            )
+        return geometry_reader
 
     def load_mesh(self, mesh_index: int) -> Mesh:
         """
@@ -96,7 +431,7 @@ class DNA:
         @returns: Descriptor data from the DNA
         """
 
-        return DescriptorReader(self.stream_reader).read()
+        return DescriptorReader(self.get_stream_reader()).read()
 
     def read_definition(self) -> DefinitionModel:
         """
@@ -106,7 +441,7 @@ class DNA:
         @returns: Definition data from the DNA
         """
 
-        return DefinitionReader(self.stream_reader).read()
+        return DefinitionReader(self.get_stream_reader()).read()
 
     def read_behavior(self) -> BehaviorModel:
         """
@@ -116,19 +451,26 @@ class DNA:
         @returns: Descriptor data from the DNA
         """
 
-        return BehaviorReader(self.stream_reader).read()
+        return BehaviorReader(self.get_stream_reader()).read()
 
-    def read_geometry_for_mesh_index(self, mesh_index: int) -> Mesh:
+    def read_geometry_for_mesh_index(
+        self, mesh_index: int, with_blend_shapes: bool = False
+    ) -> Mesh:
         """
         Reads the geometry for a given mesh index
 
         @type mesh_index: int
         @param mesh_index: mesh index
 
+        @type with_blend_shapes: bool
+        @param with_blend_shapes: A flag representing whether the blend shapes of the mesh are read as well
+
         @rtype: Mesh
         @returns: Mesh data
         """
 
-        reader = GeometryReader(stream_reader=self.stream_reader, mesh_index=mesh_index)
-        set_geometry_reader(dna_path=self.path, geometry_reader=reader)
-        return reader.read()
+        reader = self.create_geometry_reader(mesh_index)
+        mesh = reader.read()
+        if with_blend_shapes:
+            reader.read_blend_shapes(mesh, mesh_index)
+        return mesh
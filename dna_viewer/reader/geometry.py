@@ -1,10 +1,11 @@
 import logging
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional, Sequence, Tuple
 
+import numpy as np
 from dna import BinaryStreamReader
 
 from ..const.printing import BLEND_SHAPE_PRINT_RANGE
-from ..model.geometry import UV, BlendShape, Layout, Mesh, Point3
+from ..model.geometry import BlendShapeTargets, Mesh, Point3
 
 
 class Geometry:
@@ -72,52 +73,88 @@ class Geometry:
         self.add_face_vertex_layouts()
 
     def add_face_vertex_layouts(self) -> None:
-        """Reads in the face vertex layouts"""
-
-        for face_index in range(self.reader.getFaceCount(self.mesh_index)):
-            self.mesh.topology.face_vertex_layouts.append(
-                self.reader.getFaceVertexLayoutIndices(self.mesh_index, face_index)
-            )
+        """Reads in the face vertex layouts into a single flat array with per face offsets"""
+
+        faces = [
+            self.reader.getFaceVertexLayoutIndices(self.mesh_index, face_index)
+            for face_index in range(self.reader.getFaceCount(self.mesh_index))
+        ]
+        offsets = np.zeros(len(faces) + 1, dtype=np.uint32)
+        offsets[1:] = [len(face) for face in faces]
+        np.cumsum(offsets, out=offsets)
+        self.mesh.topology.face_offsets = offsets
+        self.mesh.topology.face_layout_array = np.fromiter(
+            (layout for face in faces for layout in face),
+            dtype=np.uint32,
+            count=int(offsets[-1]),
+        )
 
     def add_layouts(self) -> None:
         """Reads in the vertex layouts"""
 
-        for layout_index in range(self.reader.getVertexLayoutCount(self.mesh_index)):
-            position_id, texture_coordinate_id, normal_id = self.reader.getVertexLayout(
-                self.mesh_index, layout_index
-            )
-            self.mesh.topology.layouts.append(
-                Layout(
-                    position_index=position_id,
-                    texture_coordinate_index=texture_coordinate_id,
-                    normal_index=normal_id,
-                )
-            )
+        position_indices = self.reader.getVertexLayoutPositionIndices(self.mesh_index)
+        layouts = np.empty((len(position_indices), 3), dtype=np.uint32)
+        layouts[:, 0] = position_indices
+        layouts[:, 1] = self.reader.getVertexLayoutTextureCoordinateIndices(
+            self.mesh_index
+        )
+        layouts[:, 2] = self.reader.getVertexLayoutNormalIndices(self.mesh_index)
+        self.mesh.topology.layout_array = layouts
 
     def add_normals(self) -> None:
         """Reads in the normals"""
 
-        for normal_index in range(self.reader.getVertexNormalCount(self.mesh_index)):
-            x, y, z = self.reader.getVertexNormal(self.mesh_index, normal_index)
-            self.mesh.topology.normals.append(Point3(x=x, y=y, z=z))
+        self.mesh.topology.normal_array = Geometry.to_vector3_array(
+            self.reader.getVertexNormalXs(self.mesh_index),
+            self.reader.getVertexNormalYs(self.mesh_index),
+            self.reader.getVertexNormalZs(self.mesh_index),
+        )
 
     def add_texture_coordinates(self) -> None:
         """Reads in the texture coordinates"""
 
-        for texture_coordinate_index in range(
-            self.reader.getVertexTextureCoordinateCount(self.mesh_index)
-        ):
-            u, v = self.reader.getVertexTextureCoordinate(
-                self.mesh_index, texture_coordinate_index
-            )
-            self.mesh.topology.texture_coordinates.append(UV(u=u, v=v))
+        us = self.reader.getVertexTextureCoordinateUs(self.mesh_index)
+        texture_coordinates = np.empty((len(us), 2), dtype=np.float32)
+        texture_coordinates[:, 0] = us
+        texture_coordinates[:, 1] = self.reader.getVertexTextureCoordinateVs(
+            self.mesh_index
+        )
+        self.mesh.topology.texture_coordinate_array = texture_coordinates
 
     def add_positions(self) -> None:
         """Reads in the vertex positions"""
 
-        for vertex_index in range(self.reader.getVertexPositionCount(self.mesh_index)):
-            x, y, z = self.reader.getVertexPosition(self.mesh_index, vertex_index)
-            self.mesh.topology.positions.append(Point3(x=x, y=y, z=z))
+        self.mesh.topology.position_array = Geometry.to_vector3_array(
+            self.reader.getVertexPositionXs(self.mesh_index),
+            self.reader.getVertexPositionYs(self.mesh_index),
+            self.reader.getVertexPositionZs(self.mesh_index),
+        )
+
+    @staticmethod
+    def to_vector3_array(
+        xs: Sequence[float], ys: Sequence[float], zs: Sequence[float]
+    ) -> np.ndarray:
+        """
+        Packs the separate x, y and z values returned by the bulk getters into a single array
+
+        @type xs: Sequence[float]
+        @param xs: The x values
+
+        @type ys: Sequence[float]
+        @param ys: The y values
+
+        @type zs: Sequence[float]
+        @param zs: The z values
+
+        @rtype: np.ndarray
+        @returns: (N, 3) float32 array of the values
+        """
+
+        result = np.empty((len(xs), 3), dtype=np.float32)
+        result[:, 0] = xs
+        result[:, 1] = ys
+        result[:, 2] = zs
+        return result
 
     def read_target_deltas(self, blend_shape_target_index: int) -> Dict[int, Point3]:
         """
@@ -127,49 +164,156 @@ class Geometry:
         @returns: Mapping of vertex indices to positions
         """
 
-        result: Dict[int, Point3] = {}
-
         vertices = self.reader.getBlendShapeTargetVertexIndices(
             self.mesh_index, blend_shape_target_index
         )
+        deltas = zip(
+            self.reader.getBlendShapeTargetDeltaXs(
+                self.mesh_index, blend_shape_target_index
+            ),
+            self.reader.getBlendShapeTargetDeltaYs(
+                self.mesh_index, blend_shape_target_index
+            ),
+            self.reader.getBlendShapeTargetDeltaZs(
+                self.mesh_index, blend_shape_target_index
+            ),
+        )
+        return {
+            vertex_index: Point3(x=x, y=y, z=z)
+            for vertex_index, (x, y, z) in zip(vertices, deltas)
+        }
 
-        blend_shape_target_delta_count = self.reader.getBlendShapeTargetDeltaCount(
-            self.mesh_index, blend_shape_target_index
+    def get_blend_shape_target_count(self, mesh_index: Optional[int] = None) -> int:
+        """
+        Gets the number of blend shape targets of the mesh
+
+        @type mesh_index: Optional[int]
+        @param mesh_index: The mesh index, the mesh of the reader if None
+
+        @rtype: int
+        @returns: The number of blend shape targets
+        """
+
+        return self.reader.getBlendShapeTargetCount(
+            self.mesh_index if mesh_index is None else mesh_index
         )
-        for delta_index in range(blend_shape_target_delta_count):
-            x, y, z = self.reader.getBlendShapeTargetDelta(
-                self.mesh_index, blend_shape_target_index, delta_index
-            )
-            result[vertices[delta_index]] = Point3(x=x, y=y, z=z)
 
-        return result
+    def read_blend_shape_targets(
+        self, mesh_index: Optional[int] = None
+    ) -> BlendShapeTargets:
+        """
+        Reads in all blend shape targets of the mesh into a single sparse structure using the bulk getters
 
-    def read_blend_shapes(self, mesh: Mesh, mesh_index: int) -> None:
+        @type mesh_index: Optional[int]
+        @param mesh_index: The mesh index, the mesh of the reader if None
+
+        @rtype: BlendShapeTargets
+        @returns: The blend shape targets of the mesh
         """
-        Reads in the blend shapes
 
-        @type mesh: Mesh
-        @param mesh: The mesh model
+        return self.read_blend_shape_target_range(
+            0, self.get_blend_shape_target_count(mesh_index), mesh_index
+        )
 
-        @type mesh_index: int
-        @param mesh_index: The mesh index
+    def iter_blend_shape_targets(
+        self, chunk_size: int
+    ) -> Iterator[Tuple[int, BlendShapeTargets]]:
+        """
+        Reads in the blend shape targets of the mesh in bounded chunks, a chunk is only read when it is requested
+
+        @type chunk_size: int
+        @param chunk_size: The maximum number of targets in a chunk
+
+        @rtype: Iterator[Tuple[int, BlendShapeTargets]]
+        @returns: The index of the first target in the chunk and the targets of the chunk
+        """
+
+        blend_shape_target_count = self.get_blend_shape_target_count()
+        for start in range(0, blend_shape_target_count, chunk_size):
+            yield start, self.read_blend_shape_target_range(
+                start, min(start + chunk_size, blend_shape_target_count)
+            )
+
+    def read_blend_shape_target_range(
+        self, start: int, end: int, mesh_index: Optional[int] = None
+    ) -> BlendShapeTargets:
         """
+        Reads in a range of blend shape targets of the mesh into a single sparse structure using the bulk getters
 
-        blend_shape_target_count = self.reader.getBlendShapeTargetCount(mesh_index)
-        for blend_shape_target_index in range(blend_shape_target_count):
+        @type start: int
+        @param start: The index of the first target in the range
+
+        @type end: int
+        @param end: The index after the last target in the range
+
+        @type mesh_index: Optional[int]
+        @param mesh_index: The mesh index, the mesh of the reader if None
+
+        @rtype: BlendShapeTargets
+        @returns: The blend shape targets in the range
+        """
+
+        if mesh_index is None:
+            mesh_index = self.mesh_index
+        blend_shape_target_count = self.get_blend_shape_target_count(mesh_index)
+        channels = np.empty(end - start, dtype=np.uint16)
+        offsets = np.zeros(end - start + 1, dtype=np.uint32)
+        for index, blend_shape_target_index in enumerate(range(start, end)):
+            channels[index] = self.reader.getBlendShapeChannelIndex(
+                mesh_index, blend_shape_target_index
+            )
+            offsets[index + 1] = self.reader.getBlendShapeTargetDeltaCount(
+                mesh_index, blend_shape_target_index
+            )
+        np.cumsum(offsets, out=offsets)
+
+        vertex_indices = np.empty(offsets[-1], dtype=np.uint32)
+        deltas = np.empty((offsets[-1], 3), dtype=np.float32)
+        for index, blend_shape_target_index in enumerate(range(start, end)):
             if (blend_shape_target_index + 1) % BLEND_SHAPE_PRINT_RANGE == 0:
                 logging.info(
                     f"\t{blend_shape_target_index + 1} / {blend_shape_target_count}"
                 )
 
-            mesh.blend_shapes.append(
-                BlendShape(
-                    channel=self.reader.getBlendShapeChannelIndex(
-                        mesh_index, blend_shape_target_index
-                    ),
-                    deltas=self.read_target_deltas(blend_shape_target_index),
-                )
+            rows = slice(offsets[index], offsets[index + 1])
+            if rows.start == rows.stop:
+                continue
+            vertex_indices[rows] = self.reader.getBlendShapeTargetVertexIndices(
+                mesh_index, blend_shape_target_index
+            )
+            deltas[rows, 0] = self.reader.getBlendShapeTargetDeltaXs(
+                mesh_index, blend_shape_target_index
+            )
+            deltas[rows, 1] = self.reader.getBlendShapeTargetDeltaYs(
+                mesh_index, blend_shape_target_index
+            )
+            deltas[rows, 2] = self.reader.getBlendShapeTargetDeltaZs(
+                mesh_index, blend_shape_target_index
             )
 
-        if blend_shape_target_count % BLEND_SHAPE_PRINT_RANGE != 0:
+        if (
+            end == blend_shape_target_count
+            and blend_shape_target_count % BLEND_SHAPE_PRINT_RANGE != 0
+        ):
             logging.info(f"\t{blend_shape_target_count} / {blend_shape_target_count}")
+
+        return BlendShapeTargets(
+            channels=channels,
+            offsets=offsets,
+            vertex_indices=vertex_indices,
+            deltas=deltas,
+        )
+
+    def read_blend_shapes(self, mesh: Mesh, mesh_index: int) -> None:
+        """
+        Reads in the blend shapes
+
+        @type mesh: Mesh
+        @param mesh: The mesh model
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+        """
+
+        mesh.blend_shape_targets = self.read_blend_shape_targets(mesh_index)
+        mesh.blend_shapes_read = True
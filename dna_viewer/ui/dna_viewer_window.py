@@ -29,7 +29,7 @@ from ..const.ui import (
     WINDOW_SIZE_WIDTH_MIN,
     WINDOW_TITLE,
 )
-from ..reader.dna import DNA
+from ..reader.dna import load_dna
 from ..ui import elements
 from ..ui import elements_creator
 reload(elements)
@@ -196,7 +196,8 @@ class DnaViewerWindow(QtWidgets.QMainWindow):
             dna_file_path = Elements.get_file_path(self.elements.select_dna_path)
 
             if dna_file_path:
-                DNA.load_dna(dna_file_path)
+                self.elements.dna = load_dna(dna_file_path)
+                self.character_config.dna = self.elements.dna
 
             self.set_progress(value=33)
 
@@ -26,6 +26,7 @@ from ..const.ui import (
     MARGIN_HEADER_TOP,
     SPACING,
 )
+from ..config.dna import DataLayer
 from ..reader.dna import load_dna
 from ..ui import build_options_widget
 reload(build_options_widget)
@@ -227,7 +228,9 @@ class ElementsCreator:
         dna_file_path = Elements.get_file_path(input)
 
         if dna_file_path:
-            self.elements.dna = load_dna(dna_file_path)
+            self.elements.dna = load_dna(
+                dna_file_path, layers=[DataLayer.descriptor, DataLayer.definition]
+            )
             lod_count = self.elements.dna.descriptor.lod_count
             meshes = self.elements.dna.definition.meshes
             self.elements.mesh_tree_list.fill_mesh_list(lod_count, meshes)
@@ -0,0 +1,635 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.format import (
+    open_memmap,
+    read_array_header_1_0,
+    read_array_header_2_0,
+    read_magic,
+)
+
+from ..config.dna import DataLayer
+from ..const.behavior import (
+    BAKE_FRAME_COLUMN,
+    BAKE_MANIFEST_NAME,
+    BAKE_MANIFEST_VERSION,
+    BAKE_NAMES_KEY,
+    BAKE_OUTPUTS,
+    BAKE_VALUES_KEY,
+    DEFAULT_BAKE_CHUNK_SIZE,
+    EVALUATION_DTYPE,
+    JOINT_ATTRIBUTE_NAMES,
+)
+from ..model.dna import DNA
+from ..reader.dna import load_dna
+from ..util.error import DNAViewerError
+from ..util.rig_logic_evaluator import RigLogicEvaluator
+
+worker_state = threading.local()
+
+
+@dataclass
+class ControlAnimation:
+    """
+    A class used to represent a control animation file, without holding its values
+
+    Attributes
+    ----------
+    @type path: str
+    @param path: The path of the .csv, .npy or .npz file
+
+    @type column_names: Optional[List[str]]
+    @param column_names: The control name of every column, the columns are in control order if None
+
+    @type frame_count: int
+    @param frame_count: The number of frames
+
+    @type column_count: int
+    @param column_count: The number of columns, including a frame column
+
+    @type chunk_size: int
+    @param chunk_size: The number of frames between two recorded offsets
+
+    @type offsets: List[int]
+    @param offsets: The byte offset of every chunk_size-th frame, of the .csv file or of the values in the .npz member
+    """
+
+    path: str = field(default=None)
+    column_names: Optional[List[str]] = field(default=None)
+    frame_count: int = field(default=0)
+    column_count: int = field(default=0)
+    chunk_size: int = field(default=DEFAULT_BAKE_CHUNK_SIZE)
+    offsets: List[int] = field(default_factory=list)
+
+
+def is_header(fields: Sequence[str]) -> bool:
+    """
+    Checks whether a row of a .csv file holds names instead of values.
+
+    @type fields: Sequence[str]
+    @param fields: The fields of the row
+
+    @rtype: bool
+    @returns: True if any of the fields is not a number
+    """
+
+    try:
+        for value in fields:
+            float(value)
+    except ValueError:
+        return True
+    return False
+
+
+def open_npz_values(
+    archive: zipfile.ZipFile,
+) -> Tuple[zipfile.ZipExtFile, Tuple[int, int], np.dtype]:
+    """
+    Opens the values member of a .npz file and reads its header, the member is left at the first value.
+
+    @type archive: zipfile.ZipFile
+    @param archive: The opened .npz file
+
+    @rtype: Tuple[zipfile.ZipExtFile, Tuple[int, int], np.dtype]
+    @returns: The opened member, the shape and the type of the values
+    """
+
+    file = archive.open(f"{BAKE_VALUES_KEY}.npy")
+    version = read_magic(file)
+    if version == (1, 0):
+        shape, fortran_order, dtype = read_array_header_1_0(file)
+    elif version == (2, 0):
+        shape, fortran_order, dtype = read_array_header_2_0(file)
+    else:
+        raise DNAViewerError(f"Unsupported .npy format version {version}")
+    if fortran_order or len(shape) != 2 or dtype.kind not in "fiu":
+        raise DNAViewerError(
+            f"The {BAKE_VALUES_KEY} of {archive.filename} have to be a C ordered (frames, controls) numeric array"
+        )
+    return file, shape, dtype
+
+
+def open_control_animation(
+    path: str, chunk_size: int = DEFAULT_BAKE_CHUNK_SIZE
+) -> ControlAnimation:
+    """
+    Opens a control animation, a .csv file with one frame per row, a .npy file with a (frames, controls) array or a
+    .npz file with a "values" array and optional "names". Only the header and the offsets needed for reading
+    frame ranges are read.
+
+    @type path: str
+    @param path: The path of the control animation
+
+    @type chunk_size: int
+    @param chunk_size: The number of frames between two recorded offsets
+
+    @rtype: ControlAnimation
+    @returns: The opened control animation
+    """
+
+    animation = ControlAnimation(path=path, chunk_size=chunk_size)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npy":
+        values = np.load(path, mmap_mode="r")
+        if values.ndim != 2:
+            raise DNAViewerError(f"{path} does not contain a (frames, controls) array")
+        animation.frame_count, animation.column_count = values.shape
+    elif extension == ".npz":
+        with zipfile.ZipFile(path) as archive:
+            file, shape, _ = open_npz_values(archive)
+            with file:
+                animation.offsets = [file.tell()]
+            animation.frame_count, animation.column_count = shape
+            if f"{BAKE_NAMES_KEY}.npy" in archive.namelist():
+                with archive.open(f"{BAKE_NAMES_KEY}.npy") as names:
+                    animation.column_names = [
+                        str(name) for name in np.load(names, allow_pickle=False)
+                    ]
+    elif extension == ".csv":
+        with open(path, "rb") as file:
+            offset = 0
+            for line in file:
+                fields = line.decode("utf-8").strip().split(",")
+                if fields == [""]:
+                    offset += len(line)
+                    continue
+                if animation.column_count == 0:
+                    animation.column_count = len(fields)
+                    if is_header(fields):
+                        animation.column_names = [name.strip() for name in fields]
+                        offset += len(line)
+                        continue
+                if animation.frame_count % chunk_size == 0:
+                    animation.offsets.append(offset)
+                animation.frame_count += 1
+                offset += len(line)
+    else:
+        raise DNAViewerError(f"Unsupported control animation format {path}")
+
+    if (
+        animation.column_names is not None
+        and len(animation.column_names) != animation.column_count
+    ):
+        raise DNAViewerError(
+            f"{path} has {len(animation.column_names)} names for {animation.column_count} columns"
+        )
+    return animation
+
+
+def read_control_frames(
+    animation: ControlAnimation, start: int, stop: int
+) -> np.ndarray:
+    """
+    Reads a range of frames of a control animation, only the rows of the range are read.
+
+    @type animation: ControlAnimation
+    @param animation: The opened control animation
+
+    @type start: int
+    @param start: The first frame
+
+    @type stop: int
+    @param stop: The frame after the last frame
+
+    @rtype: np.ndarray
+    @returns: The (stop - start, columns) values
+    """
+
+    count = stop - start
+    extension = os.path.splitext(animation.path)[1].lower()
+    if extension == ".npy":
+        values = np.load(animation.path, mmap_mode="r")[start:stop]
+    elif extension == ".npz":
+        with zipfile.ZipFile(animation.path) as archive:
+            file, shape, dtype = open_npz_values(archive)
+            with file:
+                row_size = shape[1] * dtype.itemsize
+                file.seek(animation.offsets[0] + start * row_size)
+                values = np.frombuffer(file.read(count * row_size), dtype=dtype)
+        values = values.reshape(count, shape[1])
+    else:
+        with open(animation.path, "rb") as file:
+            file.seek(animation.offsets[start // animation.chunk_size])
+            rows = (line for line in file if line.strip())
+            lines = islice(rows, start % animation.chunk_size, None)
+            values = np.loadtxt(
+                (line.decode("utf-8") for line in islice(lines, count)),
+                delimiter=",",
+                dtype=EVALUATION_DTYPE,
+                ndmin=2,
+            )
+    if len(values) != count:
+        raise DNAViewerError(
+            f"Read {len(values)} frames instead of {count} from {animation.path}"
+        )
+    return np.asarray(values, dtype=EVALUATION_DTYPE)
+
+
+def get_output_names(dna: DNA) -> Dict[str, List[str]]:
+    """
+    Gets the names of the columns of every baked output.
+
+    @type dna: DNA
+    @param dna: The DNA with the definition layer loaded
+
+    @rtype: Dict[str, List[str]]
+    @returns: Mapping of output names to the names of their columns
+    """
+
+    return {
+        "joints": [
+            f"{joint_name}.{attribute}"
+            for joint_name in dna.definition.joints.names
+            for attribute in JOINT_ATTRIBUTE_NAMES
+        ],
+        "blend_shapes": list(dna.definition.blend_shape_channels.names),
+        "animated_maps": list(dna.definition.animated_maps.names),
+    }
+
+
+def init_bake_worker(dna_path: str, lod: int) -> None:
+    """
+    Loads the behavior of the DNA and compiles the baked LOD once for the current baking worker
+
+    @type dna_path: str
+    @param dna_path: The path of the DNA file
+
+    @type lod: int
+    @param lod: The baked LOD
+    """
+
+    dna = load_dna(dna_path, layers=[DataLayer.definition, DataLayer.behavior])
+    worker_state.evaluator = RigLogicEvaluator(dna)
+    worker_state.evaluator.get_lod(lod)
+
+
+def bake_frames(
+    animation: ControlAnimation,
+    start: int,
+    stop: int,
+    column_indices: np.ndarray,
+    control_indices: np.ndarray,
+    use_gui_controls: bool,
+    lod: int,
+    output_paths: Dict[str, str],
+    output_start: int,
+) -> int:
+    """
+    Bakes a range of frames with the evaluator of the current worker and writes the outputs into their place in the
+    output files.
+
+    @type animation: ControlAnimation
+    @param animation: The opened control animation
+
+    @type start: int
+    @param start: The first frame
+
+    @type stop: int
+    @param stop: The frame after the last frame
+
+    @type column_indices: np.ndarray
+    @param column_indices: The animation columns holding control values
+
+    @type control_indices: np.ndarray
+    @param control_indices: The control index of every column in column_indices
+
+    @type use_gui_controls: bool
+    @param use_gui_controls: A flag representing whether the columns hold GUI controls instead of raw controls
+
+    @type lod: int
+    @param lod: The baked LOD
+
+    @type output_paths: Dict[str, str]
+    @param output_paths: Mapping of output names to the .npy files they are written to
+
+    @type output_start: int
+    @param output_start: The row of the first frame in the output files
+
+    @rtype: int
+    @returns: The number of baked frames
+    """
+
+    evaluator: RigLogicEvaluator = worker_state.evaluator
+    values = read_control_frames(animation, start, stop)
+    control_count = (
+        evaluator.gui_control_count if use_gui_controls else evaluator.raw_control_count
+    )
+    controls = np.zeros((len(values), control_count), dtype=evaluator.dtype)
+    controls[:, control_indices] = values[:, column_indices]
+
+    if use_gui_controls:
+        outputs = evaluator.evaluate(gui_values=controls, lod=lod)
+    else:
+        outputs = evaluator.evaluate(raw_values=controls, lod=lod)
+    for name, path in output_paths.items():
+        output = np.load(path, mmap_mode="r+")
+        output[output_start : output_start + len(values)] = getattr(outputs, name)
+        output.flush()
+        del output
+    return len(values)
+
+
+@dataclass
+class BakeResult:
+    """
+    A class used to represent the outcome of baking a control animation
+
+    Attributes
+    ----------
+    @type output_paths: Dict[str, str]
+    @param output_paths: Mapping of output names to the .npy files holding a (frames, columns) array each
+
+    @type manifest_path: str
+    @param manifest_path: The path of the manifest describing the outputs
+
+    @type frame_count: int
+    @param frame_count: The number of baked frames
+
+    @type elapsed: float
+    @param elapsed: The time spent baking in seconds
+    """
+
+    output_paths: Dict[str, str] = field(default_factory=dict)
+    manifest_path: str = field(default=None)
+    frame_count: int = field(default=0)
+    elapsed: float = field(default=0.0)
+
+
+class AnimationBaker:
+    """
+    A class used for baking control animation into per frame joint deltas, blend shape weights and animated map values
+    without Maya. The frames are read, evaluated and written in chunks by a pool of workers, every worker only holds
+    the chunk it bakes, so the memory used does not grow with the length of the animation. The outputs are .npy files
+    written in place through memory maps, so they can be memory mapped again when read.
+
+    Attributes
+    ----------
+    @type dna_path: str
+    @param dna_path: The path of the DNA file
+
+    @type output_dir: str
+    @param output_dir: The directory the outputs and the manifest are saved to
+
+    @type lod: int
+    @param lod: The baked LOD
+
+    @type use_gui_controls: bool
+    @param use_gui_controls: A flag representing whether the animation holds GUI controls instead of raw controls
+
+    @type outputs: List[str]
+    @param outputs: The names of the baked outputs, any of joints, blend_shapes and animated_maps
+
+    @type chunk_size: int
+    @param chunk_size: The number of frames baked at once by a worker
+
+    @type dna: DNA
+    @param dna: The DNA with the definition and behavior layers loaded
+
+    @type evaluator: RigLogicEvaluator
+    @param evaluator: The evaluator used for the sizes of the outputs
+    """
+
+    def __init__(
+        self,
+        dna_path: str,
+        output_dir: str,
+        lod: int = 0,
+        use_gui_controls: bool = True,
+        outputs: Sequence[str] = BAKE_OUTPUTS,
+        chunk_size: int = DEFAULT_BAKE_CHUNK_SIZE,
+    ) -> None:
+        unknown = set(outputs) - set(BAKE_OUTPUTS)
+        if unknown:
+            raise DNAViewerError(f"Unknown baking outputs {sorted(unknown)}")
+        if chunk_size < 1:
+            raise DNAViewerError(f"Chunk size has to be positive, got {chunk_size}")
+        self.dna_path = dna_path
+        self.output_dir = output_dir
+        self.lod = lod
+        self.use_gui_controls = use_gui_controls
+        self.outputs = [name for name in BAKE_OUTPUTS if name in outputs]
+        self.chunk_size = chunk_size
+        self.dna = load_dna(dna_path, layers=[DataLayer.definition, DataLayer.behavior])
+        self.evaluator = RigLogicEvaluator(self.dna)
+
+    def get_control_names(self) -> List[str]:
+        if self.use_gui_controls:
+            return list(self.dna.definition.gui_control_names)
+        return list(self.dna.definition.raw_control_names)
+
+    def get_control_mapping(
+        self, animation: ControlAnimation
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Matches the columns of the animation to controls by name, unknown columns are ignored and controls without a
+        column stay at zero. Without names the columns have to be the controls in order.
+
+        @type animation: ControlAnimation
+        @param animation: The opened control animation
+
+        @rtype: Tuple[np.ndarray, np.ndarray]
+        @returns: The animation columns holding control values and the control index of every one of them
+        """
+
+        control_names = self.get_control_names()
+        if animation.column_names is None:
+            if animation.column_count != len(control_names):
+                raise DNAViewerError(
+                    f"{animation.path} has {animation.column_count} columns without names for {len(control_names)} controls"
+                )
+            indices = np.arange(animation.column_count)
+            return indices, indices
+
+        control_indices = {name: index for index, name in enumerate(control_names)}
+        columns, controls, unknown = [], [], []
+        for column, name in enumerate(animation.column_names):
+            if name in control_indices:
+                columns.append(column)
+                controls.append(control_indices[name])
+            elif name != BAKE_FRAME_COLUMN:
+                unknown.append(name)
+        if unknown:
+            logging.warning(
+                f"Ignoring {len(unknown)} unknown control(s) in {animation.path}: {unknown[:5]}"
+            )
+        return np.array(columns, dtype=np.int64), np.array(controls, dtype=np.int64)
+
+    def get_output_widths(self) -> Dict[str, int]:
+        return {
+            "joints": self.evaluator.joint_row_count,
+            "blend_shapes": self.evaluator.blend_shape_channel_count,
+            "animated_maps": self.evaluator.animated_map_count,
+        }
+
+    def iter_chunks(self, start: int, stop: int) -> Iterator[Tuple[int, int]]:
+        for chunk_start in range(start, stop, self.chunk_size):
+            yield chunk_start, min(chunk_start + self.chunk_size, stop)
+
+    def write_manifest(
+        self,
+        animation: ControlAnimation,
+        frame_range: Tuple[int, int],
+        output_files: Dict[str, str],
+    ) -> str:
+        """
+        Writes the manifest describing the outputs, it is replaced atomically
+
+        @type animation: ControlAnimation
+        @param animation: The baked control animation
+
+        @type frame_range: Tuple[int, int]
+        @param frame_range: The baked frames
+
+        @type output_files: Dict[str, str]
+        @param output_files: Mapping of output names to their file names in the output directory
+
+        @rtype: str
+        @returns: The path of the manifest
+        """
+
+        names = get_output_names(self.dna)
+        manifest_path = os.path.join(self.output_dir, BAKE_MANIFEST_NAME)
+        temp_path = f"{manifest_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "version": BAKE_MANIFEST_VERSION,
+                    "dna_path": os.path.abspath(self.dna_path),
+                    "animation_path": os.path.abspath(animation.path),
+                    "lod": self.lod,
+                    "gui_controls": self.use_gui_controls,
+                    "frame_range": list(frame_range),
+                    "outputs": {
+                        name: {"file": output_files[name], "columns": names[name]}
+                        for name in self.outputs
+                    },
+                },
+                file,
+                indent=1,
+            )
+        os.replace(temp_path, manifest_path)
+        return manifest_path
+
+    def run(
+        self,
+        animation_path: str,
+        frame_range: Optional[Tuple[int, int]] = None,
+        workers: int = 0,
+        use_processes: bool = True,
+        progress: Callable[[int, int], None] = None,
+    ) -> BakeResult:
+        """
+        Bakes a control animation. The outputs are written to temporary files first, so they only appear once they
+        are complete.
+
+        @type animation_path: str
+        @param animation_path: The path of the .csv, .npy or .npz control animation
+
+        @type frame_range: Optional[Tuple[int, int]]
+        @param frame_range: The first frame and the frame after the last frame that are baked, all frames if None
+
+        @type workers: int
+        @param workers: The number of workers baking chunks in parallel, all CPU cores if less than 1
+
+        @type use_processes: bool
+        @param use_processes: A flag representing whether the workers are processes instead of threads
+
+        @type progress: Callable[[int, int], None]
+        @param progress: Called after every baked chunk with the number of baked frames and the total
+
+        @rtype: BakeResult
+        @returns: The outcome of the baking
+        """
+
+        start_time = time.perf_counter()
+        animation = open_control_animation(animation_path, self.chunk_size)
+        start, stop = frame_range or (0, animation.frame_count)
+        if not 0 <= start <= stop <= animation.frame_count:
+            raise DNAViewerError(
+                f"Frame range {start}-{stop} is outside of the {animation.frame_count} frames of {animation_path}"
+            )
+        column_indices, control_indices = self.get_control_mapping(animation)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        widths = self.get_output_widths()
+        output_files = {name: f"{name}.npy" for name in self.outputs}
+        temp_paths = {
+            name: os.path.join(self.output_dir, f".{name}.{uuid.uuid4().hex}.tmp")
+            for name in self.outputs
+        }
+        result = BakeResult(frame_count=stop - start)
+        try:
+            for name, path in temp_paths.items():
+                # only the header is written here, the workers fill in the rows
+                output = open_memmap(
+                    path,
+                    mode="w+",
+                    dtype=EVALUATION_DTYPE,
+                    shape=(stop - start, widths[name]),
+                )
+                del output
+
+            chunks = list(self.iter_chunks(start, stop))
+            workers = workers if workers > 0 else os.cpu_count() or 1
+            workers = max(1, min(workers, len(chunks)))
+            executor_class = (
+                ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            )
+            logging.info(
+                f"baking {stop - start} frames in {len(chunks)} chunks with {workers} workers"
+            )
+            with executor_class(
+                max_workers=workers,
+                initializer=init_bake_worker,
+                initargs=(self.dna_path, self.lod),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        bake_frames,
+                        animation,
+                        chunk_start,
+                        chunk_stop,
+                        column_indices,
+                        control_indices,
+                        self.use_gui_controls,
+                        self.lod,
+                        temp_paths,
+                        chunk_start - start,
+                    )
+                    for chunk_start, chunk_stop in chunks
+                ]
+                baked = 0
+                for future in as_completed(futures):
+                    baked += future.result()
+                    if progress is not None:
+                        progress(baked, stop - start)
+
+            for name, path in temp_paths.items():
+                result.output_paths[name] = os.path.join(
+                    self.output_dir, output_files[name]
+                )
+                os.replace(path, result.output_paths[name])
+            result.manifest_path = self.write_manifest(
+                animation, (start, stop), output_files
+            )
+        finally:
+            for path in temp_paths.values():
+                if os.path.exists(path):
+                    os.remove(path)
+
+        result.elapsed = time.perf_counter() - start_time
+        logging.info(
+            f"baked {result.frame_count} frames in {result.elapsed:.3f}s, "
+            f"{result.frame_count / max(result.elapsed, 1e-9):.0f} frames/s"
+        )
+        return result
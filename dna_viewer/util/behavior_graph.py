@@ -0,0 +1,459 @@
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix
+
+from ..const.behavior import JOINT_ATTRIBUTE_NAMES
+from ..model.behavior import BehaviorOutputs, BehaviorSelection
+from ..model.dna import DNA
+from ..util.error import DNAViewerError
+from ..util.rig_logic_evaluator import RigLogicEvaluator
+
+Index = Union[int, str]
+
+
+class BehaviorGraph:
+    """
+    A class used for querying which outputs of a LOD depend on which controls. The edges of every stage of the
+    behavior are precomputed once as sparse adjacency matrices, so a query only slices their rows.
+
+    GUI controls drive raw controls, raw controls drive PSDs, and raw controls and PSDs drive joint attributes, blend
+    shape channels and animated maps. Every query accepts indices or names.
+
+    Attributes
+    ----------
+    @type evaluator: RigLogicEvaluator
+    @param evaluator: The evaluator whose compiled behavior the graph is built from
+
+    @type lod: int
+    @param lod: The LOD index
+
+    @type gui_control_names: List[str]
+    @param gui_control_names: The names of the GUI controls
+
+    @type control_names: List[str]
+    @param control_names: The names of the raw controls, PSDs have no names and are only given by index
+
+    @type joint_attribute_names: List[str]
+    @param joint_attribute_names: The names of the joint rows, in the form of `<joint>.<attribute>`
+
+    @type blend_shape_names: List[str]
+    @param blend_shape_names: The names of the blend shape channels
+
+    @type animated_map_names: List[str]
+    @param animated_map_names: The names of the animated maps
+
+    @type name_indices: Dict[str, Dict[str, int]]
+    @param name_indices: The index of every name, by the kind of the name
+
+    @type gui_to_controls: csr_matrix
+    @param gui_to_controls: The (GUI controls, controls) edges of the gui to raw mapping
+
+    @type controls_to_psds: csr_matrix
+    @param controls_to_psds: The (controls, controls) edges from raw controls to the PSDs they feed
+
+    @type controls_to_joints: csr_matrix
+    @param controls_to_joints: The (controls, joint rows) edges of the joint matrix
+
+    @type controls_to_blend_shapes: csr_matrix
+    @param controls_to_blend_shapes: The (controls, blend shape channels) edges of the blend shape channels
+
+    @type controls_to_animated_maps: csr_matrix
+    @param controls_to_animated_maps: The (controls, animated maps) edges of the animated map conditional table
+    """
+
+    def __init__(
+        self, dna: DNA, lod: int = 0, evaluator: Optional[RigLogicEvaluator] = None
+    ) -> None:
+        self.evaluator = evaluator or RigLogicEvaluator(dna)
+        self.lod = lod
+        compiled = self.evaluator.get_lod(lod)
+        evaluator = self.evaluator
+
+        definition = dna.definition
+        self.gui_control_names: List[str] = list(definition.gui_control_names)
+        self.control_names: List[str] = list(definition.raw_control_names)
+        self.joint_attribute_names: List[str] = [
+            f"{joint}.{attribute}"
+            for joint in definition.joints.names
+            for attribute in JOINT_ATTRIBUTE_NAMES
+        ]
+        self.blend_shape_names: List[str] = list(definition.blend_shape_channels.names)
+        self.animated_map_names: List[str] = list(definition.animated_maps.names)
+        self.name_indices: Dict[str, Dict[str, int]] = {
+            kind: {name: index for index, name in enumerate(names)}
+            for kind, names in (
+                ("gui control", self.gui_control_names),
+                ("control", self.control_names),
+                ("joint attribute", self.joint_attribute_names),
+                ("blend shape channel", self.blend_shape_names),
+                ("animated map", self.animated_map_names),
+            )
+        }
+
+        gui_to_raw = evaluator.gui_to_raw
+        self.gui_to_controls = self.create_adjacency(
+            gui_to_raw.inputs,
+            gui_to_raw.output_matrix.tocsc().indices,
+            (evaluator.gui_control_count, evaluator.control_count),
+        )
+        psd_counts = np.diff(
+            np.append(evaluator.psd_starts, len(evaluator.psd_columns))
+        )
+        self.controls_to_psds = self.create_adjacency(
+            evaluator.psd_columns,
+            np.repeat(evaluator.psd_rows, psd_counts),
+            (evaluator.control_count, evaluator.control_count),
+        )
+        self.controls_to_joints = compiled.joint_matrix.T.tocsr()
+        self.controls_to_joints.data[:] = 1
+        self.controls_to_blend_shapes = self.create_adjacency(
+            compiled.blend_shape_inputs,
+            compiled.blend_shape_outputs,
+            (evaluator.control_count, evaluator.blend_shape_channel_count),
+        )
+        animated_maps = compiled.animated_maps
+        self.controls_to_animated_maps = self.create_adjacency(
+            animated_maps.inputs,
+            animated_maps.output_matrix.tocsc().indices,
+            (evaluator.control_count, evaluator.animated_map_count),
+        )
+
+        # the reverse edges, used for finding what drives an output
+        self.controls_to_gui = self.gui_to_controls.T.tocsr()
+        self.psds_to_controls = self.controls_to_psds.T.tocsr()
+        self.joints_to_controls = self.controls_to_joints.T.tocsr()
+        self.blend_shapes_to_controls = self.controls_to_blend_shapes.T.tocsr()
+        self.animated_maps_to_controls = self.controls_to_animated_maps.T.tocsr()
+
+    @staticmethod
+    def create_adjacency(
+        sources: np.ndarray, targets: np.ndarray, shape: tuple
+    ) -> csr_matrix:
+        """
+        Creates an adjacency matrix with a row per source and a column per target.
+
+        @type sources: np.ndarray
+        @param sources: The source of every edge
+
+        @type targets: np.ndarray
+        @param targets: The target of every edge
+
+        @type shape: tuple
+        @param shape: The number of sources and targets
+
+        @rtype: csr_matrix
+        @returns: The adjacency matrix, duplicate edges are merged
+        """
+
+        adjacency = coo_matrix(
+            (np.ones(len(sources), dtype=np.int8), (sources, targets)), shape=shape
+        ).tocsr()
+        adjacency.sum_duplicates()
+        adjacency.data[:] = 1
+        return adjacency
+
+    @staticmethod
+    def get_neighbours(adjacency: csr_matrix, indices: np.ndarray) -> np.ndarray:
+        """
+        Gets the sorted targets of the edges from the given sources.
+
+        @type adjacency: csr_matrix
+        @param adjacency: The adjacency matrix
+
+        @type indices: np.ndarray
+        @param indices: The sources
+
+        @rtype: np.ndarray
+        @returns: The targets
+        """
+
+        if not len(indices):
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(adjacency[indices].indices).astype(np.int64)
+
+    def get_index(self, kind: str, value: Index) -> int:
+        """
+        Gets the index of the given name or index.
+
+        @type kind: str
+        @param kind: The kind of the value, a key of name_indices
+
+        @type value: Index
+        @param value: A name or index
+
+        @rtype: int
+        @returns: The index
+        """
+
+        if isinstance(value, str):
+            names = self.name_indices[kind]
+            if value not in names:
+                raise DNAViewerError(f"There is no {kind} named {value}")
+            return names[value]
+        return int(value)
+
+    def get_indices(self, kind: str, values: Iterable[Index]) -> np.ndarray:
+        """
+        Gets the indices of the given names or indices.
+
+        @type kind: str
+        @param kind: The kind of the values, a key of name_indices
+
+        @type values: Iterable[Index]
+        @param values: Names or indices
+
+        @rtype: np.ndarray
+        @returns: The sorted indices
+        """
+
+        return np.unique(
+            np.asarray(
+                [self.get_index(kind, value) for value in values], dtype=np.int64
+            )
+        )
+
+    @staticmethod
+    def get_names(indices: np.ndarray, names: List[str]) -> List[str]:
+        """
+        Gets the names of the given indices, indices without a name (e.g. PSDs) are returned as strings.
+
+        @type indices: np.ndarray
+        @param indices: The indices
+
+        @type names: List[str]
+        @param names: The names
+
+        @rtype: List[str]
+        @returns: The names
+        """
+
+        return [names[index] if index < len(names) else str(index) for index in indices]
+
+    def get_outputs(self, controls: np.ndarray) -> BehaviorSelection:
+        """
+        Gets the outputs that directly depend on the given raw controls and PSDs.
+
+        @type controls: np.ndarray
+        @param controls: The raw control and PSD indices
+
+        @rtype: BehaviorSelection
+        @returns: The selection with empty GUI controls
+        """
+
+        return BehaviorSelection(
+            gui_controls=np.zeros(0, dtype=np.int64),
+            controls=controls,
+            joint_attributes=self.get_neighbours(self.controls_to_joints, controls),
+            blend_shapes=self.get_neighbours(self.controls_to_blend_shapes, controls),
+            animated_maps=self.get_neighbours(self.controls_to_animated_maps, controls),
+        )
+
+    def get_driven(
+        self, gui_controls: Iterable[Index] = (), controls: Iterable[Index] = ()
+    ) -> BehaviorSelection:
+        """
+        Gets everything driven by the given controls, e.g. which joint attributes move when a GUI control changes.
+
+        @type gui_controls: Iterable[Index]
+        @param gui_controls: GUI control names or indices
+
+        @type controls: Iterable[Index]
+        @param controls: Raw control names, or raw control and PSD indices
+
+        @rtype: BehaviorSelection
+        @returns: The given controls and everything they drive
+        """
+
+        gui_indices = self.get_indices("gui control", gui_controls)
+        control_indices = np.union1d(
+            self.get_indices("control", controls),
+            self.get_neighbours(self.gui_to_controls, gui_indices),
+        )
+        control_indices = np.union1d(
+            control_indices, self.get_neighbours(self.controls_to_psds, control_indices)
+        )
+        selection = self.get_outputs(control_indices)
+        selection.gui_controls = gui_indices
+        return selection
+
+    def get_drivers(
+        self,
+        joint_attributes: Iterable[Index] = (),
+        blend_shapes: Iterable[Index] = (),
+        animated_maps: Iterable[Index] = (),
+    ) -> BehaviorSelection:
+        """
+        Gets every control that drives the given outputs, e.g. which GUI controls move a joint attribute.
+
+        @type joint_attributes: Iterable[Index]
+        @param joint_attributes: Joint attribute names (e.g. `FACIAL_C_Jaw.rz`) or joint rows
+
+        @type blend_shapes: Iterable[Index]
+        @param blend_shapes: Blend shape channel names or indices
+
+        @type animated_maps: Iterable[Index]
+        @param animated_maps: Animated map names or indices
+
+        @rtype: BehaviorSelection
+        @returns: The given outputs and the raw controls, PSDs and GUI controls driving them
+        """
+
+        joint_indices = self.get_indices("joint attribute", joint_attributes)
+        blend_shape_indices = self.get_indices("blend shape channel", blend_shapes)
+        animated_map_indices = self.get_indices("animated map", animated_maps)
+
+        control_indices = np.unique(
+            np.concatenate(
+                [
+                    self.get_neighbours(self.joints_to_controls, joint_indices),
+                    self.get_neighbours(
+                        self.blend_shapes_to_controls, blend_shape_indices
+                    ),
+                    self.get_neighbours(
+                        self.animated_maps_to_controls, animated_map_indices
+                    ),
+                ]
+            )
+        )
+        control_indices = np.union1d(
+            control_indices, self.get_neighbours(self.psds_to_controls, control_indices)
+        )
+        return BehaviorSelection(
+            gui_controls=self.get_neighbours(self.controls_to_gui, control_indices),
+            controls=control_indices,
+            joint_attributes=joint_indices,
+            blend_shapes=blend_shape_indices,
+            animated_maps=animated_map_indices,
+        )
+
+
+class IncrementalEvaluation:
+    """
+    A class used for keeping the outputs of a single pose up to date while its controls are edited. Only the controls
+    that changed are propagated through the graph, so an edit recomputes the raw controls, PSDs and outputs that
+    depend on it instead of the whole behavior.
+
+    Attributes
+    ----------
+    @type graph: BehaviorGraph
+    @param graph: The dependency graph of the evaluated LOD
+
+    @type gui_values: np.ndarray
+    @param gui_values: The current GUI control values, only kept up to date while editing GUI controls
+
+    @type outputs: BehaviorOutputs
+    @param outputs: The current outputs of the pose
+    """
+
+    def __init__(
+        self,
+        graph: BehaviorGraph,
+        gui_values: Optional[np.ndarray] = None,
+        raw_values: Optional[np.ndarray] = None,
+    ) -> None:
+        self.graph = graph
+        evaluator = graph.evaluator
+        if gui_values is None and raw_values is None:
+            gui_values = np.zeros(evaluator.gui_control_count, dtype=evaluator.dtype)
+        self.gui_values = np.zeros(evaluator.gui_control_count, dtype=evaluator.dtype)
+        if gui_values is not None:
+            self.gui_values[:] = gui_values
+        self.outputs: BehaviorOutputs = evaluator.evaluate(
+            gui_values=gui_values, raw_values=raw_values, lod=graph.lod
+        )
+
+    def set_gui_values(self, values: Dict[Index, float]) -> BehaviorSelection:
+        """
+        Sets GUI control values and updates the outputs that depend on them.
+
+        @type values: Dict[Index, float]
+        @param values: The new values by GUI control name or index
+
+        @rtype: BehaviorSelection
+        @returns: The GUI controls that changed and everything recomputed because of them
+        """
+
+        graph = self.graph
+        updates = {
+            graph.get_index("gui control", key): value for key, value in values.items()
+        }
+        indices = np.asarray(list(updates.keys()), dtype=np.int64)
+        new_values = np.asarray(list(updates.values()), dtype=self.gui_values.dtype)
+        changed = np.unique(indices[self.gui_values[indices] != new_values])
+        self.gui_values[indices] = new_values
+
+        controls = graph.get_neighbours(graph.gui_to_controls, changed)
+        if len(controls):
+            self.outputs.controls[
+                controls
+            ] = graph.evaluator.evaluate_conditional_table(
+                graph.evaluator.gui_to_raw, self.gui_values[np.newaxis], controls
+            )[
+                0
+            ]
+        selection = self.update_controls(controls)
+        selection.gui_controls = changed
+        return selection
+
+    def set_raw_values(self, values: Dict[Index, float]) -> BehaviorSelection:
+        """
+        Sets raw control values and updates the outputs that depend on them. GUI control values are not kept in sync.
+
+        @type values: Dict[Index, float]
+        @param values: The new values by raw control name or index
+
+        @rtype: BehaviorSelection
+        @returns: Everything recomputed because of the raw controls that changed
+        """
+
+        graph = self.graph
+        controls = []
+        for key, value in values.items():
+            index = graph.get_index("control", key)
+            if index >= graph.evaluator.raw_control_count:
+                raise DNAViewerError(f"Control {index} is not a raw control")
+            if self.outputs.controls[index] != value:
+                self.outputs.controls[index] = value
+                controls.append(index)
+        return self.update_controls(np.unique(np.asarray(controls, dtype=np.int64)))
+
+    def update_controls(self, controls: np.ndarray) -> BehaviorSelection:
+        """
+        Updates the PSDs and outputs that depend on the given raw controls, whose values are already set.
+
+        @type controls: np.ndarray
+        @param controls: The raw controls that were recomputed
+
+        @rtype: BehaviorSelection
+        @returns: The recomputed controls and outputs
+        """
+
+        graph = self.graph
+        evaluator = graph.evaluator
+        compiled = evaluator.get_lod(graph.lod)
+        outputs = self.outputs
+
+        psds = graph.get_neighbours(graph.controls_to_psds, controls)
+        if len(psds):
+            evaluator.calculate_psd(outputs.controls[np.newaxis], psds)
+        selection = graph.get_outputs(np.union1d(controls, psds))
+
+        rows = selection.joint_attributes
+        if len(rows):
+            outputs.joints[rows] = compiled.joint_matrix[rows] @ outputs.controls
+        if len(selection.blend_shapes):
+            entries = np.isin(compiled.blend_shape_inputs, selection.controls)
+            outputs.blend_shapes[
+                compiled.blend_shape_outputs[entries]
+            ] = outputs.controls[compiled.blend_shape_inputs[entries]]
+        maps = selection.animated_maps
+        if len(maps):
+            outputs.animated_maps[maps] = np.clip(
+                evaluator.evaluate_conditional_table(
+                    compiled.animated_maps, outputs.controls[np.newaxis], maps
+                )[0],
+                0.0,
+                1.0,
+            )
+        return selection
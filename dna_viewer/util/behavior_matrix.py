@@ -0,0 +1,115 @@
+from typing import Optional
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from ..model.behavior import JointGroup, PSDMatrix
+
+
+class BehaviorMatrix:
+    """
+    A utility class containing methods for turning the matrices of the behavior into CSR matrices
+    """
+
+    @staticmethod
+    def get_column_count(indices: np.ndarray, column_count: Optional[int]) -> int:
+        """
+        Gets the column count of a matrix, grown to fit the largest index if needed.
+
+        @type indices: np.ndarray
+        @param indices: The column indices of the matrix
+
+        @type column_count: Optional[int]
+        @param column_count: The column count stored in the DNA
+
+        @rtype: int
+        @returns: The column count
+        """
+
+        return max(column_count or 0, int(indices.max()) + 1 if len(indices) else 0)
+
+    @staticmethod
+    def create_psd_matrix(psd: PSDMatrix, control_count: Optional[int]) -> csr_matrix:
+        """
+        Creates the PSD matrix with a row and a column per control. The row of a PSD holds the weights of its raw
+        control inputs, in the order they are stored in the DNA. Duplicate entries are kept, because the inputs of a
+        PSD are multiplied and not summed.
+
+        @type psd: PSDMatrix
+        @param psd: The PSD part of the behavior
+
+        @type control_count: Optional[int]
+        @param control_count: The number of raw controls and PSDs
+
+        @rtype: csr_matrix
+        @returns: The (controls, controls) PSD matrix
+        """
+
+        rows = np.asarray(psd.rows, dtype=np.int32)
+        columns = np.asarray(psd.columns, dtype=np.int32)
+        count = BehaviorMatrix.get_column_count(
+            np.concatenate([rows, columns]), control_count
+        )
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(count + 1, dtype=np.int32)
+        np.cumsum(np.bincount(rows, minlength=count), out=indptr[1:])
+        return csr_matrix(
+            (np.asarray(psd.values, dtype=np.float32)[order], columns[order], indptr),
+            shape=(count, count),
+        )
+
+    @staticmethod
+    def create_joint_group_matrix(
+        joint_group: JointGroup, column_count: Optional[int]
+    ) -> csr_matrix:
+        """
+        Creates the matrix of a joint group with a row per output of the group, in the order of its outputs, and a
+        column per control. The rows used by a LOD come first, so a LOD is a prefix of the rows.
+
+        @type joint_group: JointGroup
+        @param joint_group: The joint group
+
+        @type column_count: Optional[int]
+        @param column_count: The number of raw controls and PSDs
+
+        @rtype: csr_matrix
+        @returns: The (group outputs, controls) matrix without zero values
+        """
+
+        inputs = np.asarray(joint_group.inputs, dtype=np.int32)
+        row_count = len(joint_group.outputs)
+        values = np.asarray(joint_group.values, dtype=np.float32)
+        matrix = csr_matrix(
+            (
+                values[: row_count * len(inputs)],
+                np.tile(inputs, row_count),
+                np.arange(row_count + 1, dtype=np.int32) * len(inputs),
+            ),
+            shape=(row_count, BehaviorMatrix.get_column_count(inputs, column_count)),
+        )
+        matrix.eliminate_zeros()
+        return matrix
+
+    @staticmethod
+    def get_row_view(matrix: csr_matrix, row_count: int) -> csr_matrix:
+        """
+        Gets the first rows of a CSR matrix. Unlike slicing, the view shares the data and indices of the matrix.
+
+        @type matrix: csr_matrix
+        @param matrix: The matrix
+
+        @type row_count: int
+        @param row_count: The number of rows of the view
+
+        @rtype: csr_matrix
+        @returns: The (row count, columns) view
+        """
+
+        row_count = min(row_count, matrix.shape[0])
+        end = matrix.indptr[row_count]
+        # the arrays are set after construction, the constructor copies slices much smaller than their base array
+        view = csr_matrix((row_count, matrix.shape[1]), dtype=matrix.dtype)
+        view.data = matrix.data[:end]
+        view.indices = matrix.indices[:end]
+        view.indptr = matrix.indptr[: row_count + 1]
+        return view
@@ -0,0 +1,636 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from ..const.cache import (
+    CACHE_ARRAY_NAME_PATTERN,
+    CACHE_ARRAYS_DIR_NAME,
+    CACHE_DIR_NAME,
+    CACHE_INLINE_ARRAY_SIZE,
+    CACHE_KEY_PATTERN,
+    CACHE_LOCK_NAME,
+    CACHE_LOCK_RETRY_INTERVAL,
+    CACHE_MANIFEST_NAME,
+    CACHE_MODEL_NAME,
+    CACHE_NUMPY_MODULES,
+    CACHE_VERSION,
+    DEFAULT_CACHE_MAX_ENTRIES,
+    DEFAULT_CACHE_MAX_SIZE,
+    HASH_CHUNK_SIZE,
+)
+from ..model.behavior import (
+    AnimatedMapsData,
+    Behavior,
+    BlendShapesData,
+    ConditionalTable,
+    JointGroup,
+    JointsData,
+    PSDMatrix,
+)
+from ..model.definition import Definition, Joints, NamesAndIndices
+from ..model.descriptor import Descriptor
+from ..model.dna import DNA
+from ..model.geometry import (
+    UV,
+    BlendShape,
+    BlendShapeTargets,
+    Geometry,
+    Layout,
+    Mesh,
+    Point3,
+    SkinWeightsData,
+    Topology,
+)
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+# the classes a cached DNA model is made of, nothing else can be created when loading it
+CACHE_CLASSES = (
+    AnimatedMapsData,
+    Behavior,
+    BlendShape,
+    BlendShapesData,
+    BlendShapeTargets,
+    ConditionalTable,
+    Definition,
+    Descriptor,
+    DNA,
+    Geometry,
+    JointGroup,
+    Joints,
+    JointsData,
+    Layout,
+    Mesh,
+    NamesAndIndices,
+    Point3,
+    PSDMatrix,
+    SkinWeightsData,
+    Topology,
+    UV,
+    csr_matrix,
+    np.dtype,
+    np.ndarray,
+)
+# the functions NumPy reconstructs arrays, inline array buffers and scalars with
+CACHE_NUMPY_FUNCTIONS = (
+    np.zeros(0).__reduce__()[0],
+    np.zeros(1).__reduce_ex__(5)[0],
+    np.float32(0).__reduce__()[0],
+)
+
+
+def get_cache_globals() -> Dict[Tuple[str, str], Any]:
+    """
+    Gets the globals a cached model may refer to, by the module and name they are pickled with
+
+    @rtype: Dict[Tuple[str, str], Any]
+    @returns: Mapping of module and name pairs to the allowed objects
+    """
+
+    cache_globals = {
+        (value.__module__, value.__qualname__): value for value in CACHE_CLASSES
+    }
+    for value in CACHE_NUMPY_FUNCTIONS:
+        for module in CACHE_NUMPY_MODULES:
+            cache_globals[(module, value.__name__)] = value
+    return cache_globals
+
+
+CACHE_GLOBALS = get_cache_globals()
+
+
+def purge_cache(cache_dir: str, dna_path: str = None) -> int:
+    """
+    Removes cached DNA entries from the given cache directory.
+
+    @type cache_dir: str
+    @param cache_dir: The cache directory
+
+    @type dna_path: str
+    @param dna_path: The path of the DNA file whose entries should be removed, all entries are removed if None
+
+    @rtype: int
+    @returns: The number of removed entries
+    """
+
+    return DNACache(cache_dir).purge(dna_path)
+
+
+@dataclass
+class CacheEntry:
+    """
+    A class used to represent a single decoded DNA stored in the cache
+
+    Attributes
+    ----------
+    @type key: str
+    @param key: The key of the entry, derived from the path, size and modification time of the DNA file
+
+    @type path: str
+    @param path: The normalized path of the DNA file
+
+    @type size: int
+    @param size: The size of the DNA file in bytes
+
+    @type mtime_ns: int
+    @param mtime_ns: The modification time of the DNA file in nanoseconds
+
+    @type content_hash: str
+    @param content_hash: The SHA-256 hash of the DNA file contents
+
+    @type bytes: int
+    @param bytes: The disk space used by the entry
+
+    @type last_access: float
+    @param last_access: The time the entry was last stored or loaded, used for LRU eviction
+    """
+
+    key: str
+    path: str
+    size: int
+    mtime_ns: int
+    content_hash: str
+    bytes: int = field(default=0)
+    last_access: float = field(default=0.0)
+
+
+class ArrayPickler(pickle.Pickler):
+    """
+    A pickler that stores NumPy arrays as separate .npy files, so they can be memory mapped when loading
+
+    Attributes
+    ----------
+    @type arrays_dir: str
+    @param arrays_dir: The directory the .npy files are written to
+
+    @type array_names: Dict[int, str]
+    @param array_names: Mapping of already written array ids to their file names
+    """
+
+    def __init__(self, file: BinaryIO, arrays_dir: str) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.arrays_dir = arrays_dir
+        self.array_names: Dict[int, str] = {}
+
+    def persistent_id(self, obj: Any) -> Optional[Tuple[str, str]]:
+        if (
+            not isinstance(obj, np.ndarray)
+            or obj.dtype.hasobject
+            or obj.nbytes < CACHE_INLINE_ARRAY_SIZE
+        ):
+            return None
+        if id(obj) not in self.array_names:
+            name = f"{len(self.array_names)}.npy"
+            np.save(os.path.join(self.arrays_dir, name), obj, allow_pickle=False)
+            self.array_names[id(obj)] = name
+        return ("ndarray", self.array_names[id(obj)])
+
+
+class ArrayUnpickler(pickle.Unpickler):
+    """
+    An unpickler that memory maps the .npy files written by ArrayPickler in copy-on-write mode. Only the globals in
+    CACHE_GLOBALS can be loaded, which are the model classes, NumPy arrays and CSR matrices, and anything else is refused.
+
+    Attributes
+    ----------
+    @type arrays_dir: str
+    @param arrays_dir: The directory the .npy files are read from
+    """
+
+    def __init__(self, file: BinaryIO, arrays_dir: str) -> None:
+        super().__init__(file)
+        self.arrays_dir = arrays_dir
+
+    def find_class(self, module: str, name: str) -> Any:
+        # dotted names would let the lookup walk from an allowed module to anything it imports
+        expected = None if "." in name else CACHE_GLOBALS.get((module, name))
+        if expected is not None:
+            try:
+                value = super().find_class(module, name)
+            except (ImportError, AttributeError):
+                value = None
+            if value is expected:
+                return value
+        raise pickle.UnpicklingError(f"Refusing to load {module}.{name} from cache")
+
+    def persistent_load(self, pid: Tuple[str, str]) -> np.ndarray:
+        kind, name = pid
+        if kind != "ndarray" or not re.fullmatch(CACHE_ARRAY_NAME_PATTERN, name):
+            raise pickle.UnpicklingError(f"Unsupported persistent id {pid}")
+        return np.load(
+            os.path.join(self.arrays_dir, name), mmap_mode="c", allow_pickle=False
+        )
+
+
+class DNACache:
+    """
+    A class used for storing decoded DNA models on disk and mapping them back in on later loads.
+    Entries are keyed on the path, size and modification time of the DNA file and record its content hash.
+
+    Attributes
+    ----------
+    @type cache_dir: str
+    @param cache_dir: The directory that holds the manifest and the entries
+
+    @type max_size: int
+    @param max_size: The maximum disk space of all entries in bytes, least recently used entries are evicted above it
+
+    @type max_entries: int
+    @param max_entries: The maximum number of entries, least recently used entries are evicted above it
+
+    @type verify: bool
+    @param verify: A flag representing whether the content hash is recomputed and checked on every load
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_size: int = DEFAULT_CACHE_MAX_SIZE,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        verify: bool = False,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.max_entries = max_entries
+        self.verify = verify
+
+    @staticmethod
+    def get_default_cache_dir() -> str:
+        """
+        Gets the cache directory of the current user, shared by all DNA files, as entries are keyed on the path of the
+        DNA file. It is kept out of the directory of the DNA file, which is often shared and writable by others.
+
+        @rtype: str
+        @returns: The cache directory
+        """
+
+        base_dir = (
+            os.environ.get("LOCALAPPDATA")
+            or os.environ.get("XDG_CACHE_HOME")
+            or os.path.join(os.path.expanduser("~"), ".cache")
+        )
+        return os.path.join(base_dir, CACHE_DIR_NAME)
+
+    @staticmethod
+    def normalize_path(dna_path: str) -> str:
+        return os.path.normcase(os.path.abspath(dna_path))
+
+    @staticmethod
+    def get_key(dna_path: str, size: int, mtime_ns: int) -> str:
+        """
+        Gets the key of the entry for the given state of the DNA file
+
+        @type dna_path: str
+        @param dna_path: The normalized path of the DNA file
+
+        @type size: int
+        @param size: The size of the DNA file in bytes
+
+        @type mtime_ns: int
+        @param mtime_ns: The modification time of the DNA file in nanoseconds
+
+        @rtype: str
+        @returns: The key of the entry
+        """
+
+        return hashlib.sha1(f"{dna_path}|{size}|{mtime_ns}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def hash_file(dna_path: str) -> str:
+        """
+        Computes the SHA-256 hash of the contents of the DNA file
+
+        @type dna_path: str
+        @param dna_path: The path of the DNA file
+
+        @rtype: str
+        @returns: The hex digest of the contents
+        """
+
+        content_hash = hashlib.sha256()
+        with open(dna_path, "rb") as file:
+            for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+                content_hash.update(chunk)
+        return content_hash.hexdigest()
+
+    @staticmethod
+    def get_dir_size(path: str) -> int:
+        size = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                size += os.path.getsize(os.path.join(root, name))
+        return size
+
+    def get_manifest_path(self) -> str:
+        return os.path.join(self.cache_dir, CACHE_MANIFEST_NAME)
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """
+        Locks the manifest against other threads and processes using the same cache directory, it is held while the
+        manifest is read, changed and written back
+        """
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, CACHE_LOCK_NAME), "a+b") as file:
+            if os.name == "nt":
+                file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(CACHE_LOCK_RETRY_INTERVAL)
+                try:
+                    yield
+                finally:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+    def get_entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def read_manifest(self) -> Dict[str, CacheEntry]:
+        """
+        Reads the entries from the manifest, an unreadable or outdated manifest is treated as empty
+
+        @rtype: Dict[str, CacheEntry]
+        @returns: Mapping of keys to entries
+        """
+
+        try:
+            with open(self.get_manifest_path(), "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            logging.warning(f"Ignoring unreadable DNA cache manifest: {error}")
+            return {}
+
+        if manifest.get("version") != CACHE_VERSION:
+            return {}
+        entries = {}
+        for values in manifest.get("entries", []):
+            entry = CacheEntry(**values)
+            # the key names the entry directory, anything else could point outside of the cache
+            if not re.fullmatch(CACHE_KEY_PATTERN, str(entry.key)):
+                logging.warning(
+                    f"Ignoring DNA cache entry with invalid key {entry.key!r}"
+                )
+                continue
+            if os.path.isdir(self.get_entry_dir(entry.key)):
+                entries[entry.key] = entry
+        return entries
+
+    def write_manifest(self, entries: Dict[str, CacheEntry]) -> None:
+        """
+        Atomically replaces the manifest with the given entries
+
+        @type entries: Dict[str, CacheEntry]
+        @param entries: Mapping of keys to entries
+        """
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{self.get_manifest_path()}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "version": CACHE_VERSION,
+                    "entries": [asdict(entry) for entry in entries.values()],
+                },
+                file,
+                indent=1,
+            )
+        os.replace(temp_path, self.get_manifest_path())
+
+    def get_entries(self) -> List[CacheEntry]:
+        """
+        Gets the stored entries, most recently used first
+
+        @rtype: List[CacheEntry]
+        @returns: The stored entries
+        """
+
+        return sorted(
+            self.read_manifest().values(),
+            key=lambda entry: entry.last_access,
+            reverse=True,
+        )
+
+    def get_size(self) -> int:
+        """
+        Gets the disk space used by all entries
+
+        @rtype: int
+        @returns: The size in bytes
+        """
+
+        return sum(entry.bytes for entry in self.read_manifest().values())
+
+    def load(self, dna_path: str) -> Optional[Any]:
+        """
+        Loads the decoded model of the DNA file if the cache holds it for the current state of the file
+
+        @type dna_path: str
+        @param dna_path: The path of the DNA file
+
+        @rtype: Optional[Any]
+        @returns: The decoded model with its arrays memory mapped, None on a cache miss
+        """
+
+        path = DNACache.normalize_path(dna_path)
+        stat = os.stat(path)
+        key = DNACache.get_key(path, stat.st_size, stat.st_mtime_ns)
+        if not os.path.isfile(self.get_manifest_path()):
+            return None
+        with self.lock():
+            return self.load_entry(path, key)
+
+    def load_entry(self, path: str, key: str) -> Optional[Any]:
+        """
+        Loads the decoded model of the entry with the given key, the manifest has to be locked
+
+        @type path: str
+        @param path: The normalized path of the DNA file
+
+        @type key: str
+        @param key: The key of the entry
+
+        @rtype: Optional[Any]
+        @returns: The decoded model with its arrays memory mapped, None if the entry is missing or unreadable
+        """
+
+        entries = self.read_manifest()
+        entry = entries.get(key)
+        if entry is None:
+            return None
+
+        if self.verify and DNACache.hash_file(path) != entry.content_hash:
+            logging.info(f"DNA cache entry for {path} is outdated")
+            self.remove_entry(entries.pop(key))
+            self.write_manifest(entries)
+            return None
+
+        entry_dir = self.get_entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, CACHE_MODEL_NAME), "rb") as file:
+                model = ArrayUnpickler(
+                    file, os.path.join(entry_dir, CACHE_ARRAYS_DIR_NAME)
+                ).load()
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError) as error:
+            logging.warning(
+                f"Discarding unreadable DNA cache entry for {path}: {error}"
+            )
+            self.remove_entry(entries.pop(key))
+            self.write_manifest(entries)
+            return None
+
+        entry.last_access = time.time()
+        self.write_manifest(entries)
+        logging.info(f"loaded DNA {path} from cache {entry_dir}")
+        return model
+
+    def store(self, dna_path: str, model: Any) -> Optional[CacheEntry]:
+        """
+        Stores the decoded model of the DNA file, replacing entries of older states of the same file
+
+        @type dna_path: str
+        @param dna_path: The path of the DNA file
+
+        @type model: Any
+        @param model: The decoded model, it has to be picklable
+
+        @rtype: Optional[CacheEntry]
+        @returns: The stored entry, None if storing failed
+        """
+
+        path = DNACache.normalize_path(dna_path)
+        stat = os.stat(path)
+        key = DNACache.get_key(path, stat.st_size, stat.st_mtime_ns)
+        staging_dir = os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex}.tmp")
+        arrays_dir = os.path.join(staging_dir, CACHE_ARRAYS_DIR_NAME)
+        try:
+            os.makedirs(arrays_dir)
+            with open(os.path.join(staging_dir, CACHE_MODEL_NAME), "wb") as file:
+                ArrayPickler(file, arrays_dir).dump(model)
+            entry = CacheEntry(
+                key=key,
+                path=path,
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                content_hash=DNACache.hash_file(path),
+                bytes=DNACache.get_dir_size(staging_dir),
+                last_access=time.time(),
+            )
+            with self.lock():
+                shutil.rmtree(self.get_entry_dir(key), ignore_errors=True)
+                os.replace(staging_dir, self.get_entry_dir(key))
+                entries = self.read_manifest()
+                for stale in [
+                    value
+                    for value in entries.values()
+                    if value.path == path and value.key != key
+                ]:
+                    self.remove_entry(entries.pop(stale.key))
+                entries[key] = entry
+                self.evict_entries(entries, keep=key)
+                self.write_manifest(entries)
+        except (OSError, pickle.PicklingError) as error:
+            logging.warning(f"Could not store DNA {path} in cache: {error}")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return None
+        return entry
+
+    def remove_entry(self, entry: CacheEntry) -> None:
+        """
+        Removes the files of the entry, the manifest is not changed
+
+        @type entry: CacheEntry
+        @param entry: The entry that should be removed
+        """
+
+        shutil.rmtree(self.get_entry_dir(entry.key), ignore_errors=True)
+
+    def evict_entries(self, entries: Dict[str, CacheEntry], keep: str = None) -> None:
+        """
+        Removes the least recently used entries until the size and entry count limits are met
+
+        @type entries: Dict[str, CacheEntry]
+        @param entries: Mapping of keys to entries, changed in place
+
+        @type keep: str
+        @param keep: The key of an entry that should never be evicted
+        """
+
+        size = sum(entry.bytes for entry in entries.values())
+        for entry in sorted(entries.values(), key=lambda value: value.last_access):
+            if size <= self.max_size and len(entries) <= self.max_entries:
+                break
+            if entry.key == keep:
+                continue
+            logging.info(f"evicting DNA cache entry for {entry.path}")
+            self.remove_entry(entries.pop(entry.key))
+            size -= entry.bytes
+
+    def evict(self) -> None:
+        """Removes the least recently used entries until the size and entry count limits are met"""
+
+        with self.lock():
+            entries = self.read_manifest()
+            self.evict_entries(entries)
+            self.write_manifest(entries)
+
+    def purge(self, dna_path: str = None) -> int:
+        """
+        Removes the entries of the given DNA file, or all entries
+
+        @type dna_path: str
+        @param dna_path: The path of the DNA file whose entries should be removed, all entries are removed if None
+
+        @rtype: int
+        @returns: The number of removed entries
+        """
+
+        if not os.path.isdir(self.cache_dir):
+            return 0
+
+        with self.lock():
+            entries = self.read_manifest()
+            path = None if dna_path is None else DNACache.normalize_path(dna_path)
+            removed = [
+                entry
+                for entry in entries.values()
+                if path is None or entry.path == path
+            ]
+            for entry in removed:
+                self.remove_entry(entries.pop(entry.key))
+
+            if path is None:
+                for name in os.listdir(self.cache_dir):
+                    if name not in (CACHE_MANIFEST_NAME, CACHE_LOCK_NAME):
+                        shutil.rmtree(
+                            os.path.join(self.cache_dir, name), ignore_errors=True
+                        )
+            self.write_manifest(entries)
+        return len(removed)
@@ -0,0 +1,459 @@
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import dna
+import dnacalib
+
+from ..const.calibration import (
+    CALIBRATION_MANIFEST_NAME,
+    CALIBRATION_MANIFEST_VERSION,
+    COMMAND_CLASS_SUFFIX,
+    COMMAND_ENUM_PREFIXES,
+)
+from ..util.cache import DNACache
+from ..util.error import DNAViewerError
+from ..util.reader import Reader
+
+
+def load_command_specs(path: str) -> List[Dict[str, Any]]:
+    """
+    Loads a declarative list of DNACalib commands from a JSON or YAML file.
+
+    The file contains either a list of commands or a mapping with a "commands" list. Every command is a mapping with the
+    name of the dnacalib command class ("Scale" or "ScaleCommand"), optional positional constructor "args", and any
+    other keys are passed to the matching setters, e.g. {"command": "SetLODs", "lods": [0, 1]} calls setLODs([0, 1]).
+
+    @type path: str
+    @param path: The path of the .json, .yaml or .yml file
+
+    @rtype: List[Dict[str, Any]]
+    @returns: The command specifications
+    """
+
+    with open(path, "r", encoding="utf-8") as file:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError as error:
+                raise DNAViewerError(
+                    f"PyYAML is needed for reading {path}, use a JSON file instead"
+                ) from error
+            specs = yaml.safe_load(file)
+        else:
+            specs = json.load(file)
+
+    if isinstance(specs, dict):
+        specs = specs.get("commands")
+    if not isinstance(specs, list) or not all(
+        isinstance(spec, dict) and "command" in spec for spec in specs
+    ):
+        raise DNAViewerError(
+            f"{path} does not contain a list of commands with a 'command' name each"
+        )
+    return specs
+
+
+def get_commands_hash(specs: Sequence[Dict[str, Any]]) -> str:
+    """
+    Gets a hash of the command specifications, used for recognizing outputs created by the same commands.
+
+    @type specs: Sequence[Dict[str, Any]]
+    @param specs: The command specifications
+
+    @rtype: str
+    @returns: The SHA-256 hex digest of the specifications
+    """
+
+    return hashlib.sha256(
+        json.dumps(list(specs), sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def resolve_command_value(value: Any) -> Any:
+    """
+    Resolves names of dnacalib enum values (e.g. "VectorOperation_Add") to the values themselves.
+
+    @type value: Any
+    @param value: The value from the command specification
+
+    @rtype: Any
+    @returns: The dnacalib enum value, or the value unchanged
+    """
+
+    if isinstance(value, str) and value.startswith(COMMAND_ENUM_PREFIXES):
+        return getattr(dnacalib, value)
+    return value
+
+
+def create_command(spec: Dict[str, Any]) -> dnacalib.Command:
+    """
+    Creates a dnacalib command from its specification.
+
+    @type spec: Dict[str, Any]
+    @param spec: The command specification
+
+    @rtype: dnacalib.Command
+    @returns: The configured command
+    """
+
+    name = spec["command"]
+    if not name.endswith(COMMAND_CLASS_SUFFIX):
+        name = f"{name}{COMMAND_CLASS_SUFFIX}"
+    command_class = getattr(dnacalib, name, None)
+    if command_class is None:
+        raise DNAViewerError(f"Unknown DNACalib command {spec['command']}")
+
+    args = [resolve_command_value(arg) for arg in spec.get("args", [])]
+    command = command_class(*args)
+
+    setters = {attr.lower(): attr for attr in dir(command) if attr.startswith("set")}
+    for key, value in spec.items():
+        if key in ("command", "args"):
+            continue
+        setter = setters.get(f"set{key.replace('_', '').lower()}")
+        if setter is None:
+            raise DNAViewerError(f"{name} has no setter for '{key}'")
+        if isinstance(value, dict):
+            getattr(command, setter)(
+                *[resolve_command_value(arg) for arg in value.get("args", [])]
+            )
+        else:
+            getattr(command, setter)(resolve_command_value(value))
+    return command
+
+
+def create_command_sequence(
+    specs: Sequence[Dict[str, Any]]
+) -> dnacalib.CommandSequence:
+    """
+    Creates a command sequence from the command specifications.
+
+    @type specs: Sequence[Dict[str, Any]]
+    @param specs: The command specifications
+
+    @rtype: dnacalib.CommandSequence
+    @returns: The sequence running the commands in the given order
+    """
+
+    commands = dnacalib.CommandSequence()
+    for spec in specs:
+        commands.add(create_command(spec))
+    return commands
+
+
+def calibrate_dna(
+    input_path: str,
+    output_path: str,
+    specs: Sequence[Dict[str, Any]],
+    memory_mapped: bool = False,
+) -> None:
+    """
+    Runs the commands on a DNA file and saves the result. The output is written to a temporary file first, so it only
+    appears once it is complete.
+
+    @type input_path: str
+    @param input_path: The path of the input DNA file
+
+    @type output_path: str
+    @param output_path: The path of the calibrated DNA file
+
+    @type specs: Sequence[Dict[str, Any]]
+    @param specs: The command specifications
+
+    @type memory_mapped: bool
+    @param memory_mapped: A flag representing whether the input DNA file is memory mapped
+    """
+
+    reader = Reader.create_stream_reader(input_path, memory_mapped=memory_mapped)
+    calibrated = dnacalib.DNACalibDNAReader(reader)
+    create_command_sequence(specs).run(calibrated)
+
+    temp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        stream = dna.FileStream(
+            temp_path, dna.FileStream.AccessMode_Write, dna.FileStream.OpenMode_Binary
+        )
+        writer = dna.BinaryStreamWriter(stream)
+        writer.setFrom(calibrated)
+        writer.write()
+        if not dna.Status.isOk():
+            status = dna.Status.get()
+            raise RuntimeError(f"Error saving DNA: {status.message}")
+        # the stream is closed before the output is moved into place
+        del writer, stream
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+@dataclass
+class CalibrationEntry:
+    """
+    A class used to represent a completed output in the manifest
+
+    Attributes
+    ----------
+    @type input_path: str
+    @param input_path: The normalized path of the input DNA file
+
+    @type output_path: str
+    @param output_path: The normalized path of the calibrated DNA file
+
+    @type size: int
+    @param size: The size of the input DNA file in bytes
+
+    @type mtime_ns: int
+    @param mtime_ns: The modification time of the input DNA file in nanoseconds
+
+    @type commands_hash: str
+    @param commands_hash: The hash of the commands that created the output
+
+    @type completed_at: float
+    @param completed_at: The time the output was completed
+    """
+
+    input_path: str = field(default=None)
+    output_path: str = field(default=None)
+    size: int = field(default=0)
+    mtime_ns: int = field(default=0)
+    commands_hash: str = field(default=None)
+    completed_at: float = field(default=0.0)
+
+
+@dataclass
+class BatchCalibrationResult:
+    """
+    A class used to represent the outcome of a batch calibration
+
+    Attributes
+    ----------
+    @type completed: List[str]
+    @param completed: The input paths calibrated in this run
+
+    @type skipped: List[str]
+    @param skipped: The input paths whose outputs were already completed by an earlier run
+
+    @type failed: Dict[str, str]
+    @param failed: Mapping of input paths that could not be calibrated to the error message
+    """
+
+    completed: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+class BatchCalibration:
+    """
+    A class used for running the same DNACalib commands over many DNA files in parallel.
+    Completed outputs are recorded in a manifest in the output directory, so an interrupted or partially failed run
+    can be resumed without redoing finished files.
+
+    Attributes
+    ----------
+    @type specs: List[Dict[str, Any]]
+    @param specs: The command specifications, see load_command_specs
+
+    @type output_dir: str
+    @param output_dir: The directory the calibrated DNA files are saved to, under the name of the input file
+
+    @type manifest_path: str
+    @param manifest_path: The path of the manifest of completed outputs
+    """
+
+    def __init__(
+        self,
+        specs: Sequence[Dict[str, Any]],
+        output_dir: str,
+        manifest_path: str = None,
+    ) -> None:
+        self.specs = list(specs)
+        self.output_dir = output_dir
+        self.manifest_path = manifest_path or os.path.join(
+            output_dir, CALIBRATION_MANIFEST_NAME
+        )
+        self.commands_hash = get_commands_hash(self.specs)
+
+    def get_output_path(self, input_path: str) -> str:
+        return DNACache.normalize_path(
+            os.path.join(self.output_dir, os.path.basename(input_path))
+        )
+
+    def read_manifest(self) -> Dict[str, CalibrationEntry]:
+        """
+        Reads the completed outputs, an unreadable or outdated manifest is treated as empty
+
+        @rtype: Dict[str, CalibrationEntry]
+        @returns: Mapping of input paths to completed outputs
+        """
+
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            logging.warning(f"Ignoring unreadable calibration manifest: {error}")
+            return {}
+
+        if manifest.get("version") != CALIBRATION_MANIFEST_VERSION:
+            return {}
+        entries = [CalibrationEntry(**values) for values in manifest.get("entries", [])]
+        return {entry.input_path: entry for entry in entries}
+
+    def write_manifest(self, entries: Dict[str, CalibrationEntry]) -> None:
+        """
+        Atomically replaces the manifest with the given completed outputs
+
+        @type entries: Dict[str, CalibrationEntry]
+        @param entries: Mapping of input paths to completed outputs
+        """
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.manifest_path)), exist_ok=True)
+        temp_path = f"{self.manifest_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "version": CALIBRATION_MANIFEST_VERSION,
+                    "entries": [asdict(entry) for entry in entries.values()],
+                },
+                file,
+                indent=1,
+            )
+        os.replace(temp_path, self.manifest_path)
+
+    def is_completed(self, entry: Optional[CalibrationEntry], input_path: str) -> bool:
+        """
+        Checks whether the output of the input DNA file was completed from the same file with the same commands
+
+        @type entry: Optional[CalibrationEntry]
+        @param entry: The manifest entry of the input DNA file
+
+        @type input_path: str
+        @param input_path: The normalized path of the input DNA file
+
+        @rtype: bool
+        @returns: True if the output does not have to be created again
+        """
+
+        if entry is None:
+            return False
+        stat = os.stat(input_path)
+        return (
+            entry.size == stat.st_size
+            and entry.mtime_ns == stat.st_mtime_ns
+            and entry.commands_hash == self.commands_hash
+            and entry.output_path == self.get_output_path(input_path)
+            and os.path.isfile(entry.output_path)
+        )
+
+    def run(
+        self,
+        input_paths: Sequence[str],
+        workers: int = 0,
+        use_processes: bool = True,
+        memory_mapped: bool = False,
+        resume: bool = True,
+        progress: Callable[[int, int, str, Optional[str]], None] = None,
+    ) -> BatchCalibrationResult:
+        """
+        Calibrates the DNA files, a file that fails is reported in the result without stopping the others
+
+        @type input_paths: Sequence[str]
+        @param input_paths: The paths of the input DNA files
+
+        @type workers: int
+        @param workers: The number of workers calibrating DNA files in parallel, all CPU cores if less than 1
+
+        @type use_processes: bool
+        @param use_processes: A flag representing whether the workers are processes instead of threads
+
+        @type memory_mapped: bool
+        @param memory_mapped: A flag representing whether input DNA files are memory mapped
+
+        @type resume: bool
+        @param resume: A flag representing whether outputs completed by an earlier run are skipped
+
+        @type progress: Callable[[int, int, str, Optional[str]], None]
+        @param progress: Called after every finished file with the number of finished files, the total, the input path and the error message if it failed
+
+        @rtype: BatchCalibrationResult
+        @returns: The outcome of the batch calibration
+        """
+
+        result = BatchCalibrationResult()
+        paths = sorted({DNACache.normalize_path(path) for path in input_paths})
+        outputs = {}
+        for path in paths:
+            output_path = self.get_output_path(path)
+            if output_path in outputs:
+                raise DNAViewerError(
+                    f"{path} and {outputs[output_path]} would both be saved to {output_path}"
+                )
+            if output_path == path:
+                raise DNAViewerError(f"{path} would be overwritten by its own output")
+            outputs[output_path] = path
+
+        entries = self.read_manifest()
+        pending = []
+        for path in paths:
+            if resume and self.is_completed(entries.get(path), path):
+                result.skipped.append(path)
+            else:
+                entries.pop(path, None)
+                pending.append(path)
+        # the input is recorded as it was when the run started, a file changed meanwhile is calibrated again next time
+        states = {path: os.stat(path) for path in pending}
+
+        if not pending:
+            return result
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        workers = workers if workers > 0 else os.cpu_count() or 1
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        logging.info(f"calibrating {len(pending)} DNA files with {workers} workers")
+        with executor_class(max_workers=min(workers, len(pending))) as executor:
+            futures = {
+                executor.submit(
+                    calibrate_dna,
+                    path,
+                    self.get_output_path(path),
+                    self.specs,
+                    memory_mapped,
+                ): path
+                for path in pending
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                path = futures[future]
+                error = None
+                try:
+                    future.result()
+                except Exception as exception:
+                    error = str(exception)
+                    logging.warning(f"Could not calibrate DNA {path}: {error}")
+                    result.failed[path] = error
+                else:
+                    stat = states[path]
+                    entries[path] = CalibrationEntry(
+                        input_path=path,
+                        output_path=self.get_output_path(path),
+                        size=stat.st_size,
+                        mtime_ns=stat.st_mtime_ns,
+                        commands_hash=self.commands_hash,
+                        completed_at=time.time(),
+                    )
+                    self.write_manifest(entries)
+                    result.completed.append(path)
+                logging.info(f"\t{done} / {len(pending)}")
+                if progress is not None:
+                    progress(done, len(pending), path, error)
+
+        result.completed.sort()
+        return result
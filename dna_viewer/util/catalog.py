@@ -0,0 +1,593 @@
+import fnmatch
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import dna
+
+from ..const.catalog import (
+    BLEND_SHAPE_CHANNEL_NAME_KIND,
+    CATALOG_VERSION,
+    JOINT_NAME_KIND,
+    MESH_NAME_KIND,
+)
+from ..reader.definition import Definition as DefinitionReader
+from ..reader.descriptor import Descriptor as DescriptorReader
+from ..util.cache import DNACache
+from ..util.reader import Reader
+
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dna (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    name TEXT,
+    archetype INTEGER,
+    gender INTEGER,
+    age INTEGER,
+    db_name TEXT,
+    lod_count INTEGER,
+    db_max_lod INTEGER,
+    mesh_count INTEGER NOT NULL,
+    joint_count INTEGER NOT NULL,
+    blend_shape_channel_count INTEGER NOT NULL,
+    scanned_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dna_name (
+    dna_id INTEGER NOT NULL REFERENCES dna(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dna_name_lookup ON dna_name (kind, name);
+CREATE INDEX IF NOT EXISTS dna_name_owner ON dna_name (dna_id, kind);
+CREATE INDEX IF NOT EXISTS dna_db_name ON dna (db_name);
+"""
+
+
+@dataclass
+class CatalogRecord:
+    """
+    A class used to represent the catalogued metadata of a single DNA file
+
+    Attributes
+    ----------
+    @type path: str
+    @param path: The normalized path of the DNA file
+
+    @type size: int
+    @param size: The size of the DNA file in bytes
+
+    @type mtime_ns: int
+    @param mtime_ns: The modification time of the DNA file in nanoseconds
+
+    @type content_hash: str
+    @param content_hash: The SHA-256 hash of the DNA file contents
+
+    @type name: str
+    @param name: The name of the character
+
+    @type archetype: int
+    @param archetype: A value that represents the archetype of the character
+
+    @type gender: int
+    @param gender: A value that represents the gender of the character
+
+    @type age: int
+    @param age: The age of the character
+
+    @type db_name: str
+    @param db_name: DB identifier
+
+    @type lod_count: int
+    @param lod_count: The number of LODs
+
+    @type db_max_lod: int
+    @param db_max_lod: The greatest LOD that can be produced
+
+    @type mesh_count: int
+    @param mesh_count: The number of meshes
+
+    @type joint_count: int
+    @param joint_count: The number of joints
+
+    @type blend_shape_channel_count: int
+    @param blend_shape_channel_count: The number of blend shape channels
+
+    @type mesh_names: List[str]
+    @param mesh_names: The names of the meshes, empty if names were not requested
+
+    @type joint_names: List[str]
+    @param joint_names: The names of the joints, empty if names were not requested
+
+    @type blend_shape_channel_names: List[str]
+    @param blend_shape_channel_names: The names of the blend shape channels, empty if names were not requested
+    """
+
+    path: str = field(default=None)
+    size: int = field(default=0)
+    mtime_ns: int = field(default=0)
+    content_hash: str = field(default=None)
+    name: str = field(default=None)
+    archetype: int = field(default=None)
+    gender: int = field(default=None)
+    age: int = field(default=None)
+    db_name: str = field(default=None)
+    lod_count: int = field(default=None)
+    db_max_lod: int = field(default=None)
+    mesh_count: int = field(default=0)
+    joint_count: int = field(default=0)
+    blend_shape_channel_count: int = field(default=0)
+    mesh_names: List[str] = field(default_factory=list)
+    joint_names: List[str] = field(default_factory=list)
+    blend_shape_channel_names: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ScanResult:
+    """
+    A class used to represent the outcome of a catalog scan
+
+    Attributes
+    ----------
+    @type added: List[str]
+    @param added: The paths of newly catalogued DNA files
+
+    @type updated: List[str]
+    @param updated: The paths of DNA files that changed since the previous scan
+
+    @type unchanged: int
+    @param unchanged: The number of DNA files that were skipped because they did not change
+
+    @type removed: List[str]
+    @param removed: The paths of DNA files that no longer exist
+
+    @type failed: Dict[str, str]
+    @param failed: Mapping of paths of DNA files that could not be read to the error message
+    """
+
+    added: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    unchanged: int = field(default=0)
+    removed: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+def read_catalog_record(path: str, memory_mapped: bool = False) -> CatalogRecord:
+    """
+    Reads the descriptor and definition parts of the DNA file into a catalog record.
+
+    @type path: str
+    @param path: The path of the DNA file
+
+    @type memory_mapped: bool
+    @param memory_mapped: A flag representing whether the DNA file is memory mapped
+
+    @rtype: CatalogRecord
+    @returns: The catalog record of the DNA file
+    """
+
+    stat = os.stat(path)
+    stream_reader = Reader.create_stream_reader(
+        path, dna.DataLayer_Definition, memory_mapped=memory_mapped
+    )
+    descriptor = DescriptorReader(stream_reader).read()
+    definition = DefinitionReader(stream_reader).read()
+    return CatalogRecord(
+        path=DNACache.normalize_path(path),
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        content_hash=DNACache.hash_file(path),
+        name=descriptor.name,
+        archetype=descriptor.archetype,
+        gender=descriptor.gender,
+        age=descriptor.age,
+        db_name=descriptor.db_name,
+        lod_count=descriptor.lod_count,
+        db_max_lod=descriptor.db_max_lod,
+        mesh_count=len(definition.meshes.names),
+        joint_count=len(definition.joints.names),
+        blend_shape_channel_count=len(definition.blend_shape_channels.names),
+        mesh_names=list(definition.meshes.names),
+        joint_names=list(definition.joints.names),
+        blend_shape_channel_names=list(definition.blend_shape_channels.names),
+    )
+
+
+class Catalog:
+    """
+    A class used for indexing the metadata of DNA files in a local SQLite database
+
+    Attributes
+    ----------
+    @type db_path: str
+    @param db_path: The path of the SQLite database, ":memory:" for a temporary one
+
+    @type connection: sqlite3.Connection
+    @param connection: The connection to the database
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.create_schema()
+
+    def __enter__(self) -> "Catalog":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the connection to the database"""
+
+        self.connection.close()
+
+    def create_schema(self) -> None:
+        """Creates the tables, a database created by a different catalog version is rebuilt"""
+
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, CATALOG_VERSION):
+            logging.info(f"rebuilding DNA catalog {self.db_path}")
+            with self.connection:
+                self.connection.execute("DROP TABLE IF EXISTS dna_name")
+                self.connection.execute("DROP TABLE IF EXISTS dna")
+        with self.connection:
+            self.connection.executescript(CATALOG_SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+
+    @staticmethod
+    def find_dna_files(
+        directories: Sequence[str], pattern: str = "*.dna", recursive: bool = True
+    ) -> List[str]:
+        """
+        Finds the DNA files in the given directories
+
+        @type directories: Sequence[str]
+        @param directories: The directories that are searched
+
+        @type pattern: str
+        @param pattern: The file name pattern of DNA files
+
+        @type recursive: bool
+        @param recursive: A flag representing whether subdirectories are searched as well
+
+        @rtype: List[str]
+        @returns: The sorted normalized paths of the found DNA files
+        """
+
+        paths = set()
+        for directory in directories:
+            for root, dirs, files in os.walk(directory):
+                for name in fnmatch.filter(files, pattern):
+                    paths.add(DNACache.normalize_path(os.path.join(root, name)))
+                if not recursive:
+                    dirs.clear()
+        return sorted(paths)
+
+    def get_states(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Gets the size and modification time of every catalogued DNA file
+
+        @rtype: Dict[str, Tuple[int, int]]
+        @returns: Mapping of paths to size and modification time in nanoseconds
+        """
+
+        return {
+            row["path"]: (row["size"], row["mtime_ns"])
+            for row in self.connection.execute("SELECT path, size, mtime_ns FROM dna")
+        }
+
+    def scan(
+        self,
+        directories: Sequence[str],
+        pattern: str = "*.dna",
+        recursive: bool = True,
+        workers: int = 0,
+        use_processes: bool = True,
+        remove_missing: bool = True,
+        memory_mapped: bool = False,
+    ) -> ScanResult:
+        """
+        Scans the directories and catalogs the DNA files that are new or whose size or modification time changed
+
+        @type directories: Sequence[str]
+        @param directories: The directories that are scanned
+
+        @type pattern: str
+        @param pattern: The file name pattern of DNA files
+
+        @type recursive: bool
+        @param recursive: A flag representing whether subdirectories are scanned as well
+
+        @type workers: int
+        @param workers: The number of workers reading DNA files in parallel, all CPU cores if less than 1
+
+        @type use_processes: bool
+        @param use_processes: A flag representing whether the workers are processes instead of threads
+
+        @type remove_missing: bool
+        @param remove_missing: A flag representing whether catalogued DNA files inside the directories that no longer exist are removed
+
+        @type memory_mapped: bool
+        @param memory_mapped: A flag representing whether DNA files are memory mapped
+
+        @rtype: ScanResult
+        @returns: The outcome of the scan
+        """
+
+        result = ScanResult()
+        paths = Catalog.find_dna_files(directories, pattern, recursive)
+        states = self.get_states()
+
+        changed = []
+        for path in paths:
+            stat = os.stat(path)
+            if states.get(path) == (stat.st_size, stat.st_mtime_ns):
+                result.unchanged += 1
+            else:
+                changed.append(path)
+
+        if remove_missing:
+            roots = [
+                os.path.join(DNACache.normalize_path(directory), "")
+                for directory in directories
+            ]
+            found = set(paths)
+            for path in states:
+                if path not in found and any(path.startswith(root) for root in roots):
+                    self.remove(path)
+                    result.removed.append(path)
+
+        if not changed:
+            return result
+
+        workers = workers if workers > 0 else os.cpu_count() or 1
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        logging.info(f"cataloguing {len(changed)} DNA files with {workers} workers")
+        with executor_class(max_workers=min(workers, len(changed))) as executor:
+            futures = {
+                executor.submit(read_catalog_record, path, memory_mapped): path
+                for path in changed
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                path = futures[future]
+                try:
+                    record = future.result()
+                except Exception as error:
+                    logging.warning(f"Could not catalog DNA {path}: {error}")
+                    result.failed[path] = str(error)
+                    continue
+                (result.updated if path in states else result.added).append(path)
+                self.store(record)
+                logging.info(f"\t{done} / {len(changed)}")
+
+        result.added.sort()
+        result.updated.sort()
+        return result
+
+    def store(self, record: CatalogRecord) -> None:
+        """
+        Adds the record to the catalog, replacing the previous record of the same path
+
+        @type record: CatalogRecord
+        @param record: The catalog record
+        """
+
+        with self.connection:
+            self.connection.execute("DELETE FROM dna WHERE path = ?", (record.path,))
+            dna_id = self.connection.execute(
+                """
+                INSERT INTO dna (
+                    path, size, mtime_ns, content_hash, name, archetype, gender, age, db_name, lod_count,
+                    db_max_lod, mesh_count, joint_count, blend_shape_channel_count, scanned_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    record.path,
+                    record.size,
+                    record.mtime_ns,
+                    record.content_hash,
+                    record.name,
+                    record.archetype,
+                    record.gender,
+                    record.age,
+                    record.db_name,
+                    record.lod_count,
+                    record.db_max_lod,
+                    record.mesh_count,
+                    record.joint_count,
+                    record.blend_shape_channel_count,
+                    time.time(),
+                ),
+            ).lastrowid
+            for kind, names in (
+                (MESH_NAME_KIND, record.mesh_names),
+                (JOINT_NAME_KIND, record.joint_names),
+                (BLEND_SHAPE_CHANNEL_NAME_KIND, record.blend_shape_channel_names),
+            ):
+                self.connection.executemany(
+                    "INSERT INTO dna_name (dna_id, kind, position, name) VALUES (?, ?, ?, ?)",
+                    [
+                        (dna_id, kind, position, name)
+                        for position, name in enumerate(names)
+                    ],
+                )
+
+    def remove(self, path: str) -> bool:
+        """
+        Removes the record of the DNA file from the catalog
+
+        @type path: str
+        @param path: The path of the DNA file
+
+        @rtype: bool
+        @returns: True if the DNA file was catalogued
+        """
+
+        with self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM dna WHERE path = ?", (DNACache.normalize_path(path),)
+            )
+        return cursor.rowcount > 0
+
+    def get(self, path: str, with_names: bool = True) -> Optional[CatalogRecord]:
+        """
+        Gets the record of the DNA file
+
+        @type path: str
+        @param path: The path of the DNA file
+
+        @type with_names: bool
+        @param with_names: A flag representing whether the mesh, joint and blend shape channel names are filled in
+
+        @rtype: Optional[CatalogRecord]
+        @returns: The catalog record, None if the DNA file is not catalogued
+        """
+
+        row = self.connection.execute(
+            "SELECT * FROM dna WHERE path = ?", (DNACache.normalize_path(path),)
+        ).fetchone()
+        return None if row is None else self.to_record(row, with_names)
+
+    def find(
+        self,
+        name: str = None,
+        db_name: str = None,
+        archetype: int = None,
+        gender: int = None,
+        mesh_name: str = None,
+        joint_name: str = None,
+        blend_shape_channel_name: str = None,
+        min_joint_count: int = None,
+        max_joint_count: int = None,
+        min_mesh_count: int = None,
+        max_mesh_count: int = None,
+        min_lod_count: int = None,
+        with_names: bool = False,
+    ) -> List[CatalogRecord]:
+        """
+        Finds the catalogued DNA files matching all of the given criteria.
+        Name criteria are glob patterns (e.g. "head_lod0*"), an exact name matches only itself.
+
+        @type name: str
+        @param name: The character name pattern
+
+        @type db_name: str
+        @param db_name: The DB name pattern
+
+        @type archetype: int
+        @param archetype: The archetype value
+
+        @type gender: int
+        @param gender: The gender value
+
+        @type mesh_name: str
+        @param mesh_name: The pattern of a mesh name the DNA has to contain
+
+        @type joint_name: str
+        @param joint_name: The pattern of a joint name the DNA has to contain
+
+        @type blend_shape_channel_name: str
+        @param blend_shape_channel_name: The pattern of a blend shape channel name the DNA has to contain
+
+        @type min_joint_count: int
+        @param min_joint_count: The smallest allowed joint count
+
+        @type max_joint_count: int
+        @param max_joint_count: The largest allowed joint count
+
+        @type min_mesh_count: int
+        @param min_mesh_count: The smallest allowed mesh count
+
+        @type max_mesh_count: int
+        @param max_mesh_count: The largest allowed mesh count
+
+        @type min_lod_count: int
+        @param min_lod_count: The smallest allowed LOD count
+
+        @type with_names: bool
+        @param with_names: A flag representing whether the mesh, joint and blend shape channel names are filled in
+
+        @rtype: List[CatalogRecord]
+        @returns: The matching catalog records ordered by path
+        """
+
+        conditions = []
+        parameters: List[Any] = []
+        for column, pattern in (("name", name), ("db_name", db_name)):
+            if pattern is not None:
+                conditions.append(f"{column} GLOB ?")
+                parameters.append(pattern)
+        for column, value in (("archetype", archetype), ("gender", gender)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        for column, operator, value in (
+            ("joint_count", ">=", min_joint_count),
+            ("joint_count", "<=", max_joint_count),
+            ("mesh_count", ">=", min_mesh_count),
+            ("mesh_count", "<=", max_mesh_count),
+            ("lod_count", ">=", min_lod_count),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                parameters.append(value)
+        for kind, pattern in (
+            (MESH_NAME_KIND, mesh_name),
+            (JOINT_NAME_KIND, joint_name),
+            (BLEND_SHAPE_CHANNEL_NAME_KIND, blend_shape_channel_name),
+        ):
+            if pattern is not None:
+                conditions.append(
+                    "id IN (SELECT dna_id FROM dna_name WHERE kind = ? AND name GLOB ?)"
+                )
+                parameters.extend((kind, pattern))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.connection.execute(
+            f"SELECT * FROM dna {where} ORDER BY path", parameters
+        ).fetchall()
+        return [self.to_record(row, with_names) for row in rows]
+
+    def get_names(self, dna_id: int, kind: str) -> List[str]:
+        """
+        Gets the names of the given kind stored for a catalogued DNA file
+
+        @type dna_id: int
+        @param dna_id: The row id of the DNA file
+
+        @type kind: str
+        @param kind: One of MESH_NAME_KIND, JOINT_NAME_KIND or BLEND_SHAPE_CHANNEL_NAME_KIND
+
+        @rtype: List[str]
+        @returns: The names in their DNA order
+        """
+
+        return [
+            row["name"]
+            for row in self.connection.execute(
+                "SELECT name FROM dna_name WHERE dna_id = ? AND kind = ? ORDER BY position",
+                (dna_id, kind),
+            )
+        ]
+
+    def to_record(self, row: sqlite3.Row, with_names: bool) -> CatalogRecord:
+        record = CatalogRecord(
+            **{key: row[key] for key in row.keys() if key not in ("id", "scanned_at")}
+        )
+        if with_names:
+            record.mesh_names = self.get_names(row["id"], MESH_NAME_KIND)
+            record.joint_names = self.get_names(row["id"], JOINT_NAME_KIND)
+            record.blend_shape_channel_names = self.get_names(
+                row["id"], BLEND_SHAPE_CHANNEL_NAME_KIND
+            )
+        return record
@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 
 from maya import cmds
 from maya.api.OpenMaya import MObject
@@ -9,10 +9,13 @@ from importlib import reload
 reload(joint)
 
 from ..builder.analog_gui import AnalogGui
+from ..builder.attributes import AttributeBuilder
 from ..builder.gui import Gui
 from ..builder.joint import Joint as JointBuilder
+from ..builder.joint_hierarchy import JointHierarchy
 from ..builder.mesh import Mesh
 from ..config.character import Character
+from ..const.mesh import SOFT_EDGE_STEP
 from ..const.naming import (
     ANALOG_GUI_HOLDER,
     FACIAL_ROOT_JOINT,
@@ -26,7 +29,10 @@ from ..const.naming import (
 from ..model.dna import DNA
 from ..model.joint import Joint as JointModel
 from ..util.additional_assembly_script import AdditionalAssemblyScript
+from ..util.error import DNAViewerError
 from ..util.maya_util import Maya
+from ..util.mesh_finalizer import MeshFinalizer
+from ..util.mesh_pipeline import MeshPipeline
 from ..util.rig_logic import RigLogic
 from ..util.shader import Shader as ShaderUtil
 
@@ -48,6 +54,9 @@ class CharacterCreator:
 
     @type meshes: Dict[int, List[MObject]]
     @param meshes: A mapping of lod number to a list of meshes created for that lod
+
+    @type attribute_builder: Optional[AttributeBuilder]
+    @param attribute_builder: Collects the attributes and root joint key frames of the whole character when batch_attributes is set, they are created by build_attributes
     """
 
     def __init__(self, config: Character, dna: DNA) -> None:
@@ -55,6 +64,9 @@ class CharacterCreator:
         self.dna = dna
         self.character_name = self.dna.get_character_name()
         self.meshes: Dict[int, List[MObject]] = {}
+        self.attribute_builder: Optional[AttributeBuilder] = (
+            AttributeBuilder() if self.config.options.batch_attributes else None
+        )
 
     def add_mesh_to_display_layer(self, mesh_name: str, lod: int) -> None:
         """
@@ -78,11 +90,19 @@ class CharacterCreator:
         """
 
         joints: List[JointModel] = self.dna.read_all_neutral_joints()
-        builder = JointBuilder(
-            joints,
-            self.config.modifiers.linear_modifier,
-            self.config.modifiers.angle_modifier,
-        )
+        if self.config.options.batch_joints:
+            builder = JointHierarchy(
+                joints,
+                self.dna.get_joint_parent_indices(),
+                self.config.modifiers.linear_modifier,
+                self.config.modifiers.angle_modifier,
+            )
+        else:
+            builder = JointBuilder(
+                joints,
+                self.config.modifiers.linear_modifier,
+                self.config.modifiers.angle_modifier,
+            )
         builder.process()
         return joints
 
@@ -190,6 +210,17 @@ class CharacterCreator:
 
         gui_control_names = self.dna.get_raw_control_names()
 
+        if self.config.options.batch_attributes:
+            attribute_names_by_node: Dict[str, List[str]] = {}
+            for name in gui_control_names:
+                node_name, attribute_name = name.split(".")
+                attribute_names_by_node.setdefault(node_name, []).append(
+                    attribute_name
+                )
+            for node_name, attribute_names in attribute_names_by_node.items():
+                self.attribute_builder.add_float_attributes(node_name, attribute_names)
+            return
+
         for name in gui_control_names:
             ctrl_and_attr_names = name.split(".")
             cmds.addAttr(
@@ -207,6 +238,12 @@ class CharacterCreator:
         """
 
         frm_names = self.dna.get_animated_map_names()
+        if self.config.options.batch_attributes:
+            self.attribute_builder.add_float_attributes(
+                FRM_MULTIPLIERS_NAME, [name.replace(".", "_") for name in frm_names]
+            )
+            return
+
         for name in frm_names:
             cmds.addAttr(
                 FRM_MULTIPLIERS_NAME,
@@ -251,6 +288,12 @@ class CharacterCreator:
         @param names: List of names that are added as attributes to the facial root joint.
         """
 
+        if self.config.options.batch_attributes:
+            self.attribute_builder.add_float_attributes(
+                FACIAL_ROOT_JOINT, [name.replace(".", "_") for name in names]
+            )
+            return
+
         for name in names:
             cmds.addAttr(
                 FACIAL_ROOT_JOINT,
@@ -264,15 +307,30 @@ class CharacterCreator:
     def add_key_frames(self) -> None:
         """
         Adds a starting key frame to the facial root joint if joints are added and the add_key_frames option is set
-        to True.
+        to True. With batch_attributes the key frames are queued for build_attributes.
         """
 
         if self.config.options.add_key_frames and self.config.options.add_joints:
             logging.info("setting keyframe on the root joint...")
             cmds.currentTime(0)
+            if self.config.options.batch_attributes:
+                self.attribute_builder.add_key_frames(FACIAL_ROOT_JOINT, 0)
+                return
+
             cmds.select(FACIAL_ROOT_JOINT, replace=True)
             cmds.setKeyframe(inTangentType="linear", outTangentType="linear")
 
+    def build_attributes(self) -> None:
+        """
+        Creates the attributes and root joint key frames queued while building the character in a single pass, the
+        root joint is keyed after its attributes exist. Does nothing unless batch_attributes is set.
+        """
+
+        if self.attribute_builder is None:
+            return
+        self.attribute_builder.build()
+        self.attribute_builder = AttributeBuilder()
+
     def create_character_meshes(self) -> None:
         """
         Builds the meshes of the character. If specified in the character options they get parented to a created
@@ -281,24 +339,76 @@ class CharacterCreator:
 
         logging.info("building character meshes...")
         meshes: Dict[int, List[MObject]] = {}
-        for lod, meshes_per_lod in enumerate(
-            self.dna.get_meshes_by_lods(self.config.meshes)
-        ):
-            if self.config.create_character_node and meshes_per_lod:
-                logging.info(f"building LOD for {lod}")
-                obj_name = f"{GEOMETRY_HOLDER_PREFIX}{self.character_name}|{LOD_HOLDER_PREFIX}{lod}"
-                self.create_lod_node(lod=lod, obj_name=obj_name)
-
-            meshes[lod] = self.create_meshes(
-                lod=lod,
-                meshes_per_lod=meshes_per_lod,
-            )
+        finalizer = MeshFinalizer()
+        meshes_by_lods = self.dna.get_meshes_by_lods(self.config.meshes)
+        options = self.config.options
+        prepared_builders = MeshPipeline(
+            options.pipeline_workers, options.pipeline_max_pending
+        ).iter_prepared(
+            lambda mesh_index: self.create_mesh_builder(
+                mesh_index, finalizer
+            ).prepare(),
+            [
+                mesh_index
+                for meshes_per_lod in meshes_by_lods
+                for mesh_index in meshes_per_lod
+            ],
+            # the workers only get meshes that were already read, so the stream reader stays on the main thread
+            loader=lambda mesh_index: self.dna.geometry.meshes[mesh_index],
+        )
+        try:
+            for lod, meshes_per_lod in enumerate(meshes_by_lods):
+                if self.config.create_character_node and meshes_per_lod:
+                    logging.info(f"building LOD for {lod}")
+                    obj_name = f"{GEOMETRY_HOLDER_PREFIX}{self.character_name}|{LOD_HOLDER_PREFIX}{lod}"
+                    self.create_lod_node(lod=lod, obj_name=obj_name)
+
+                meshes[lod] = self.create_meshes(
+                    lod=lod,
+                    meshes_per_lod=meshes_per_lod,
+                    finalizer=finalizer,
+                    prepared_builders=prepared_builders,
+                )
+        finally:
+            prepared_builders.close()
+        finalizer.run()
+        logging.info(f"mesh finalization took {finalizer.elapsed:.3f}s")
         self.meshes = meshes
 
-    def create_meshes(self, lod: int, meshes_per_lod: List[int]) -> List[MObject]:
+    def create_mesh_builder(
+        self, mesh_index: int, finalizer: Optional[MeshFinalizer] = None
+    ) -> Mesh:
+        """
+        Creates the builder of a single mesh.
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+
+        @type finalizer: Optional[MeshFinalizer]
+        @param finalizer: Collects the finalization steps of the mesh
+
+        @rtype: Mesh
+        @returns: The mesh builder
+        """
+
+        return Mesh(
+            character_config=self.config,
+            dna=self.dna,
+            mesh_index=mesh_index,
+            finalizer=finalizer,
+        )
+
+    def create_meshes(
+        self,
+        lod: int,
+        meshes_per_lod: List[int],
+        finalizer: Optional[MeshFinalizer] = None,
+        prepared_builders: Optional[Iterator[Mesh]] = None,
+    ) -> List[MObject]:
         """
         Builds the meshes from the provided mesh ids and then attaches them to a given lod if specified in the
-        character configuration.
+        character configuration. The geometry of all meshes is built first, so the soft edge step runs once for the
+        lod before the deformers are added.
 
         @type lod: int
         @param lod: The lod number representing the display layer the meshes to the display layer.
@@ -306,20 +416,39 @@ class CharacterCreator:
         @type meshes_per_lod: List[int]
         @param meshes_per_lod: List of mesh indices that are being built.
 
+        @type finalizer: Optional[MeshFinalizer]
+        @param finalizer: Collects the finalization steps, the remaining steps are left to the caller if given, otherwise they run before returning
+
+        @type prepared_builders: Optional[Iterator[Mesh]]
+        @param prepared_builders: Yields the builders of the meshes with their data already prepared, in the order of meshes_per_lod
+
         @rtype: List[MObject]
         @returns: The list of maya objects that represent the meshes added to the scene.
         """
 
-        meshes: List[MObject] = []
+        owns_finalizer = finalizer is None
+        if owns_finalizer:
+            finalizer = MeshFinalizer()
+
+        builders: List[Mesh] = []
         for mesh_index in meshes_per_lod:
-            builder = Mesh(
-                character_config=self.config,
-                dna=self.dna,
-                mesh_index=mesh_index,
-            )
-            builder.build()
+            if prepared_builders is None:
+                builder = self.create_mesh_builder(mesh_index, finalizer)
+            else:
+                builder = next(prepared_builders)
+                if builder.mesh_index != mesh_index:
+                    raise DNAViewerError(
+                        f"Expected prepared mesh {mesh_index}, got {builder.mesh_index}"
+                    )
+            builder.build_geometry()
+            builders.append(builder)
+        finalizer.run(SOFT_EDGE_STEP)
+
+        meshes: List[MObject] = []
+        for builder in builders:
+            builder.build_deformers()
 
-            mesh_name = self.dna.get_mesh_name(mesh_index=mesh_index)
+            mesh_name = self.dna.get_mesh_name(mesh_index=builder.mesh_index)
             meshes.append(mesh_name)
 
             if self.config.create_display_layers:
@@ -329,6 +458,9 @@ class CharacterCreator:
             ShaderUtil.default_lambert_shader(
                 mesh_name, self.character_name, self.config.create_character_node
             )
+
+        if owns_finalizer:
+            finalizer.run()
         return meshes
 
     def add_gui(self) -> None:
@@ -0,0 +1,361 @@
+import logging
+import time
+from typing import Dict, Optional
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.spatial.transform import Rotation
+
+from ..const.behavior import EVALUATION_DTYPE, JOINT_ATTRIBUTE_COUNT
+from ..model.dna import DNA
+from ..model.mesh import DeformationArrays
+from ..util.error import DNAViewerError
+
+
+class DeformationEngine:
+    """
+    A class used for computing deformed vertex positions from the DNA without maya. Blend shapes are applied as a
+    product of a sparse delta matrix with the blend shape channel weights, then the vertices are skinned with linear
+    blend skinning. Both work on batches of poses, and the matrices of a mesh are prepared once on its first use.
+
+    Joints follow the maya joint convention the scene is built with: the neutral rotation is the joint orient and the
+    joint outputs of RigLogic are added as translation, rotation and scale on top of the neutral joint.
+
+    Attributes
+    ----------
+    @type dna: DNA
+    @param dna: The DNA with the definition and geometry layers loaded
+
+    @type dtype: np.dtype
+    @param dtype: The precision of the deformation
+
+    @type parent_indices: np.ndarray
+    @param parent_indices: The parent joint index of each joint, root joints are their own parents
+
+    @type joint_depths: np.ndarray
+    @param joint_depths: The number of ancestors of each joint
+
+    @type neutral_translations: np.ndarray
+    @param neutral_translations: (J, 3) array of the neutral joint translations relative to their parents
+
+    @type neutral_orients: np.ndarray
+    @param neutral_orients: (J, 3, 3) array of the neutral joint orients
+
+    @type inverse_bind_transforms: np.ndarray
+    @param inverse_bind_transforms: (J, 4, 4) array of the inverse world transforms of the neutral joints
+
+    @type meshes: Dict[int, DeformationArrays]
+    @param meshes: The meshes prepared so far
+    """
+
+    def __init__(self, dna: DNA, dtype: str = EVALUATION_DTYPE) -> None:
+        if dna.definition is None or dna.geometry is None:
+            raise DNAViewerError(
+                "Deforming meshes needs the definition and geometry layers of the DNA"
+            )
+        self.dna = dna
+        self.dtype = np.dtype(dtype)
+
+        definition = dna.definition
+        self.parent_indices = np.asarray(definition.joints.parent_index, dtype=np.int64)
+        self.joint_depths = self.get_joint_depths(self.parent_indices)
+        self.neutral_translations = np.array(
+            [
+                [point.x, point.y, point.z]
+                for point in definition.neutral_joint_translations
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        self.neutral_orients = (
+            Rotation.from_euler(
+                "xyz",
+                np.array(
+                    [
+                        [point.x, point.y, point.z]
+                        for point in definition.neutral_joint_rotations
+                    ],
+                    dtype=np.float64,
+                ).reshape(-1, 3),
+                degrees=True,
+            )
+            .as_matrix()
+            .reshape(-1, 3, 3)
+        )
+        self.inverse_bind_transforms = np.linalg.inv(
+            self.get_joint_transforms()[0].astype(np.float64)
+        )
+        self.meshes: Dict[int, DeformationArrays] = {}
+
+    @staticmethod
+    def get_joint_depths(parent_indices: np.ndarray) -> np.ndarray:
+        """
+        Gets the number of ancestors of every joint.
+
+        @type parent_indices: np.ndarray
+        @param parent_indices: The parent joint index of each joint, root joints are their own parents
+
+        @rtype: np.ndarray
+        @returns: The depth of every joint, 0 for root joints
+        """
+
+        joint_count = len(parent_indices)
+        if joint_count and (
+            parent_indices.min() < 0 or parent_indices.max() >= joint_count
+        ):
+            raise DNAViewerError("Joint parent indices are out of range")
+        depths = np.zeros(joint_count, dtype=np.int64)
+        ancestors = np.arange(joint_count)
+        for _ in range(joint_count + 1):
+            has_parent = parent_indices[ancestors] != ancestors
+            if not has_parent.any():
+                return depths
+            depths += has_parent
+            ancestors = parent_indices[ancestors]
+        raise DNAViewerError(
+            "Joint hierarchy contains cycles, not every joint leads to a root joint"
+        )
+
+    def get_joint_transforms(
+        self, joint_deltas: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Gets the world transforms of the joints for a batch of poses. The local transform of a joint is its
+        translation, joint orient, rotation and scale, applied in maya's order.
+
+        @type joint_deltas: Optional[np.ndarray]
+        @param joint_deltas: (N, J * 9) joint outputs of RigLogic, translation, rotation in degrees and scale XYZ per joint, the neutral pose if None
+
+        @rtype: np.ndarray
+        @returns: (N, J, 4, 4) array of the world transforms
+        """
+
+        joint_count = len(self.parent_indices)
+        if joint_deltas is None:
+            joint_deltas = np.zeros((1, joint_count * JOINT_ATTRIBUTE_COUNT))
+        joint_deltas = np.asarray(joint_deltas, dtype=np.float64)
+        if (
+            joint_deltas.ndim != 2
+            or joint_deltas.shape[1] != joint_count * JOINT_ATTRIBUTE_COUNT
+        ):
+            raise DNAViewerError(
+                f"Expected {joint_count * JOINT_ATTRIBUTE_COUNT} joint outputs per pose, got shape {joint_deltas.shape}"
+            )
+        deltas = joint_deltas.reshape(len(joint_deltas), joint_count, 3, 3)
+        pose_count = len(deltas)
+
+        rotations = (
+            Rotation.from_euler("xyz", deltas[:, :, 1].reshape(-1, 3), degrees=True)
+            .as_matrix()
+            .reshape(pose_count, joint_count, 3, 3)
+        )
+        local = np.zeros((pose_count, joint_count, 4, 4))
+        local[:, :, :3, :3] = (
+            self.neutral_orients @ rotations * (1.0 + deltas[:, :, 2, None, :])
+        )
+        local[:, :, :3, 3] = self.neutral_translations + deltas[:, :, 0]
+        local[:, :, 3, 3] = 1.0
+
+        world = local.copy()
+        for depth in range(1, int(self.joint_depths.max(initial=0)) + 1):
+            joints = np.flatnonzero(self.joint_depths == depth)
+            world[:, joints] = world[:, self.parent_indices[joints]] @ local[:, joints]
+        return world
+
+    def prepare_mesh(self, mesh_index: int) -> DeformationArrays:
+        """
+        Prepares the neutral positions, the blend shape delta matrix and the padded skin weights of a mesh.
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+
+        @rtype: DeformationArrays
+        @returns: The prepared mesh
+        """
+
+        neutral = np.asarray(
+            self.dna.get_vertex_position_array_for_mesh_index(mesh_index),
+            dtype=self.dtype,
+        ).reshape(-1, 3)
+        vertex_count = len(neutral)
+
+        rows, columns, values = [], [], []
+        for _, targets in self.dna.iter_blend_shape_targets(mesh_index):
+            counts = np.diff(targets.offsets.astype(np.int64))
+            channels = np.repeat(targets.channels.astype(np.int64), counts)
+            vertex_indices = targets.vertex_indices.astype(np.int64)
+            rows.append((vertex_indices[:, None] * 3 + np.arange(3)).ravel())
+            columns.append(np.repeat(channels, 3))
+            values.append(np.asarray(targets.deltas, dtype=self.dtype).ravel())
+        channel_count = len(self.dna.definition.blend_shape_channels.names)
+        blend_shape_matrix = coo_matrix(
+            (
+                np.concatenate(values) if values else np.zeros(0, self.dtype),
+                (
+                    np.concatenate(rows) if rows else np.zeros(0, np.int64),
+                    np.concatenate(columns) if columns else np.zeros(0, np.int64),
+                ),
+            ),
+            shape=(vertex_count * 3, channel_count),
+        ).tocsr()
+
+        offsets, joint_indices, weights = self.dna.get_skin_weight_arrays_for_mesh(
+            mesh_index
+        )
+        counts = np.diff(offsets)
+        influence_count = int(counts.max(initial=0))
+        slots = np.arange(len(joint_indices)) - np.repeat(offsets[:-1], counts)
+        vertices = np.repeat(np.arange(vertex_count), counts)
+        padded_indices = np.zeros((vertex_count, influence_count), dtype=np.int64)
+        padded_weights = np.zeros((vertex_count, influence_count), dtype=self.dtype)
+        padded_indices[vertices, slots] = joint_indices
+        padded_weights[vertices, slots] = weights
+
+        return DeformationArrays(
+            neutral=neutral,
+            blend_shape_matrix=blend_shape_matrix,
+            joint_indices=padded_indices,
+            joint_weights=padded_weights,
+        )
+
+    def get_mesh(self, mesh_index: int) -> DeformationArrays:
+        """
+        Gets a prepared mesh, it is prepared on first use.
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+
+        @rtype: DeformationArrays
+        @returns: The prepared mesh
+        """
+
+        if mesh_index not in self.meshes:
+            start = time.perf_counter()
+            self.meshes[mesh_index] = self.prepare_mesh(mesh_index)
+            logging.info(
+                f"prepared mesh {mesh_index} for deformation in {time.perf_counter() - start:.3f}s"
+            )
+        return self.meshes[mesh_index]
+
+    def apply_blend_shapes(
+        self, mesh: DeformationArrays, blend_shape_weights: np.ndarray
+    ) -> np.ndarray:
+        """
+        Adds the weighted blend shape deltas to the neutral positions.
+
+        @type mesh: DeformationArrays
+        @param mesh: The prepared mesh
+
+        @type blend_shape_weights: np.ndarray
+        @param blend_shape_weights: (N, blend shape channels) blend shape channel weights
+
+        @rtype: np.ndarray
+        @returns: (N, V, 3) array of the vertex positions
+        """
+
+        deltas = (mesh.blend_shape_matrix @ blend_shape_weights.T).T
+        return mesh.neutral + np.asarray(deltas, dtype=self.dtype).reshape(
+            len(blend_shape_weights), -1, 3
+        )
+
+    def apply_skin(
+        self,
+        mesh: DeformationArrays,
+        positions: np.ndarray,
+        joint_transforms: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Skins the vertex positions with linear blend skinning.
+
+        @type mesh: DeformationArrays
+        @param mesh: The prepared mesh
+
+        @type positions: np.ndarray
+        @param positions: (N, V, 3) array of the vertex positions
+
+        @type joint_transforms: np.ndarray
+        @param joint_transforms: (N, J, 4, 4) array of the world transforms of the joints
+
+        @rtype: np.ndarray
+        @returns: (N, V, 3) array of the skinned vertex positions
+        """
+
+        skinning = (joint_transforms @ self.inverse_bind_transforms)[:, :, :3].astype(
+            self.dtype
+        )
+        skinned = np.zeros_like(positions)
+        for slot in range(mesh.joint_indices.shape[1]):
+            matrices = skinning[:, mesh.joint_indices[:, slot]]
+            transformed = (
+                np.einsum("nvij,nvj->nvi", matrices[..., :3], positions)
+                + matrices[..., 3]
+            )
+            skinned += mesh.joint_weights[:, slot, None] * transformed
+        return skinned
+
+    def deform(
+        self,
+        mesh_index: int,
+        blend_shape_weights: Optional[np.ndarray] = None,
+        joint_deltas: Optional[np.ndarray] = None,
+        joint_transforms: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Computes the deformed vertex positions of a mesh for a single pose or a batch of poses. The pose is given by
+        the blend shape channel weights and either the joint outputs of RigLogic or the world transforms of the
+        joints, with or without a leading batch axis.
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+
+        @type blend_shape_weights: Optional[np.ndarray]
+        @param blend_shape_weights: The blend shape channel weights, no blend shapes are applied if None
+
+        @type joint_deltas: Optional[np.ndarray]
+        @param joint_deltas: The joint outputs of RigLogic, 9 values per joint
+
+        @type joint_transforms: Optional[np.ndarray]
+        @param joint_transforms: The (J, 4, 4) world transforms of the joints, used instead of joint_deltas
+
+        @rtype: np.ndarray
+        @returns: (V, 3) or (N, V, 3) array of the deformed vertex positions
+        """
+
+        if joint_deltas is not None and joint_transforms is not None:
+            raise DNAViewerError(
+                "Either joint outputs or joint transforms can be given"
+            )
+        single = all(
+            values is None or np.ndim(values) == ndim
+            for values, ndim in (
+                (blend_shape_weights, 1),
+                (joint_deltas, 1),
+                (joint_transforms, 3),
+            )
+        )
+        if blend_shape_weights is not None:
+            blend_shape_weights = np.asarray(blend_shape_weights, dtype=self.dtype)
+            blend_shape_weights = blend_shape_weights.reshape(
+                -1, blend_shape_weights.shape[-1]
+            )
+        if joint_deltas is not None:
+            joint_transforms = self.get_joint_transforms(
+                np.asarray(joint_deltas).reshape(-1, np.shape(joint_deltas)[-1])
+            )
+        elif joint_transforms is not None:
+            joint_transforms = np.asarray(joint_transforms, dtype=np.float64).reshape(
+                -1, len(self.parent_indices), 4, 4
+            )
+
+        mesh = self.get_mesh(mesh_index)
+        if blend_shape_weights is not None:
+            positions = self.apply_blend_shapes(mesh, blend_shape_weights)
+        else:
+            positions = mesh.neutral[None].copy()
+        if joint_transforms is not None:
+            pose_count = max(len(positions), len(joint_transforms))
+            positions = np.broadcast_to(positions, (pose_count,) + positions.shape[1:])
+            joint_transforms = np.broadcast_to(
+                joint_transforms, (pose_count,) + joint_transforms.shape[1:]
+            )
+            positions = self.apply_skin(mesh, positions, joint_transforms)
+        return positions[0] if single else positions
@@ -5,6 +5,7 @@ from ..builder.scene import Scene as SceneBuilder
 from ..config.character import BuildOptions, Character
 from ..config.scene import Scene as SceneConfig
 from ..config.units import AngleUnit, LinearUnit
+from ..const.mesh import PIPELINE_MAX_PENDING, PIPELINE_WORKERS
 from ..model.dna import DNA
 from ..util.error import DNAViewerError
 
@@ -53,6 +54,14 @@ def create_build_options(
     add_animated_map_attributes_on_root_joint: bool = False,
     add_mesh_name_to_blend_shape_channel_name: bool = False,
     add_key_frames: bool = False,
+    blend_shape_chunk_size: int = 64,
+    drop_consumed_blend_shapes: bool = False,
+    inject_blend_shape_targets: bool = True,
+    bulk_skin_weights: bool = True,
+    batch_joints: bool = True,
+    batch_attributes: bool = True,
+    pipeline_workers: int = PIPELINE_WORKERS,
+    pipeline_max_pending: int = PIPELINE_MAX_PENDING,
 ) -> BuildOptions:
     """
     Creates the build options object used in the character building process.
@@ -78,6 +87,30 @@ def create_build_options(
     @type add_key_frames: bool
     @param add_key_frames: A flag representing whether key frames should be added
 
+    @type blend_shape_chunk_size: int
+    @param blend_shape_chunk_size: The maximum number of blend shape targets held in memory at once while creating derived meshes
+
+    @type drop_consumed_blend_shapes: bool
+    @param drop_consumed_blend_shapes: A flag representing whether blend shape targets held by the DNA are removed once consumed
+
+    @type inject_blend_shape_targets: bool
+    @param inject_blend_shape_targets: A flag representing whether blend shape targets are written straight into the blend shape node instead of being created from derived meshes
+
+    @type bulk_skin_weights: bool
+    @param bulk_skin_weights: A flag representing whether skin weights are set in blocks through MFnSkinCluster.setWeights instead of one attribute at a time
+
+    @type batch_joints: bool
+    @param batch_joints: A flag representing whether the joint hierarchy is created at once through a single MDagModifier instead of one cmds.joint call per joint
+
+    @type batch_attributes: bool
+    @param batch_attributes: A flag representing whether control and animated map attributes and their key frames are created through a single MDGModifier instead of one command per attribute
+
+    @type pipeline_workers: int
+    @param pipeline_workers: The number of worker threads preparing mesh data while the maya nodes of earlier meshes are created, 0 prepares every mesh on the main thread
+
+    @type pipeline_max_pending: int
+    @param pipeline_max_pending: The maximum number of prepared meshes held in memory waiting to be built
+
     @rtype: BuildOptions
     @returns: The created build options object
     """
@@ -90,6 +123,14 @@ def create_build_options(
         add_animated_map_attributes_on_root_joint=add_animated_map_attributes_on_root_joint,
         add_mesh_name_to_blend_shape_channel_name=add_mesh_name_to_blend_shape_channel_name,
         add_key_frames=add_key_frames,
+        blend_shape_chunk_size=blend_shape_chunk_size,
+        drop_consumed_blend_shapes=drop_consumed_blend_shapes,
+        inject_blend_shape_targets=inject_blend_shape_targets,
+        bulk_skin_weights=bulk_skin_weights,
+        batch_joints=batch_joints,
+        batch_attributes=batch_attributes,
+        pipeline_workers=pipeline_workers,
+        pipeline_max_pending=pipeline_max_pending,
     )
 
 
@@ -1,12 +1,24 @@
 import logging
 from typing import List
 
+import numpy as np
 from maya import cmds
-from maya.api.OpenMaya import MDagModifier, MFnDagNode, MFnMesh, MPoint
+from maya.api.OpenMaya import (
+    MDagModifier,
+    MFn,
+    MFnComponentListData,
+    MFnDagNode,
+    MFnMesh,
+    MFnPointArrayData,
+    MFnSingleIndexedComponent,
+    MIntArray,
+    MSelectionList,
+)
 
 from ..config.mesh import Mesh
 from ..const.naming import (
     BLEND_SHAPE_GROUP_PREFIX,
+    BLEND_SHAPE_INPUT_TARGET_ITEM,
     BLEND_SHAPE_NAME_POSTFIX,
     BLEND_SHAPE_NAMING,
     DERIVED_MESH_NAME,
@@ -14,7 +26,6 @@ from ..const.naming import (
 )
 from ..const.printing import BLEND_SHAPE_PRINT_RANGE
 from ..model.dna import DNA
-from ..model.geometry import Point3
 from ..model.mesh import Mesh as MayaMeshModel
 from ..util.maya_util import Maya
 from ..util.mesh_neutral import MeshNeutral
@@ -33,9 +44,12 @@ class MeshBlendShape:
         fn_mesh: MFnMesh,
         dag_modifier: MDagModifier,
         add_mesh_name_to_blend_shape_channel_name: bool,
+        chunk_size: int = 64,
+        drop_consumed: bool = False,
     ) -> None:
         """
         Builds all the derived meshes using the provided mesh and the blend shapes data of the DNA.
+        The blend shape targets are consumed in chunks, so only chunk_size targets are held in memory at once.
 
         @type config: Mesh
         @param config: Mesh configuration from the DNA.
@@ -51,6 +65,12 @@ class MeshBlendShape:
 
         @type add_mesh_name_to_blend_shape_channel_name: bool
         @param add_mesh_name_to_blend_shape_channel_name: A flag representing whether mash name of blend shape channel is added to name when creating it
+
+        @type chunk_size: int
+        @param chunk_size: The maximum number of blend shape targets held in memory at once
+
+        @type drop_consumed: bool
+        @param drop_consumed: A flag representing whether blend shape targets held by the DNA are removed once consumed
         """
 
         logging.info("building derived meshes...")
@@ -61,25 +81,32 @@ class MeshBlendShape:
         )
 
         data.derived_mesh_names = []
-        blend_shapes = dna.get_blend_shapes(config.mesh_index)
-        for blend_shape_target_index, blend_shape in enumerate(blend_shapes):
-            if (blend_shape_target_index + 1) % BLEND_SHAPE_PRINT_RANGE == 0:
-                logging.info(f"\t{blend_shape_target_index + 1} / {len(blend_shapes)}")
-
-            MeshBlendShape._create_derived_mesh(
-                config,
-                dna,
-                data,
-                blend_shape_target_index,
-                blend_shape.channel,
-                group,
-                fn_mesh,
-                dag_modifier,
-                add_mesh_name_to_blend_shape_channel_name,
-            )
-
-        if len(blend_shapes) % BLEND_SHAPE_PRINT_RANGE != 0:
-            logging.info(f"\t{len(blend_shapes)} / {len(blend_shapes)}")
+        blend_shape_target_count = dna.get_blend_shape_target_count(config.mesh_index)
+        for start, blend_shape_targets in dna.iter_blend_shape_targets(
+            config.mesh_index, chunk_size, drop_consumed
+        ):
+            for index in range(len(blend_shape_targets)):
+                blend_shape_target_index = start + index
+                if (blend_shape_target_index + 1) % BLEND_SHAPE_PRINT_RANGE == 0:
+                    logging.info(
+                        f"\t{blend_shape_target_index + 1} / {blend_shape_target_count}"
+                    )
+
+                MeshBlendShape._create_derived_mesh(
+                    config,
+                    dna,
+                    data,
+                    blend_shape_targets.get_vertex_indices(index),
+                    blend_shape_targets.get_deltas(index),
+                    int(blend_shape_targets.channels[index]),
+                    group,
+                    fn_mesh,
+                    dag_modifier,
+                    add_mesh_name_to_blend_shape_channel_name,
+                )
+
+        if blend_shape_target_count % BLEND_SHAPE_PRINT_RANGE != 0:
+            logging.info(f"\t{blend_shape_target_count} / {blend_shape_target_count}")
 
         cmds.setAttr(f"{group}.visibility", 0)
 
@@ -88,7 +115,8 @@ class MeshBlendShape:
         config: Mesh,
         dna: DNA,
         data: MayaMeshModel,
-        blend_shape_target_index: int,
+        vertex_indices: np.ndarray,
+        deltas: np.ndarray,
         blend_shape_channel: int,
         group: str,
         fn_mesh: MFnMesh,
@@ -104,8 +132,11 @@ class MeshBlendShape:
         @type data: MayaMeshModel
         @param data: An object that stores values that get passed around different methods.
 
-        @type blend_shape_target_index: int
-        @param blend_shape_target_index: Used for getting a delta value representing the value change concerning the blend shape.
+        @type vertex_indices: np.ndarray
+        @param vertex_indices: The vertex indices of the blend shape target deltas.
+
+        @type deltas: np.ndarray
+        @param deltas: (N, 3) array of the blend shape target deltas.
 
         @type blend_shape_channel: int
         @param blend_shape_channel: Used for getting the blend shape name from the DNA.
@@ -123,29 +154,20 @@ class MeshBlendShape:
         @param add_mesh_name_to_blend_shape_channel_name: A flag representing whether mash name of blend shape channel is added to name when creating it
         """
 
-        new_vert_layout = MeshNeutral.get_vertex_positions_from_dna_vertex_positions(
-            config=config, data=data
-        )
-
-        zipped_deltas = dna.get_blend_shape_target_deltas_with_vertex_id(
-            config.mesh_index, blend_shape_target_index
+        positions = MeshNeutral.get_vertex_position_array(config, data).copy()
+        np.add.at(
+            positions,
+            vertex_indices,
+            MeshNeutral.get_transformed_deltas(config, data, deltas),
         )
-        for zipped_delta in zipped_deltas:
-            delta: Point3 = zipped_delta[1]
-            new_vert_layout[zipped_delta[0]] += MPoint(
-                config.linear_modifier * delta.x,
-                config.linear_modifier * delta.y,
-                config.linear_modifier * delta.z,
-            )
 
         new_mesh = fn_mesh.create(
-            new_vert_layout, data.polygon_faces, data.polygon_connects
+            MeshNeutral.to_point_array(positions),
+            data.polygon_faces,
+            data.polygon_connects,
         )
-        derived_name = dna.get_blend_shape_name(blend_shape_channel)
-        name = (
-            f"{dna.geometry.meshes[config.mesh_index].name}__{derived_name}"
-            if add_mesh_name_to_blend_shape_channel_name
-            else derived_name
+        name = MeshBlendShape.get_derived_mesh_name(
+            config, dna, blend_shape_channel, add_mesh_name_to_blend_shape_channel_name
         )
         dag_modifier.renameNode(new_mesh, name)
         dag_modifier.doIt()
@@ -155,6 +177,149 @@ class MeshBlendShape:
 
         data.derived_mesh_names.append(name)
 
+    @staticmethod
+    def get_derived_mesh_name(
+        config: Mesh,
+        dna: DNA,
+        blend_shape_channel: int,
+        add_mesh_name_to_blend_shape_channel_name: bool,
+    ) -> str:
+        """
+        Gets the name of the derived mesh, which is also the name of the blend shape target.
+
+        @type config: Mesh
+        @param config: Mesh configuration from the DNA.
+
+        @type blend_shape_channel: int
+        @param blend_shape_channel: Used for getting the blend shape name from the DNA.
+
+        @type add_mesh_name_to_blend_shape_channel_name: bool
+        @param add_mesh_name_to_blend_shape_channel_name: A flag representing whether mash name of blend shape channel is added to name when creating it
+
+        @rtype: str
+        @returns: The name of the derived mesh
+        """
+
+        derived_name = dna.get_blend_shape_name(blend_shape_channel)
+        if add_mesh_name_to_blend_shape_channel_name:
+            return f"{dna.get_mesh_name(config.mesh_index)}__{derived_name}"
+        return derived_name
+
+    @staticmethod
+    def inject_blend_shape_targets(
+        config: Mesh,
+        dna: DNA,
+        data: MayaMeshModel,
+        add_mesh_name_to_blend_shape_channel_name: bool,
+        chunk_size: int = 64,
+        drop_consumed: bool = False,
+    ) -> str:
+        """
+        Creates the blend shape node once and writes the sparse deltas of every target straight into its input target
+        data, without creating derived meshes. The cost of a target scales with its number of deltas.
+
+        @type config: Mesh
+        @param config: Mesh configuration from the DNA.
+
+        @type data: MayaMeshModel
+        @param data: An object that stores values that get passed around different methods.
+
+        @type add_mesh_name_to_blend_shape_channel_name: bool
+        @param add_mesh_name_to_blend_shape_channel_name: A flag representing whether mash name of blend shape channel is added to name when creating it
+
+        @type chunk_size: int
+        @param chunk_size: The maximum number of blend shape targets held in memory at once
+
+        @type drop_consumed: bool
+        @param drop_consumed: A flag representing whether blend shape targets held by the DNA are removed once consumed
+
+        @rtype: str
+        @returns: The name of the blend shape node
+        """
+
+        logging.info("injecting blend shape targets...")
+
+        mesh_name = dna.get_mesh_name(config.mesh_index)
+        blend_shape = cmds.blendShape(
+            mesh_name, name=f"{mesh_name}{BLEND_SHAPE_NAME_POSTFIX}"
+        )[0]
+
+        blend_shape_target_count = dna.get_blend_shape_target_count(config.mesh_index)
+        for start, blend_shape_targets in dna.iter_blend_shape_targets(
+            config.mesh_index, chunk_size, drop_consumed
+        ):
+            for index in range(len(blend_shape_targets)):
+                blend_shape_target_index = start + index
+                if (blend_shape_target_index + 1) % BLEND_SHAPE_PRINT_RANGE == 0:
+                    logging.info(
+                        f"\t{blend_shape_target_index + 1} / {blend_shape_target_count}"
+                    )
+
+                MeshBlendShape._inject_blend_shape_target(
+                    blend_shape,
+                    blend_shape_target_index,
+                    blend_shape_targets.get_vertex_indices(index),
+                    MeshNeutral.get_transformed_deltas(
+                        config, data, blend_shape_targets.get_deltas(index)
+                    ),
+                    MeshBlendShape.get_derived_mesh_name(
+                        config,
+                        dna,
+                        int(blend_shape_targets.channels[index]),
+                        add_mesh_name_to_blend_shape_channel_name,
+                    ),
+                )
+
+        if blend_shape_target_count % BLEND_SHAPE_PRINT_RANGE != 0:
+            logging.info(f"\t{blend_shape_target_count} / {blend_shape_target_count}")
+        return blend_shape
+
+    @staticmethod
+    def _inject_blend_shape_target(
+        blend_shape: str,
+        target_index: int,
+        vertex_indices: np.ndarray,
+        deltas: np.ndarray,
+        name: str,
+    ) -> None:
+        """
+        Writes a single blend shape target into the blend shape node and names its weight.
+
+        @type blend_shape: str
+        @param blend_shape: The name of the blend shape node.
+
+        @type target_index: int
+        @param target_index: The index of the target in the blend shape node.
+
+        @type vertex_indices: np.ndarray
+        @param vertex_indices: The vertex indices of the blend shape target deltas.
+
+        @type deltas: np.ndarray
+        @param deltas: (N, 3) array of the blend shape target deltas in scene units.
+
+        @type name: str
+        @param name: The name of the target.
+        """
+
+        component = MFnSingleIndexedComponent()
+        component_object = component.create(MFn.kMeshVertComponent)
+        component.addElements(MIntArray(vertex_indices.tolist()))
+        components = MFnComponentListData()
+        components_object = components.create()
+        components.add(component_object)
+
+        points_object = MFnPointArrayData().create(MeshNeutral.to_point_array(deltas))
+
+        selection = MSelectionList()
+        item = f"{blend_shape}.{BLEND_SHAPE_INPUT_TARGET_ITEM.format(target_index)}"
+        selection.add(f"{item}.inputComponentsTarget")
+        selection.add(f"{item}.inputPointsTarget")
+        selection.getPlug(0).setMObject(components_object)
+        selection.getPlug(1).setMObject(points_object)
+
+        cmds.setAttr(f"{blend_shape}.weight[{target_index}]", 0.0)
+        cmds.aliasAttr(name, f"{blend_shape}.weight[{target_index}]")
+
     @staticmethod
     def create_blend_shape_node(
         mesh_name: str, derived_mesh_names: List[str], rename: bool = False
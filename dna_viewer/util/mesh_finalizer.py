@@ -0,0 +1,95 @@
+import logging
+import time
+from typing import Dict, List, Optional
+
+from maya import cmds
+
+from ..const.mesh import (
+    BAKE_HISTORY_STEP,
+    FINALIZATION_STEPS,
+    SOFT_EDGE_ANGLE,
+    SOFT_EDGE_STEP,
+)
+from ..util.error import DNAViewerError
+
+
+class MeshFinalizer:
+    """
+    A class used for deferring the finalization steps of the built meshes, every step is queued per mesh and run once
+    for all queued meshes instead of once per mesh
+
+    Attributes
+    ----------
+    @type queued: Dict[str, List[str]]
+    @param queued: Mapping of finalization steps to the names of the meshes they still have to run on
+
+    @type elapsed: float
+    @param elapsed: The time spent running the finalization steps in seconds
+    """
+
+    def __init__(self) -> None:
+        self.queued: Dict[str, List[str]] = {}
+        self.elapsed = 0.0
+
+    def queue(self, step: str, mesh_name: str) -> None:
+        """
+        Queues a finalization step for a mesh.
+
+        @type step: str
+        @param step: One of the finalization steps
+
+        @type mesh_name: str
+        @param mesh_name: The name of the mesh
+        """
+
+        if step not in FINALIZATION_STEPS:
+            raise DNAViewerError(f"Unknown mesh finalization step {step}")
+        meshes = self.queued.setdefault(step, [])
+        if mesh_name not in meshes:
+            meshes.append(mesh_name)
+
+    def run(self, step: Optional[str] = None) -> None:
+        """
+        Runs a queued finalization step once for all the meshes it was queued for, or all steps in order if None.
+
+        @type step: Optional[str]
+        @param step: The finalization step that should run
+        """
+
+        for current_step in FINALIZATION_STEPS if step is None else (step,):
+            mesh_names = self.queued.pop(current_step, [])
+            if not mesh_names:
+                continue
+
+            start = time.perf_counter()
+            if current_step == SOFT_EDGE_STEP:
+                MeshFinalizer.soft_edge(mesh_names)
+            elif current_step == BAKE_HISTORY_STEP:
+                MeshFinalizer.bake_history(mesh_names)
+            elapsed = time.perf_counter() - start
+            self.elapsed += elapsed
+            logging.info(
+                f"{current_step} on {len(mesh_names)} mesh(es) took {elapsed:.3f}s"
+            )
+
+    @staticmethod
+    def soft_edge(mesh_names: List[str]) -> None:
+        """
+        Softens all edges of the meshes with a single command.
+
+        @type mesh_names: List[str]
+        @param mesh_names: The names of the meshes
+        """
+
+        cmds.polySoftEdge(mesh_names, angle=SOFT_EDGE_ANGLE, constructionHistory=False)
+
+    @staticmethod
+    def bake_history(mesh_names: List[str]) -> None:
+        """
+        Bakes the non-deformer history of the meshes, scoped to them instead of the whole scene.
+
+        @type mesh_names: List[str]
+        @param mesh_names: The names of the meshes
+        """
+
+        cmds.bakePartialHistory(mesh_names, prePostDeformers=True)
@@ -1,25 +1,119 @@
 import logging
-from typing import List, Tuple
+from typing import List, Optional, Sequence, Tuple
 
-from maya import cmds
-from maya.api.OpenMaya import MDagModifier, MFnMesh, MObject, MPoint
+import numpy as np
+from maya.api.OpenMaya import MDagModifier, MFnMesh, MObject, MPointArray
+from scipy.spatial.transform import Rotation
 
 from ..config.mesh import Mesh as MeshConfig
+from ..const.mesh import UV_MERGE_DISTANCE
+from ..const.space import DEFAULT_MESH_ROTATION
 from ..model.dna import DNA
+from ..model.mesh import FaceVertexArrays
 from ..model.mesh import Mesh as MeshModel
 
-from scipy.spatial.transform import Rotation
-import numpy as np
 
 class MeshNeutral:
     """
     A utility class used for creating and interacting with meshes
     """
 
+    @staticmethod
+    def get_vertex_transform(
+        config: MeshConfig, rotation: Sequence[float] = DEFAULT_MESH_ROTATION
+    ) -> np.ndarray:
+        """
+        Gets the 3x3 matrix that applies the unit scale and the rotation to DNA positions and deltas.
+
+        @type config: MeshConfig
+        @param config: Mesh configuration from the DNA.
+
+        @type rotation: Sequence[float]
+        @param rotation: Euler xyz rotation in degrees, no rotation if empty or None
+
+        @rtype: np.ndarray
+        @returns: The 3x3 matrix, points are transformed with points @ matrix.T
+        """
+
+        if not rotation:
+            return config.linear_modifier * np.eye(3)
+        return config.linear_modifier * Rotation.from_euler(
+            "xyz", rotation, degrees=True
+        ).as_matrix()
+
+    @staticmethod
+    def get_vertex_position_array(
+        config: MeshConfig,
+        data: MeshModel,
+        rotation: Sequence[float] = DEFAULT_MESH_ROTATION,
+    ) -> np.ndarray:
+        """
+        Gets the transformed neutral vertex positions, they are computed once and cached on the mesh model.
+
+        @type config: MeshConfig
+        @param config: Mesh configuration from the DNA.
+
+        @type data: MeshModel
+        @param data: An object that stores values that get passed around different methods.
+
+        @type rotation: Sequence[float]
+        @param rotation: Euler xyz rotation in degrees, no rotation if empty or None
+
+        @rtype: np.ndarray
+        @returns: The (N, 3) vertex positions in scene units
+        """
+
+        if data.vertex_position_array is None:
+            data.vertex_transform = MeshNeutral.get_vertex_transform(config, rotation)
+            positions = getattr(data.dna_vertex_positions, "array", None)
+            if positions is None:
+                positions = [[p.x, p.y, p.z] for p in data.dna_vertex_positions]
+            positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+            data.vertex_position_array = positions @ data.vertex_transform.T
+        return data.vertex_position_array
+
+    @staticmethod
+    def get_transformed_deltas(
+        config: MeshConfig, data: MeshModel, deltas: np.ndarray
+    ) -> np.ndarray:
+        """
+        Applies the same unit scale and rotation as the neutral vertex positions to blend shape target deltas.
+
+        @type config: MeshConfig
+        @param config: Mesh configuration from the DNA.
+
+        @type data: MeshModel
+        @param data: An object that stores values that get passed around different methods.
+
+        @type deltas: np.ndarray
+        @param deltas: (K, 3) array of the blend shape target deltas.
+
+        @rtype: np.ndarray
+        @returns: The (K, 3) deltas in scene units
+        """
+
+        if data.vertex_transform is None:
+            data.vertex_transform = MeshNeutral.get_vertex_transform(config)
+        return np.asarray(deltas, dtype=np.float64) @ data.vertex_transform.T
+
+    @staticmethod
+    def to_point_array(positions: np.ndarray) -> MPointArray:
+        """
+        Converts (N, 3) positions into a maya point array in one call, without creating an MPoint per vertex.
+
+        @type positions: np.ndarray
+        @param positions: The positions
+
+        @rtype: MPointArray
+        @returns: The maya point array
+        """
+
+        return MPointArray(positions.tolist())
+
     @staticmethod
     def get_vertex_positions_from_dna_vertex_positions(
-        config: MeshConfig, data: MeshModel, rotation=[90, 0, 0]
-    ) -> List[MPoint]:
+        config: MeshConfig, data: MeshModel, rotation=DEFAULT_MESH_ROTATION
+    ) -> MPointArray:
         """
         Gets a list of points that represent the vertex positions.
 
@@ -29,33 +123,13 @@ class MeshNeutral:
         @type data: MeshModel
         @param data: An object that stores values that get passed around different methods.
 
-        @rtype: List[MPoint]
-        @returns: List of maya point objects.
-        """
-
-        vertex_positions = []
-        if rotation:
-            print("config: {} rotation: {}".format(config, rotation))
-            r = Rotation.from_euler('xyz', rotation, degrees=True)
-            for position in data.dna_vertex_positions:
-                vertex_positions.append([                    
-                        config.linear_modifier * position.x,
-                        config.linear_modifier * position.y,
-                        config.linear_modifier * position.z,                   
-                    ]
-                )
-            rotated_vertex_positions = r.apply(np.asarray(vertex_positions))
-            vertex_positions = [MPoint(x, y, z) for x, y, z in rotated_vertex_positions]
-        else:
-            for position in data.dna_vertex_positions:
-                vertex_positions.append(
-                    MPoint(
-                        config.linear_modifier * position.x,
-                        config.linear_modifier * position.y,
-                        config.linear_modifier * position.z,
-                    )
-                )
-        return vertex_positions
+        @rtype: MPointArray
+        @returns: Maya point array of the vertex positions.
+        """
+
+        return MeshNeutral.to_point_array(
+            MeshNeutral.get_vertex_position_array(config, data, rotation)
+        )
 
     @staticmethod
     def prepare_mesh(config: MeshConfig, dna: DNA, data: MeshModel) -> None:
@@ -75,14 +149,19 @@ class MeshNeutral:
         data.dna_vertex_positions = dna.get_vertex_positions_for_mesh_index(
             config.mesh_index
         )
+        data.vertex_transform = None
+        data.vertex_position_array = None
+        data.texture_coordinates = None
+        data.texture_coordinate_indices = None
+        data.face_vertex_normals = None
+        data.skin_weight_arrays = None
         data.dna_vertex_layout_positions = (
             dna.get_vertex_layout_positions_for_mesh_index(config.mesh_index)
         )
 
-        (
-            data.polygon_faces,
-            data.polygon_connects,
-        ) = dna.get_polygon_faces_and_connects(config.mesh_index)
+        data.face_vertex_arrays = dna.get_face_vertex_arrays(config.mesh_index)
+        data.polygon_faces = data.face_vertex_arrays.polygon_faces.tolist()
+        data.polygon_connects = data.face_vertex_arrays.polygon_connects.tolist()
 
     @staticmethod
     def create_mesh_object(
@@ -136,7 +215,9 @@ class MeshNeutral:
 
     @staticmethod
     def get_texture_data(
-        mesh_index: int, dna: DNA
+        mesh_index: int,
+        dna: DNA,
+        face_vertex_arrays: Optional[FaceVertexArrays] = None,
     ) -> Tuple[List[float], List[float], List[int]]:
         """
         Gets the data needed for the creation of textures.
@@ -147,36 +228,121 @@ class MeshNeutral:
         @type dna: DNA
         @param dna: Instance of DNA.
 
+        @type face_vertex_arrays: Optional[FaceVertexArrays]
+        @param face_vertex_arrays: The already computed per face vertex arrays of the mesh, computed if None
+
         @rtype: Tuple[List[float], List[float], List[int]] @returns: The tuple containing the list of texture
-        coordinate Us, the list of texture coordinate Vs and the list of texture coordinate indices.
+        coordinate Us, the list of texture coordinate Vs and the list of texture coordinate indices per face vertex.
+        """
+
+        if face_vertex_arrays is None:
+            face_vertex_arrays = dna.get_face_vertex_arrays(mesh_index)
+
+        (
+            texture_coordinates,
+            texture_coordinate_indices,
+        ) = MeshNeutral.weld_texture_coordinates(
+            dna.get_vertex_texture_coordinate_array_for_mesh(mesh_index),
+            face_vertex_arrays.texture_coordinate_indices,
+            face_vertex_arrays.polygon_connects,
+        )
+
+        return (
+            texture_coordinates[:, 0].tolist(),
+            texture_coordinates[:, 1].tolist(),
+            texture_coordinate_indices.tolist(),
+        )
+
+    @staticmethod
+    def weld_texture_coordinates(
+        texture_coordinates: np.ndarray,
+        texture_coordinate_indices: np.ndarray,
+        vertex_ids: np.ndarray,
+        distance: float = UV_MERGE_DISTANCE,
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
+        Builds the UV set of a mesh from the texture coordinate indices of the DNA. A UV is kept per vertex and texture
+        coordinate, and the UVs of the same vertex closer than the distance are welded, which gives the same UVs as
+        polyMergeUV without running it on the mesh.
 
-        texture_coordinates = dna.get_vertex_texture_coordinates_for_mesh(mesh_index)
-        dna_faces = dna.get_faces(mesh_index)
+        @type texture_coordinates: np.ndarray
+        @param texture_coordinates: (M, 2) array of the texture coordinates of the DNA
 
-        coordinate_indices = []
-        for layout_id in range(len(dna.get_layouts_for_mesh_index(mesh_index))):
-            coordinate_indices.append(
-                dna.get_texture_coordinate_index(mesh_index, layout_id)
-            )
+        @type texture_coordinate_indices: np.ndarray
+        @param texture_coordinate_indices: (V,) array of the texture coordinate index of each face vertex
 
-        texture_coordinate_us = []
-        texture_coordinate_vs = []
-        texture_coordinate_indices = []
+        @type vertex_ids: np.ndarray
+        @param vertex_ids: (V,) array of the vertex index of each face vertex
 
-        index_counter = 0
+        @type distance: float
+        @param distance: UVs of the same vertex closer than this are welded
 
-        for vertices_layout_index_array in dna_faces:
-            for vertex_layout_index_array in vertices_layout_index_array:
-                texture_coordinate = texture_coordinates[
-                    coordinate_indices[vertex_layout_index_array]
-                ]
-                texture_coordinate_us.append(texture_coordinate.u)
-                texture_coordinate_vs.append(texture_coordinate.v)
-                texture_coordinate_indices.append(index_counter)
-                index_counter += 1
+        @rtype: Tuple[np.ndarray, np.ndarray]
+        @returns: The (U, 2) array of the UVs and the (V,) array of the UV index of each face vertex
+        """
 
-        return texture_coordinate_us, texture_coordinate_vs, texture_coordinate_indices
+        texture_coordinate_count = len(texture_coordinates)
+        keys = vertex_ids.astype(np.int64) * texture_coordinate_count
+        keys += texture_coordinate_indices
+        keys, face_vertex_pairs = np.unique(keys, return_inverse=True)
+        pair_vertex_ids = keys // texture_coordinate_count
+        pair_uvs = texture_coordinates[keys % texture_coordinate_count]
+
+        # pairs are sorted by vertex, so UVs of the same vertex are compared at growing offsets until no vertex has
+        # that many UVs, then the welded UVs are labelled with the smallest pair index of their group
+        labels = np.arange(len(keys))
+        sources, targets = [], []
+        offset = 1
+        while offset < len(keys):
+            same_vertex = pair_vertex_ids[offset:] == pair_vertex_ids[:-offset]
+            if not same_vertex.any():
+                break
+            gaps = np.linalg.norm(pair_uvs[offset:] - pair_uvs[:-offset], axis=1)
+            close = same_vertex & (gaps < distance)
+            sources.append(np.flatnonzero(close))
+            targets.append(sources[-1] + offset)
+            offset += 1
+
+        if sources:
+            sources = np.concatenate(sources)
+            targets = np.concatenate(targets)
+            while len(sources):
+                previous = labels.copy()
+                np.minimum.at(labels, targets, labels[sources])
+                np.minimum.at(labels, sources, labels[targets])
+                labels = labels[labels]
+                if np.array_equal(labels, previous):
+                    break
+
+        labels, uv_indices = np.unique(labels, return_inverse=True)
+        return pair_uvs[labels], uv_indices[face_vertex_pairs]
+
+    @staticmethod
+    def prepare_texture_coordinates(
+        config: MeshConfig, dna: DNA, data: MeshModel
+    ) -> None:
+        """
+        Computes the welded UVs and the UV index of each face vertex once and stores them on the mesh model.
+
+        @type config: MeshConfig
+        @param config: Mesh configuration from the DNA.
+
+        @type data: MeshModel
+        @param data: An object that stores values that get passed around different methods.
+        """
+
+        if data.texture_coordinates is not None:
+            return
+        if data.face_vertex_arrays is None:
+            data.face_vertex_arrays = dna.get_face_vertex_arrays(config.mesh_index)
+        (
+            data.texture_coordinates,
+            data.texture_coordinate_indices,
+        ) = MeshNeutral.weld_texture_coordinates(
+            dna.get_vertex_texture_coordinate_array_for_mesh(config.mesh_index),
+            data.face_vertex_arrays.texture_coordinate_indices,
+            data.face_vertex_arrays.polygon_connects,
+        )
 
     @staticmethod
     def add_texture_coordinates(
@@ -197,16 +363,13 @@ class MeshNeutral:
 
         logging.info("adding texture coordinates...")
 
-        (
-            texture_coordinate_us,
-            texture_coordinate_vs,
-            texture_coordinate_indices,
-        ) = MeshNeutral.get_texture_data(config.mesh_index, dna)
-
-        fn_mesh.setUVs(texture_coordinate_us, texture_coordinate_vs)
-        fn_mesh.assignUVs(data.polygon_faces, texture_coordinate_indices)
+        MeshNeutral.prepare_texture_coordinates(config, dna, data)
 
-        mesh_name = dna.get_mesh_name(config.mesh_index)
+        fn_mesh.setUVs(
+            data.texture_coordinates[:, 0].tolist(),
+            data.texture_coordinates[:, 1].tolist(),
+        )
+        fn_mesh.assignUVs(
+            data.polygon_faces, data.texture_coordinate_indices.tolist()
+        )
 
-        cmds.select(mesh_name, replace=True)
-        cmds.polyMergeUV(mesh_name, distance=0.01, constructionHistory=False)
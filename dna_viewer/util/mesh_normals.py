@@ -1,12 +1,16 @@
 from typing import Optional
 
+import numpy as np
 from maya import cmds, mel
-from maya.api.OpenMaya import MFnMesh, MSpace, MVector
+from maya.api.OpenMaya import MFnMesh, MIntArray, MSpace, MVectorArray
 
 from ..config.mesh import Mesh as MeshConfig
+from ..const.mesh import BAKE_HISTORY_STEP, SOFT_EDGE_STEP
 from ..model.dna import DNA
 from ..model.mesh import Mesh as MeshModel
 from ..util.maya_util import Maya
+from ..util.mesh_finalizer import MeshFinalizer
+from ..util.mesh_neutral import MeshNeutral
 
 
 class MeshNormals:
@@ -14,6 +18,34 @@ class MeshNormals:
     A utility class used for adding normals to a mesh
     """
 
+    @staticmethod
+    def get_face_vertex_normals(
+        config: MeshConfig, dna: DNA, data: MeshModel
+    ) -> np.ndarray:
+        """
+        Gets the normal of each face vertex, rotated like the vertex positions. They are computed once and stored on
+        the mesh model.
+
+        @type config: MeshConfig
+        @param config: Mesh configuration from the DNA.
+
+        @type data: MeshModel
+        @param data: An object that stores values that get passed around different methods.
+
+        @rtype: np.ndarray
+        @returns: The (V, 3) face vertex normals
+        """
+
+        if data.face_vertex_normals is None:
+            if data.face_vertex_arrays is None:
+                data.face_vertex_arrays = dna.get_face_vertex_arrays(config.mesh_index)
+            # normals only follow the rotation of the vertex positions, not their scale
+            rotation = MeshNeutral.get_vertex_transform(config) / config.linear_modifier
+            data.face_vertex_normals = (
+                data.face_vertex_arrays.normals.astype(np.float64) @ rotation.T
+            )
+        return data.face_vertex_normals
+
     @staticmethod
     def add_normals(
         config: MeshConfig,
@@ -21,6 +53,7 @@ class MeshNormals:
         data: MeshModel,
         fn_mesh: MFnMesh,
         space: Optional[MSpace] = MSpace.kObject,
+        finalizer: Optional[MeshFinalizer] = None,
     ) -> None:
         """
         Adds normals to the mesh node.
@@ -36,34 +69,26 @@ class MeshNormals:
 
         @type space: Optional[space]
         @params space: The maya space used for setting the face vertex normals (defaults to MSpace.kObject)
-        """
-
-        data.vertex_normals = dna.get_vertex_normals_for_mesh(config.mesh_index)
-        data.dna_vertex_layout_normals = []
-        for layout in dna.get_layouts_for_mesh_index(config.mesh_index):
-            data.dna_vertex_layout_normals.append(
-                dna.get_normal_for_mesh_index_and_layout(config.mesh_index, layout)
-            )
 
-        normal_array = []
-        face_array = []
-        vertex_array = []
+        @type finalizer: Optional[MeshFinalizer]
+        @params finalizer: Queues the soft edge and history bake when given, otherwise they run right away
+        """
 
-        dna_faces = dna.get_faces(config.mesh_index)
-        for face_id, vertices_layout_index_array in enumerate(dna_faces):
-            for vertex_layout_index in vertices_layout_index_array:
-                vertex_normal_raw = data.dna_vertex_layout_normals[vertex_layout_index]
-                vertex_normal = MVector(
-                    vertex_normal_raw.x, vertex_normal_raw.y, vertex_normal_raw.z
-                )
-                normal_array.append(vertex_normal)
-                face_array.append(face_id)
-                vertex_id = data.dna_vertex_layout_positions[vertex_layout_index]
-                vertex_array.append(vertex_id)
+        normals = MeshNormals.get_face_vertex_normals(config, dna, data)
+        face_vertex_arrays = data.face_vertex_arrays
 
-        fn_mesh.setFaceVertexNormals(normal_array, face_array, vertex_array, space)
+        fn_mesh.setFaceVertexNormals(
+            MVectorArray(normals.tolist()),
+            MIntArray(face_vertex_arrays.face_ids.tolist()),
+            MIntArray(face_vertex_arrays.polygon_connects.tolist()),
+            space,
+        )
 
         mesh_node = MFnMesh(Maya.get_element(dna.get_mesh_name(config.mesh_index)))
         mesh_node.unlockVertexNormals(range(len(data.dna_vertex_positions)))
-        cmds.polySoftEdge(mesh_node.name(), a=180, ch=False)
-        mel.eval("BakeAllNonDefHistory;")
+        if finalizer is not None:
+            finalizer.queue(SOFT_EDGE_STEP, mesh_node.name())
+            finalizer.queue(BAKE_HISTORY_STEP, mesh_node.name())
+        else:
+            cmds.polySoftEdge(mesh_node.name(), a=180, ch=False)
+            mel.eval("BakeAllNonDefHistory;")
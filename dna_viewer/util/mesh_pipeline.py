@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Iterable, Iterator, Optional, TypeVar
+
+from ..const.mesh import PIPELINE_MAX_PENDING, PIPELINE_WORKERS
+from ..util.error import DNAViewerError
+
+Prepared = TypeVar("Prepared")
+
+
+class MeshPipeline:
+    """
+    A class used for overlapping the preparation of mesh data with the creation of the maya nodes. Worker threads
+    prepare the meshes ahead of the build, while the main thread, the only one allowed to change the scene, consumes
+    them in order. At most max_pending prepared meshes are held at once, which caps the memory used.
+
+    Attributes
+    ----------
+    @type workers: int
+    @param workers: The number of worker threads, 0 prepares every mesh on the main thread right before it is built
+
+    @type max_pending: int
+    @param max_pending: The maximum number of meshes being prepared or waiting to be built
+
+    @type prepare_elapsed: float
+    @param prepare_elapsed: The time spent preparing meshes in seconds, summed over all threads
+
+    @type wait_elapsed: float
+    @param wait_elapsed: The time the main thread spent waiting for prepared meshes in seconds
+
+    @type lock: threading.Lock
+    @param lock: Guards the time summed up by the worker threads
+    """
+
+    def __init__(
+        self, workers: int = PIPELINE_WORKERS, max_pending: int = PIPELINE_MAX_PENDING
+    ) -> None:
+        if workers < 0:
+            raise DNAViewerError(f"Pipeline workers can not be negative, got {workers}")
+        if max_pending < 1:
+            raise DNAViewerError(
+                f"Pipeline needs at least one pending mesh, got {max_pending}"
+            )
+        self.workers = workers
+        self.max_pending = max_pending
+        self.prepare_elapsed = 0.0
+        self.wait_elapsed = 0.0
+        self.lock = threading.Lock()
+
+    def prepare(self, preparer: Callable[[int], Prepared], mesh_index: int) -> Prepared:
+        """
+        Prepares a single mesh and measures the time it took.
+
+        @type preparer: Callable[[int], Prepared]
+        @param preparer: The function preparing the mesh with the given index
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+
+        @rtype: Prepared
+        @returns: The prepared mesh
+        """
+
+        start = time.perf_counter()
+        prepared = preparer(mesh_index)
+        with self.lock:
+            self.prepare_elapsed += time.perf_counter() - start
+        return prepared
+
+    def iter_prepared(
+        self,
+        preparer: Callable[[int], Prepared],
+        mesh_indices: Iterable[int],
+        loader: Optional[Callable[[int], Any]] = None,
+    ) -> Iterator[Prepared]:
+        """
+        Yields the prepared meshes in the order of the given mesh indices. The preparer must not touch the scene or
+        the stream reader of the DNA, it runs in the worker threads.
+
+        @type preparer: Callable[[int], Prepared]
+        @param preparer: The function preparing the mesh with the given index
+
+        @type mesh_indices: Iterable[int]
+        @param mesh_indices: The indices of the meshes
+
+        @type loader: Optional[Callable[[int], Any]]
+        @param loader: Runs on the calling thread for every mesh before it is handed to a worker, e.g. to read the mesh through the stream reader, which can not be shared between threads
+
+        @rtype: Iterator[Prepared]
+        @returns: The prepared meshes
+        """
+
+        if self.workers == 0:
+            for mesh_index in mesh_indices:
+                if loader is not None:
+                    loader(mesh_index)
+                yield self.prepare(preparer, mesh_index)
+            return
+
+        mesh_indices = iter(mesh_indices)
+        pending: Deque[Future] = deque()
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="mesh_pipeline"
+        ) as executor:
+            try:
+                for mesh_index in mesh_indices:
+                    if loader is not None:
+                        loader(mesh_index)
+                    pending.append(executor.submit(self.prepare, preparer, mesh_index))
+                    if len(pending) >= self.max_pending:
+                        yield self.wait(pending.popleft())
+                while pending:
+                    yield self.wait(pending.popleft())
+            finally:
+                for future in pending:
+                    future.cancel()
+        logging.info(
+            f"prepared meshes in {self.prepare_elapsed:.3f}s on {self.workers} worker(s), "
+            f"the build waited {self.wait_elapsed:.3f}s for them"
+        )
+
+    def wait(self, future: "Future[Prepared]") -> Prepared:
+        """
+        Waits for a mesh being prepared, errors raised while preparing it are raised again here.
+
+        @type future: Future[Prepared]
+        @param future: The mesh being prepared
+
+        @rtype: Prepared
+        @returns: The prepared mesh
+        """
+
+        start = time.perf_counter()
+        prepared = future.result()
+        self.wait_elapsed += time.perf_counter() - start
+        return prepared
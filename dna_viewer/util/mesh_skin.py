@@ -1,11 +1,17 @@
 import logging
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
+import numpy as np
 from maya import cmds
+from maya.api.OpenMaya import MDoubleArray, MFn, MFnSingleIndexedComponent, MIntArray
+from maya.api.OpenMayaAnim import MFnSkinCluster
 
 from ..const.naming import SKIN_CLUSTER_AFFIX
 from ..const.printing import SKIN_WEIGHT_PRINT_RANGE
+from ..const.skin import SKIN_WEIGHT_BLOCK_SIZE
 from ..model.dna import DNA
+from ..util.error import DNAViewerError
+from ..util.maya_util import Maya
 
 
 class MeshSkin:
@@ -96,7 +102,7 @@ class MeshSkin:
         dna: DNA, mesh_index: int, mesh_name: str, joint_ids: List[int]
     ) -> None:
         """
-        Sets the skin weights attributes.
+        Sets the skin weights attributes one vertex and influence at a time, kept for comparison with set_skin_weights_bulk.
 
         @type dna: DNA
         @param dna: Instance of DNA.
@@ -133,3 +139,104 @@ class MeshSkin:
                 )
         if len(skin_weights) % SKIN_WEIGHT_PRINT_RANGE != 0:
             logging.info(f"\t{len(skin_weights)} / {len(skin_weights)}")
+
+    @staticmethod
+    def get_influence_map(
+        skin_cluster: MFnSkinCluster, dna: DNA, joint_ids: List[int]
+    ) -> np.ndarray:
+        """
+        Gets the mapping of joint indices to the influence indices of the skin cluster.
+
+        @type skin_cluster: MFnSkinCluster
+        @param skin_cluster: The skin cluster of the mesh
+
+        @type dna: DNA
+        @param dna: Instance of DNA.
+
+        @type joint_ids: List[int]
+        @param joint_ids: List of joint indices that are influences of the skin cluster.
+
+        @rtype: np.ndarray
+        @returns: The influence index for every joint index, -1 for joints that are not influences
+        """
+
+        positions = {
+            path.partialPathName(): index
+            for index, path in enumerate(skin_cluster.influenceObjects())
+        }
+        joint_names = dna.definition.joints.names
+        influence_map = np.full(len(joint_names), -1, dtype=np.int64)
+        for joint_id in joint_ids:
+            influence_map[joint_id] = positions.get(joint_names[joint_id], -1)
+        return influence_map
+
+    @staticmethod
+    def set_skin_weights_bulk(
+        dna: DNA,
+        mesh_index: int,
+        mesh_name: str,
+        joint_ids: List[int],
+        skin_weight_arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+    ) -> None:
+        """
+        Sets the skin weights with MFnSkinCluster.setWeights, one call per block of SKIN_WEIGHT_BLOCK_SIZE vertices.
+        Every block only sets the influences its vertices use, plus the influence the mesh was bound to.
+
+        @type dna: DNA
+        @param dna: Instance of DNA.
+
+        @type mesh_index: int
+        @param mesh_index: The index of the mesh.
+
+        @type mesh_name: str
+        @param mesh_name: The mesh name that is used for getting the skin cluster name.
+
+        @type joint_ids: List[int]
+        @param joint_ids: List of joint indices used for setting the skin weight attribute.
+
+        @type skin_weight_arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]
+        @param skin_weight_arrays: The already computed skin weight arrays of the mesh, read from the DNA if None
+        """
+
+        logging.info("setting skin weights...")
+        if skin_weight_arrays is None:
+            skin_weight_arrays = dna.get_skin_weight_arrays_for_mesh(mesh_index)
+        offsets, joint_indices, values = skin_weight_arrays
+        vertex_count = len(offsets) - 1
+
+        skin_cluster = MFnSkinCluster(
+            Maya.get_element(f"{mesh_name}_{SKIN_CLUSTER_AFFIX}")
+        )
+        mesh_path = Maya.get_element(mesh_name)
+        mesh_path.extendToShape()
+
+        influence_map = MeshSkin.get_influence_map(skin_cluster, dna, joint_ids)
+        influences = influence_map[joint_indices]
+        if (influences < 0).any():
+            raise DNAViewerError(
+                f"{mesh_name} is weighted to joints it is not bound to"
+            )
+        bind_influence = influence_map[joint_ids[0]]
+        rows = np.repeat(np.arange(vertex_count), np.diff(offsets))
+
+        for start in range(0, vertex_count, SKIN_WEIGHT_BLOCK_SIZE):
+            end = min(start + SKIN_WEIGHT_BLOCK_SIZE, vertex_count)
+            first, last = offsets[start], offsets[end]
+            block_influences = np.union1d(influences[first:last], [bind_influence])
+            weights = np.zeros((end - start, len(block_influences)), dtype=np.float64)
+            weights[
+                rows[first:last] - start,
+                np.searchsorted(block_influences, influences[first:last]),
+            ] = values[first:last]
+
+            component = MFnSingleIndexedComponent()
+            components = component.create(MFn.kMeshVertComponent)
+            component.addElements(MIntArray(range(start, end)))
+            skin_cluster.setWeights(
+                mesh_path,
+                components,
+                MIntArray(block_influences.tolist()),
+                MDoubleArray(weights.ravel().tolist()),
+                False,
+            )
+            logging.info(f"\t{end} / {vertex_count}")
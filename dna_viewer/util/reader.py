@@ -1,5 +1,7 @@
 import dna
 
+from ..config.dna import DataLayer, LoadOptions
+
 
 class Reader:
     """
@@ -7,24 +9,85 @@ class Reader:
     """
 
     @staticmethod
-    def create_stream_reader(dna_path: str) -> dna.BinaryStreamReader:
+    def create_stream_reader(
+        dna_path: str, layer: int = dna.DataLayer_All, memory_mapped: bool = False
+    ) -> dna.BinaryStreamReader:
         """
         Creates a stream reader needed for reading values from the DNA file.
 
         @type dna_path: str
         @param dna_path: The path of the DNA file
 
+        @type layer: int
+        @param layer: The dna.DataLayer_* value that limits which parts of the file are read (defaults to dna.DataLayer_All)
+
+        @type memory_mapped: bool
+        @param memory_mapped: A flag representing whether the file is memory mapped and paged in on demand instead of read through a file stream
+
         @rtype: dna.BinaryStreamReader
         @returns: The stream reader needed for reading values from the DNA file
         """
 
-        stream = dna.FileStream(
-            dna_path, dna.FileStream.AccessMode_Read, dna.FileStream.OpenMode_Binary
-        )
-
-        reader = dna.BinaryStreamReader(stream, dna.DataLayer_All)
+        stream = Reader.create_stream(dna_path, memory_mapped)
+        reader = dna.BinaryStreamReader(stream, layer)
         reader.read()
         if not dna.Status.isOk():
             status = dna.Status.get()
             raise RuntimeError(f"Error loading DNA: {status.message}")
         return reader
+
+    @staticmethod
+    def create_stream(
+        dna_path: str, memory_mapped: bool = False
+    ) -> dna.BoundedIOStream:
+        """
+        Creates a read only stream for the DNA file.
+
+        @type dna_path: str
+        @param dna_path: The path of the DNA file
+
+        @type memory_mapped: bool
+        @param memory_mapped: A flag representing whether a dna.MemoryMappedFileStream should be used instead of a dna.FileStream
+
+        @rtype: dna.BoundedIOStream
+        @returns: The stream used for reading the DNA file
+        """
+
+        if memory_mapped:
+            return dna.MemoryMappedFileStream(
+                dna_path, dna.MemoryMappedFileStream.AccessMode_Read
+            )
+        return dna.FileStream(
+            dna_path, dna.FileStream.AccessMode_Read, dna.FileStream.OpenMode_Binary
+        )
+
+    @staticmethod
+    def get_data_layer(options: LoadOptions) -> int:
+        """
+        Gets the narrowest dna.DataLayer_* value that contains every layer requested in the load options.
+
+        @type options: LoadOptions
+        @param options: The load options containing the requested layers
+
+        @rtype: int
+        @returns: The dna.DataLayer_* value used for opening the stream reader
+        """
+
+        with_blend_shapes = options.has_layer(DataLayer.blend_shapes)
+        if options.has_layer(DataLayer.geometry):
+            if options.has_layer(DataLayer.behavior):
+                return (
+                    dna.DataLayer_All
+                    if with_blend_shapes
+                    else dna.DataLayer_AllWithoutBlendShapes
+                )
+            return (
+                dna.DataLayer_Geometry
+                if with_blend_shapes
+                else dna.DataLayer_GeometryWithoutBlendShapes
+            )
+        if options.has_layer(DataLayer.behavior):
+            return dna.DataLayer_Behavior
+        if options.has_layer(DataLayer.definition):
+            return dna.DataLayer_Definition
+        return dna.DataLayer_Descriptor
@@ -1,9 +1,20 @@
-from typing import Dict, List
+import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional
 
+from ..const.reference import DEFAULT_REFERENCE_MAX_BYTES, DEFAULT_REFERENCE_MAX_ENTRIES
+from ..model.geometry import LazyMeshes
 from ..reader.geometry import Geometry
+from ..util.error import DNAViewerError
 
 
-def get_geometry_reader(mesh_index: int, dna_path: str = None) -> Geometry:
+def get_geometry_reader(
+    mesh_index: int, dna_path: str = None, owner: Optional[LazyMeshes] = None
+) -> Geometry:
     """
     Gets a Geometry reader for a given mesh index and a dna_file path.
 
@@ -13,14 +24,21 @@ def get_geometry_reader(mesh_index: int, dna_path: str = None) -> Geometry:
     @type dna_path: str
     @param dna_path: The path of the DNA file
 
+    @type owner: Optional[LazyMeshes]
+    @param owner: The meshes of the DNA model whose reader is needed, it is opened again if it was released
+
     @rtype: Geometry
     @returns: A geometry reader stored in the Reference class object for the given mesh index and DNA
     """
 
-    return Reference.get_geometry_reader(mesh_index=mesh_index, dna_path=dna_path)
+    return Reference.get_geometry_reader(
+        mesh_index=mesh_index, dna_path=dna_path, owner=owner
+    )
 
 
-def set_geometry_reader(dna_path: str, geometry_reader: Geometry) -> None:
+def set_geometry_reader(
+    dna_path: str, geometry_reader: Geometry, owner: Optional[LazyMeshes] = None
+) -> None:
     """
     Adds a new geometry reader to the the references mapped to the DNA file path.
 
@@ -29,22 +47,196 @@ def set_geometry_reader(dna_path: str, geometry_reader: Geometry) -> None:
 
     @type geometry_reader: Geometry
     @param geometry_reader: The geometry stream reader
+
+    @type owner: Optional[LazyMeshes]
+    @param owner: The meshes of the DNA model holding the reader, the references only keep the reader if None
     """
 
     return Reference.set_geometry_reader(
-        dna_path=dna_path, geometry_reader=geometry_reader
+        dna_path=dna_path, geometry_reader=geometry_reader, owner=owner
     )
 
 
+def track_stream_reader(dna_path: str, owner: LazyMeshes) -> None:
+    """
+    Tracks the stream reader owned by the meshes of a DNA model, so it is released once too many are open.
+
+    @type dna_path: str
+    @param dna_path: The path of the DNA file
+
+    @type owner: LazyMeshes
+    @param owner: The meshes of the DNA model owning the stream reader
+    """
+
+    Reference.track(dna_path=dna_path, owner=owner)
+
+
+def unload(dna_path: str) -> bool:
+    """
+    Drops the stream readers of the DNA file, and the geometry readers created from them, for good.
+
+    @type dna_path: str
+    @param dna_path: The path of the DNA file
+
+    @rtype: bool
+    @returns: True if stream readers were open for the DNA file
+    """
+
+    return Reference.unload(dna_path=dna_path)
+
+
+def get_reference_stats() -> "ReferenceStats":
+    """
+    Gets the number of readers kept in the references and the approximate memory they hold.
+
+    @rtype: ReferenceStats
+    @returns: The statistics of the references
+    """
+
+    return Reference.get_stats()
+
+
+@dataclass
+class ReferenceEntry:
+    """
+    A class used to represent a single open stream reader of a DNA file and the geometry readers created from it
+
+    Attributes
+    ----------
+    @type path: str
+    @param path: The normalized path of the DNA file
+
+    @type owner: Optional[weakref.ref]
+    @param owner: A weak reference to the meshes of the DNA model owning the stream reader, None if the references keep
+    the geometry readers themselves
+
+    @type geometry_readers: Dict[int, Geometry]
+    @param geometry_readers: Mapping of mesh indices to geometry readers that are only kept by the references
+
+    @type approximate_bytes: int
+    @param approximate_bytes: The approximate memory held by the stream reader, the size of the DNA file
+    """
+
+    path: str
+    owner: Optional[weakref.ref] = field(default=None)
+    geometry_readers: Dict[int, Geometry] = field(default_factory=dict)
+    approximate_bytes: int = field(default=0)
+
+    def get_owner(self) -> Optional[LazyMeshes]:
+        return None if self.owner is None else self.owner()
+
+    def get_geometry_readers(self) -> Dict[int, Geometry]:
+        """
+        Gets the geometry readers created from the stream reader, the ones of the owner if there is one
+
+        @rtype: Dict[int, Geometry]
+        @returns: Mapping of mesh indices to geometry readers
+        """
+
+        if self.owner is None:
+            return self.geometry_readers
+        owner = self.get_owner()
+        return {} if owner is None else owner.geometry_readers
+
+    def is_alive(self) -> bool:
+        """
+        Checks if the stream reader is still held, either by the references or by a live DNA model
+
+        @rtype: bool
+        @returns: True if the stream reader is still held
+        """
+
+        if self.owner is None:
+            return len(self.geometry_readers) > 0
+        owner = self.get_owner()
+        return owner is not None and not owner.unloaded
+
+    def release(self) -> None:
+        """Drops the stream reader, a live DNA model opens it again when one of its meshes needs it"""
+
+        owner = self.get_owner()
+        if owner is not None:
+            owner.release()
+        self.geometry_readers.clear()
+
+    def unload(self) -> None:
+        """Drops the stream reader for good, the DNA model can no longer read in meshes or blend shapes"""
+
+        owner = self.get_owner()
+        if owner is not None:
+            owner.unload()
+        self.geometry_readers.clear()
+
+
+@dataclass
+class ReferenceStats:
+    """
+    A class used to represent the statistics of the references
+
+    Attributes
+    ----------
+    @type paths: List[str]
+    @param paths: The paths of the DNA files with kept readers, most recently used last
+
+    @type open_readers: int
+    @param open_readers: The number of kept stream readers
+
+    @type geometry_readers: int
+    @param geometry_readers: The number of kept geometry readers
+
+    @type approximate_bytes: int
+    @param approximate_bytes: The approximate memory held by the kept stream readers
+    """
+
+    paths: List[str] = field(default_factory=list)
+    open_readers: int = field(default=0)
+    geometry_readers: int = field(default=0)
+    approximate_bytes: int = field(default=0)
+
+
 class Reference:
     """
-    A class used for storing and retrieving geometry readers.
+    A class used for tracking the open stream readers of DNA files, least recently used first.
+    Every DNA model owns the stream reader its meshes are read with, the references only track it weakly, so loading
+    the same file twice keeps both models working. Once more than max_entries stream readers, or about max_bytes of
+    them, are open, the least recently used ones are released, and their models open them again on demand.
+    Geometry readers registered without a model are kept by the references, one set per DNA file.
     """
 
-    geometry_readers: Dict[str, List[Geometry]] = {}
+    entries: "OrderedDict[Hashable, ReferenceEntry]" = OrderedDict()
+    max_entries: int = DEFAULT_REFERENCE_MAX_ENTRIES
+    max_bytes: int = DEFAULT_REFERENCE_MAX_BYTES
+    lock = threading.RLock()
+
+    @staticmethod
+    def normalize_path(dna_path: str) -> str:
+        return os.path.normcase(os.path.abspath(dna_path))
+
+    @staticmethod
+    def get_key(path: str, owner: Optional[LazyMeshes]) -> Hashable:
+        return path if owner is None else (path, id(owner))
 
     @staticmethod
-    def get_geometry_reader(mesh_index: int, dna_path: str = None) -> Geometry:
+    def set_limits(max_entries: int, max_bytes: int) -> None:
+        """
+        Sets the bounds above which the least recently used stream readers are released.
+
+        @type max_entries: int
+        @param max_entries: The maximum number of open stream readers
+
+        @type max_bytes: int
+        @param max_bytes: The maximum approximate memory held by the open stream readers
+        """
+
+        with Reference.lock:
+            Reference.max_entries = max_entries
+            Reference.max_bytes = max_bytes
+            Reference.evict()
+
+    @staticmethod
+    def get_geometry_reader(
+        mesh_index: int, dna_path: str = None, owner: Optional[LazyMeshes] = None
+    ) -> Geometry:
         """
         Gets a Geometry reader for a given mesh index and a dna_file path.
 
@@ -52,19 +244,45 @@ class Reference:
         @param mesh_index: The mesh index
 
         @type dna_path: str
-        @param dna_path: The path of the DNA file
+        @param dna_path: The path of the DNA file, the most recently used DNA file if None
+
+        @type owner: Optional[LazyMeshes]
+        @param owner: The meshes of the DNA model whose reader is needed, it is opened again if it was released
 
         @rtype: Geometry
-        @returns: A stored geometry reader for the given mesh index and DNA
+        @returns: A geometry reader for the given mesh index and DNA, from the most recently used stream reader first
         """
 
-        if dna_path is None:  # defaults to first one
-            geometry_readers_for_dna = next(iter(Reference.geometry_readers.values()))
-            return geometry_readers_for_dna[mesh_index]
-        return Reference.geometry_readers[dna_path][mesh_index]
+        if owner is not None:
+            # opening the stream reader again registers it, so the lock is not held while reading
+            geometry_reader = owner.get_geometry_reader(mesh_index)
+            with Reference.lock:
+                key = Reference.get_key(Reference.normalize_path(dna_path), owner)
+                if key in Reference.entries:
+                    Reference.entries.move_to_end(key)
+            return geometry_reader
+
+        with Reference.lock:
+            if dna_path is None:
+                if not Reference.entries:
+                    raise DNAViewerError("No geometry readers are loaded")
+                path = next(reversed(Reference.entries.values())).path
+            else:
+                path = Reference.normalize_path(dna_path)
+
+            for key, entry in reversed(Reference.entries.items()):
+                readers = entry.get_geometry_readers()
+                if entry.path == path and mesh_index in readers:
+                    Reference.entries.move_to_end(key)
+                    return readers[mesh_index]
+            raise DNAViewerError(
+                f"No geometry reader for mesh {mesh_index} of {dna_path}, it was either not loaded or already unloaded"
+            )
 
     @staticmethod
-    def set_geometry_reader(dna_path: str, geometry_reader: Geometry) -> None:
+    def set_geometry_reader(
+        dna_path: str, geometry_reader: Geometry, owner: Optional[LazyMeshes] = None
+    ) -> None:
         """
         Adds a mapping value of a geometry reader to the DNA file path.
 
@@ -73,9 +291,128 @@ class Reference:
 
         @type geometry_reader: Geometry
         @param geometry_reader: The geometry reader that should be added to the mapping.
+
+        @type owner: Optional[LazyMeshes]
+        @param owner: The meshes of the DNA model holding the reader, the references only keep the reader if None
+        """
+
+        with Reference.lock:
+            entry = Reference.track(dna_path, owner)
+            if owner is None:
+                entry.geometry_readers[geometry_reader.mesh_index] = geometry_reader
+            else:
+                owner.geometry_readers[geometry_reader.mesh_index] = geometry_reader
+
+    @staticmethod
+    def track(dna_path: str, owner: Optional[LazyMeshes] = None) -> ReferenceEntry:
+        """
+        Tracks the open stream reader of a DNA model as the most recently used one, releasing the least recently used
+        ones above the bounds.
+
+        @type dna_path: str
+        @param dna_path: The path of the DNA file
+
+        @type owner: Optional[LazyMeshes]
+        @param owner: The meshes of the DNA model owning the stream reader, the references own it if None
+
+        @rtype: ReferenceEntry
+        @returns: The entry of the stream reader
+        """
+
+        path = Reference.normalize_path(dna_path)
+        key = Reference.get_key(path, owner)
+        with Reference.lock:
+            entry = Reference.entries.get(key)
+            if entry is None or (owner is not None and entry.get_owner() is not owner):
+                entry = ReferenceEntry(
+                    path=path,
+                    owner=None if owner is None else weakref.ref(owner),
+                    approximate_bytes=(
+                        os.path.getsize(path) if os.path.isfile(path) else 0
+                    ),
+                )
+                Reference.entries[key] = entry
+            Reference.entries.move_to_end(key)
+            Reference.evict(keep=key)
+            return entry
+
+    @staticmethod
+    def unload(dna_path: str) -> bool:
+        """
+        Drops the stream readers of the DNA file, including the ones owned by its DNA models. Those models are marked
+        as unloaded, their blend shapes and the meshes that were not read in yet can no longer be read.
+
+        @type dna_path: str
+        @param dna_path: The path of the DNA file
+
+        @rtype: bool
+        @returns: True if stream readers were open for the DNA file
         """
 
-        if dna_path not in Reference.geometry_readers:
-            Reference.geometry_readers[dna_path] = []
+        path = Reference.normalize_path(dna_path)
+        with Reference.lock:
+            entries = [
+                (key, entry)
+                for key, entry in Reference.entries.items()
+                if entry.path == path
+            ]
+            for key, entry in entries:
+                del Reference.entries[key]
+        for _, entry in entries:
+            entry.unload()
+        return len(entries) > 0
+
+    @staticmethod
+    def get_size() -> int:
+        return sum(entry.approximate_bytes for entry in Reference.entries.values())
+
+    @staticmethod
+    def evict(keep: Hashable = None) -> None:
+        """
+        Forgets the stream readers whose models are gone and releases the least recently used stream readers until
+        the bounds are met.
+
+        @type keep: Hashable
+        @param keep: The key of the entry that should never be released
+        """
+
+        with Reference.lock:
+            for key, entry in list(Reference.entries.items()):
+                if not entry.is_alive() and key != keep:
+                    del Reference.entries[key]
+            size = Reference.get_size()
+            for key, entry in list(Reference.entries.items()):
+                if (
+                    len(Reference.entries) <= Reference.max_entries
+                    and size <= Reference.max_bytes
+                ):
+                    break
+                if key == keep:
+                    continue
+                logging.info(f"releasing the stream reader of {entry.path}")
+                size -= entry.approximate_bytes
+                del Reference.entries[key]
+                entry.release()
+
+    @staticmethod
+    def get_stats() -> ReferenceStats:
+        """
+        Gets the number of readers kept in the references and the approximate memory they hold.
+
+        @rtype: ReferenceStats
+        @returns: The statistics of the references
+        """
 
-        Reference.geometry_readers[dna_path].append(geometry_reader)
+        with Reference.lock:
+            Reference.evict()
+            return ReferenceStats(
+                paths=list(
+                    dict.fromkeys(entry.path for entry in Reference.entries.values())
+                ),
+                open_readers=len(Reference.entries),
+                geometry_readers=sum(
+                    len(entry.get_geometry_readers())
+                    for entry in Reference.entries.values()
+                ),
+                approximate_bytes=Reference.get_size(),
+            )
@@ -0,0 +1,421 @@
+import logging
+import time
+from typing import Dict, Optional
+
+import numpy as np
+from scipy.sparse import coo_matrix
+
+from ..const.behavior import EVALUATION_DTYPE, JOINT_ATTRIBUTE_COUNT
+from ..model.behavior import (
+    Behavior,
+    BehaviorLOD,
+    BehaviorOutputs,
+    ConditionalTable,
+    ConditionalTableArrays,
+)
+from ..model.dna import DNA
+from ..util.error import DNAViewerError
+
+
+class RigLogicEvaluator:
+    """
+    A class used for evaluating the behavior of the DNA without Maya and the RigLogic plugin. Every LOD is compiled
+    once into sparse matrices and index arrays, then batches of poses are evaluated in single vectorized calls.
+
+    GUI controls are mapped to raw controls through the gui to raw conditional table, the PSD values are the products
+    of their raw control inputs clamped to [0, 1], then the joint deltas are the product of the joint matrix with the
+    raw control and PSD values, blend shape channels copy their inputs and animated maps go through their own
+    conditional table, clamped to [0, 1].
+
+    Attributes
+    ----------
+    @type dna: DNA
+    @param dna: The DNA whose behavior is evaluated
+
+    @type behavior: Behavior
+    @param behavior: The behavior part of the DNA
+
+    @type gui_control_count: int
+    @param gui_control_count: The number of GUI controls
+
+    @type raw_control_count: int
+    @param raw_control_count: The number of raw controls
+
+    @type control_count: int
+    @param control_count: The number of raw controls and PSDs, the inputs of the joint matrix
+
+    @type joint_row_count: int
+    @param joint_row_count: The number of joint outputs
+
+    @type blend_shape_channel_count: int
+    @param blend_shape_channel_count: The number of blend shape channels
+
+    @type animated_map_count: int
+    @param animated_map_count: The number of animated maps
+
+    @type lod_count: int
+    @param lod_count: The number of LODs
+
+    @type dtype: np.dtype
+    @param dtype: The precision of the evaluation
+
+    @type gui_to_raw: ConditionalTableArrays
+    @param gui_to_raw: The compiled gui to raw conditional table
+
+    @type psd_rows: np.ndarray
+    @param psd_rows: The control index of every PSD with inputs
+
+    @type psd_columns: np.ndarray
+    @param psd_columns: The raw control index of every PSD input, sorted by PSD
+
+    @type psd_values: np.ndarray
+    @param psd_values: The weight of every PSD input, sorted by PSD
+
+    @type psd_starts: np.ndarray
+    @param psd_starts: The position of the first input of every PSD in psd_columns
+
+    @type lods: Dict[int, BehaviorLOD]
+    @param lods: The LODs compiled so far
+    """
+
+    def __init__(self, dna: DNA, dtype: str = EVALUATION_DTYPE) -> None:
+        if dna.behavior is None or dna.definition is None:
+            raise DNAViewerError(
+                "Evaluating the behavior needs the definition and behavior layers of the DNA"
+            )
+        self.dna = dna
+        self.behavior: Behavior = dna.behavior
+        self.dtype = np.dtype(dtype)
+
+        definition = dna.definition
+        gui_to_raw = self.behavior.gui_to_raw
+        self.gui_control_count = max(
+            len(definition.gui_control_names), max(gui_to_raw.inputs, default=-1) + 1
+        )
+        self.raw_control_count = len(definition.raw_control_names)
+        self.control_count = max(
+            self.raw_control_count + (self.behavior.psd.count or 0),
+            self.behavior.joints.joint_column_count or 0,
+        )
+        self.joint_row_count = self.behavior.joints.joint_row_count or (
+            len(definition.joints.names) * JOINT_ATTRIBUTE_COUNT
+        )
+        self.blend_shape_channel_count = len(definition.blend_shape_channels.names)
+        self.animated_map_count = len(definition.animated_maps.names)
+        self.lod_count = dna.get_lod_count()
+
+        self.gui_to_raw = self.compile_conditional_table(
+            gui_to_raw, len(gui_to_raw.inputs), self.control_count
+        )
+        self.compile_psd()
+        self.lods: Dict[int, BehaviorLOD] = {}
+
+    def compile_conditional_table(
+        self, table: ConditionalTable, entry_count: int, output_count: int
+    ) -> ConditionalTableArrays:
+        """
+        Compiles the first entries of a conditional table into arrays.
+
+        @type table: ConditionalTable
+        @param table: The conditional table
+
+        @type entry_count: int
+        @param entry_count: The number of entries that are used
+
+        @type output_count: int
+        @param output_count: The number of outputs of the table
+
+        @rtype: ConditionalTableArrays
+        @returns: The compiled conditional table
+        """
+
+        inputs = np.asarray(table.inputs[:entry_count], dtype=np.int64)
+        outputs = np.asarray(table.outputs[:entry_count], dtype=np.int64)
+        from_values = np.asarray(table.from_values[:entry_count], dtype=self.dtype)
+        to_values = np.asarray(table.to_values[:entry_count], dtype=self.dtype)
+
+        # where two ranges of the same input and output meet, the shared bound only belongs to the lower range
+        pairs = inputs * max(output_count, 1) + outputs
+        range_ends = set(zip(pairs.tolist(), to_values.tolist()))
+        includes_from = np.array(
+            [
+                (pair, value) not in range_ends
+                for pair, value in zip(pairs.tolist(), from_values.tolist())
+            ],
+            dtype=bool,
+        )
+
+        return ConditionalTableArrays(
+            inputs=inputs,
+            from_values=from_values,
+            to_values=to_values,
+            slope_values=np.asarray(table.slope_values[:entry_count], dtype=self.dtype),
+            cut_values=np.asarray(table.cut_values[:entry_count], dtype=self.dtype),
+            includes_from=includes_from,
+            output_matrix=coo_matrix(
+                (
+                    np.ones(len(outputs), dtype=self.dtype),
+                    (outputs, np.arange(len(outputs))),
+                ),
+                shape=(output_count, len(outputs)),
+            ).tocsr(),
+        )
+
+    def compile_psd(self) -> None:
+        """Compiles the PSD matrix, its inputs are grouped by PSD so their products can be reduced at once"""
+
+        psd_matrix = self.dna.get_psd_matrix()
+        self.psd_columns = psd_matrix.indices.astype(np.int64)
+        self.psd_values = psd_matrix.data.astype(self.dtype, copy=False)
+        self.psd_rows = np.flatnonzero(np.diff(psd_matrix.indptr))
+        self.psd_starts = psd_matrix.indptr[self.psd_rows].astype(np.int64)
+        if len(self.psd_rows) and (
+            self.psd_rows[0] < self.raw_control_count
+            or self.psd_rows[-1] >= self.control_count
+        ):
+            raise DNAViewerError("PSD row indices are outside of the PSD outputs")
+
+    def compile_lod(self, lod: int) -> BehaviorLOD:
+        """
+        Compiles the joint groups, blend shape channels and animated maps used by a LOD.
+
+        @type lod: int
+        @param lod: The LOD index
+
+        @rtype: BehaviorLOD
+        @returns: The compiled LOD
+        """
+
+        if not 0 <= lod < self.lod_count:
+            raise DNAViewerError(f"Lod {lod} does not exist")
+
+        rows, columns, values = [], [], []
+        for joint_group_index in range(self.dna.get_joint_group_count()):
+            group_matrix = self.dna.get_joint_group_matrix(joint_group_index, lod)
+            if not group_matrix.nnz:
+                continue
+            rows.append(
+                np.repeat(
+                    self.dna.get_joint_group_output_indices(joint_group_index, lod),
+                    np.diff(group_matrix.indptr),
+                ).astype(np.int64)
+            )
+            columns.append(group_matrix.indices.astype(np.int64))
+            values.append(group_matrix.data.astype(self.dtype, copy=False))
+
+        joint_matrix = coo_matrix(
+            (
+                np.concatenate(values) if values else np.zeros(0, self.dtype),
+                (
+                    np.concatenate(rows) if rows else np.zeros(0, np.int64),
+                    np.concatenate(columns) if columns else np.zeros(0, np.int64),
+                ),
+            ),
+            shape=(self.joint_row_count, self.control_count),
+        ).tocsr()
+        joint_matrix.eliminate_zeros()
+
+        blend_shapes = self.behavior.blend_shapes
+        blend_shape_count = (
+            blend_shapes.lods[lod]
+            if lod < len(blend_shapes.lods)
+            else len(blend_shapes.inputs)
+        )
+        animated_maps = self.behavior.animated_maps
+        animated_map_entry_count = (
+            animated_maps.lods[lod]
+            if lod < len(animated_maps.lods)
+            else len(animated_maps.conditional_table.inputs)
+        )
+
+        return BehaviorLOD(
+            lod=lod,
+            joint_matrix=joint_matrix,
+            blend_shape_inputs=np.asarray(
+                blend_shapes.inputs[:blend_shape_count], dtype=np.int64
+            ),
+            blend_shape_outputs=np.asarray(
+                blend_shapes.outputs[:blend_shape_count], dtype=np.int64
+            ),
+            animated_maps=self.compile_conditional_table(
+                animated_maps.conditional_table,
+                animated_map_entry_count,
+                self.animated_map_count,
+            ),
+        )
+
+    def get_lod(self, lod: int) -> BehaviorLOD:
+        """
+        Gets a compiled LOD, it is compiled on first use.
+
+        @type lod: int
+        @param lod: The LOD index
+
+        @rtype: BehaviorLOD
+        @returns: The compiled LOD
+        """
+
+        if lod not in self.lods:
+            start = time.perf_counter()
+            self.lods[lod] = self.compile_lod(lod)
+            logging.info(
+                f"compiled behavior of LOD {lod} in {time.perf_counter() - start:.3f}s"
+            )
+        return self.lods[lod]
+
+    @staticmethod
+    def evaluate_conditional_table(
+        table: ConditionalTableArrays,
+        inputs: np.ndarray,
+        outputs: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Evaluates a compiled conditional table, every entry whose input is in its range adds slope * input + cut to
+        its output.
+
+        @type table: ConditionalTableArrays
+        @param table: The compiled conditional table
+
+        @type inputs: np.ndarray
+        @param inputs: The (N, inputs) input values
+
+        @type outputs: Optional[np.ndarray]
+        @param outputs: The indices of the outputs that are evaluated, only the entries writing them are used, all outputs if None
+
+        @rtype: np.ndarray
+        @returns: The (N, outputs) output values
+        """
+
+        output_matrix = table.output_matrix
+        entries = slice(None)
+        if outputs is not None:
+            output_matrix = output_matrix[outputs]
+            entries = np.unique(output_matrix.indices)
+            output_matrix = output_matrix[:, entries]
+
+        values = inputs[:, table.inputs[entries]]
+        from_values = table.from_values[entries]
+        in_range = (values <= table.to_values[entries]) & (
+            (values > from_values)
+            | (table.includes_from[entries] & (values == from_values))
+        )
+        contributions = np.where(
+            in_range,
+            values * table.slope_values[entries] + table.cut_values[entries],
+            0,
+        ).astype(inputs.dtype, copy=False)
+        return np.asarray((output_matrix @ contributions.T).T)
+
+    def map_gui_to_raw(self, gui_values: np.ndarray) -> np.ndarray:
+        """
+        Maps GUI control values to raw control values.
+
+        @type gui_values: np.ndarray
+        @param gui_values: The (N, GUI controls) GUI control values
+
+        @rtype: np.ndarray
+        @returns: The (N, raw controls + PSDs) control values, with the PSD values left at zero
+        """
+
+        return self.evaluate_conditional_table(self.gui_to_raw, gui_values)
+
+    def calculate_psd(
+        self, controls: np.ndarray, psds: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Calculates the PSD values in place from the raw control values.
+
+        @type controls: np.ndarray
+        @param controls: The (N, raw controls + PSDs) control values
+
+        @type psds: Optional[np.ndarray]
+        @param psds: The control indices of the PSDs that are calculated, all PSDs if None
+        """
+
+        rows, columns, values, starts = (
+            self.psd_rows,
+            self.psd_columns,
+            self.psd_values,
+            self.psd_starts,
+        )
+        if psds is not None:
+            # gathers the input segments of the selected PSDs next to each other
+            positions = np.flatnonzero(np.isin(self.psd_rows, psds))
+            ends = np.append(self.psd_starts[1:], len(self.psd_columns))
+            counts = ends[positions] - self.psd_starts[positions]
+            starts = np.cumsum(counts) - counts
+            entries = np.repeat(self.psd_starts[positions] - starts, counts)
+            entries += np.arange(len(entries))
+            rows = self.psd_rows[positions]
+            columns, values = self.psd_columns[entries], self.psd_values[entries]
+        if not len(rows):
+            return
+        weighted = controls[:, columns] * values
+        controls[:, rows] = np.clip(
+            np.multiply.reduceat(weighted, starts, axis=1), 0.0, 1.0
+        )
+
+    def evaluate(
+        self,
+        gui_values: Optional[np.ndarray] = None,
+        raw_values: Optional[np.ndarray] = None,
+        lod: int = 0,
+    ) -> BehaviorOutputs:
+        """
+        Evaluates a single pose or a batch of poses. Either GUI or raw control values are given, as a single pose of
+        shape (controls,) or a batch of shape (N, controls).
+
+        @type gui_values: Optional[np.ndarray]
+        @param gui_values: The GUI control values
+
+        @type raw_values: Optional[np.ndarray]
+        @param raw_values: The raw control values, used when no GUI control values are given
+
+        @type lod: int
+        @param lod: The LOD index
+
+        @rtype: BehaviorOutputs
+        @returns: The outputs, with a leading batch axis only if the inputs had one
+        """
+
+        if (gui_values is None) == (raw_values is None):
+            raise DNAViewerError("Either GUI or raw control values have to be given")
+        values = np.asarray(
+            gui_values if gui_values is not None else raw_values, dtype=self.dtype
+        )
+        single = values.ndim == 1
+        values = np.atleast_2d(values)
+        expected = (
+            self.gui_control_count if gui_values is not None else self.raw_control_count
+        )
+        if values.ndim != 2 or values.shape[1] != expected:
+            raise DNAViewerError(
+                f"Expected {expected} control values per pose, got shape {values.shape}"
+            )
+
+        if gui_values is not None:
+            controls = self.map_gui_to_raw(values)
+        else:
+            controls = np.zeros((len(values), self.control_count), dtype=self.dtype)
+            controls[:, : self.raw_control_count] = values
+        self.calculate_psd(controls)
+
+        compiled = self.get_lod(lod)
+        joints = np.asarray((compiled.joint_matrix @ controls.T).T)
+        blend_shapes = np.zeros(
+            (len(controls), self.blend_shape_channel_count), dtype=self.dtype
+        )
+        blend_shapes[:, compiled.blend_shape_outputs] = controls[
+            :, compiled.blend_shape_inputs
+        ]
+        animated_maps = np.clip(
+            self.evaluate_conditional_table(compiled.animated_maps, controls), 0.0, 1.0
+        )
+
+        batch = 0 if single else slice(None)
+        return BehaviorOutputs(
+            controls=controls[batch],
+            joints=joints[batch],
+            blend_shapes=blend_shapes[batch],
+            animated_maps=animated_maps[batch],
+        )
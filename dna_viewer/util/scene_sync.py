@@ -0,0 +1,541 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import dna
+import dnacalib
+import numpy as np
+from maya.api.OpenMaya import (
+    MDistance,
+    MFnDependencyNode,
+    MFnMesh,
+    MObject,
+    MSelectionList,
+)
+from scipy.spatial.transform import Rotation
+
+from ..const.scene_sync import (
+    DEFAULT_SYNC_TOLERANCE,
+    JOINT_ORIENT_ATTRIBUTE,
+    TRANSLATE_ATTRIBUTE,
+)
+from ..config.character import Character as CharacterConfig
+from ..config.character import SpaceModifiers
+from ..const.space import (
+    DEFAULT_MESH_ROTATION,
+    FIXED_JOINT_NAME,
+    FIXED_JOINT_ORIENT_ROTATION,
+    FIXED_JOINT_TRANSLATION_ROTATION,
+    OBJECT,
+)
+from ..model.dna import DNA
+
+
+@dataclass
+class SceneSnapshot:
+    """
+    A class used to represent the state of the meshes and joints in the scene
+
+    Attributes
+    ----------
+    @type mesh_positions: Dict[int, np.ndarray]
+    @param mesh_positions: Mapping of mesh indices to (N, 3) vertex positions in object space, meshes missing from the scene are left out
+
+    @type joint_translations: np.ndarray
+    @param joint_translations: (J, 3) joint translations in parent space, NaN for joints missing from the scene
+
+    @type joint_rotations: np.ndarray
+    @param joint_rotations: (J, 3) joint orientations in degrees, NaN for joints missing from the scene
+    """
+
+    mesh_positions: Dict[int, np.ndarray] = field(default_factory=dict)
+    joint_translations: np.ndarray = field(
+        default_factory=lambda: np.zeros((0, 3), dtype=np.float64)
+    )
+    joint_rotations: np.ndarray = field(
+        default_factory=lambda: np.zeros((0, 3), dtype=np.float64)
+    )
+
+
+@dataclass
+class VertexChanges:
+    """
+    A class used to represent the changed vertices of a single mesh
+
+    Attributes
+    ----------
+    @type vertex_count: int
+    @param vertex_count: The number of vertices of the mesh
+
+    @type vertex_indices: np.ndarray
+    @param vertex_indices: The indices of the changed vertices
+
+    @type deltas: np.ndarray
+    @param deltas: (K, 3) position deltas of the changed vertices in DNA units
+    """
+
+    vertex_count: int = field(default=0)
+    vertex_indices: np.ndarray = field(
+        default_factory=lambda: np.zeros(0, dtype=np.int64)
+    )
+    deltas: np.ndarray = field(
+        default_factory=lambda: np.zeros((0, 3), dtype=np.float64)
+    )
+
+
+@dataclass
+class SceneChanges:
+    """
+    A class used to represent the differences between the scene and the DNA
+
+    Attributes
+    ----------
+    @type meshes: Dict[int, VertexChanges]
+    @param meshes: Mapping of mesh indices to their changed vertices, unchanged meshes are left out
+
+    @type joint_indices: np.ndarray
+    @param joint_indices: The indices of the changed joints
+
+    @type joint_translations: Optional[np.ndarray]
+    @param joint_translations: (J, 3) neutral joint translations in DNA units with the changed joints applied, None if no joint changed
+
+    @type joint_rotations: Optional[np.ndarray]
+    @param joint_rotations: (J, 3) neutral joint rotations in DNA units with the changed joints applied, None if no joint changed
+    """
+
+    meshes: Dict[int, VertexChanges] = field(default_factory=dict)
+    joint_indices: np.ndarray = field(
+        default_factory=lambda: np.zeros(0, dtype=np.int64)
+    )
+    joint_translations: Optional[np.ndarray] = field(default=None)
+    joint_rotations: Optional[np.ndarray] = field(default=None)
+
+    def is_empty(self) -> bool:
+        return not self.meshes and self.joint_translations is None
+
+
+class SceneSync:
+    """
+    A class used for propagating changes made to the meshes and joints in the scene back to the DNA.
+    The scene is snapshotted into arrays and compared against a baseline, only meshes and joints that moved by more than
+    the tolerance produce DNACalib commands.
+
+    Attributes
+    ----------
+    @type dna: DNA
+    @param dna: The DNA the scene was built from
+
+    @type tolerance: float
+    @param tolerance: The largest per component difference, in scene units, that is not considered a change
+
+    @type linear_modifier: float
+    @param linear_modifier: The linear modifier the scene was built with, taken from the character config when not given
+
+    @type angle_modifier: float
+    @param angle_modifier: The angle modifier the scene was built with, taken from the character config when not given
+
+    @type mesh_rotation: Optional[Rotation]
+    @param mesh_rotation: The rotation applied to the vertex positions when the meshes were built, DEFAULT_MESH_ROTATION like the builder unless given, None if they were not rotated
+
+    @type fixed_joint: Optional[str]
+    @param fixed_joint: The joint turned by the builder after the joints were built, FIXED_JOINT_NAME unless given, None if no joint was turned
+    """
+
+    def __init__(
+        self,
+        dna: DNA,
+        tolerance: float = DEFAULT_SYNC_TOLERANCE,
+        linear_modifier: Optional[float] = None,
+        angle_modifier: Optional[float] = None,
+        mesh_rotation: Sequence[float] = DEFAULT_MESH_ROTATION,
+        character_config: Optional[CharacterConfig] = None,
+        fixed_joint: Optional[str] = FIXED_JOINT_NAME,
+    ) -> None:
+        modifiers = (
+            character_config.modifiers
+            if character_config is not None
+            else SpaceModifiers()
+        )
+        if linear_modifier is None:
+            linear_modifier = modifiers.linear_modifier or 1.0
+        if angle_modifier is None:
+            angle_modifier = modifiers.angle_modifier or 1.0
+        self.dna = dna
+        self.tolerance = tolerance
+        self.linear_modifier = linear_modifier
+        self.angle_modifier = angle_modifier
+        self.mesh_rotation = (
+            Rotation.from_euler("xyz", mesh_rotation, degrees=True)
+            if mesh_rotation
+            else None
+        )
+        self.fixed_joint = fixed_joint
+
+    @staticmethod
+    def get_node(name: str) -> Optional[MObject]:
+        selection = MSelectionList()
+        try:
+            selection.add(name)
+        except RuntimeError:
+            return None
+        return selection.getDependNode(0)
+
+    @staticmethod
+    def get_mesh_positions(mesh_name: str) -> Optional[np.ndarray]:
+        """
+        Gets the vertex positions of a mesh in the scene.
+
+        @type mesh_name: str
+        @param mesh_name: The name of the mesh
+
+        @rtype: Optional[np.ndarray]
+        @returns: (N, 3) vertex positions in object space, None if the mesh is not in the scene
+        """
+
+        selection = MSelectionList()
+        try:
+            selection.add(mesh_name)
+        except RuntimeError:
+            return None
+        points = MFnMesh(selection.getDagPath(0)).getPoints(OBJECT)
+        return np.array(points, dtype=np.float64).reshape(-1, 4)[:, :3]
+
+    def get_mesh_indices(self, mesh_indices: Sequence[int] = None) -> List[int]:
+        if mesh_indices is None:
+            return list(range(self.dna.get_mesh_count()))
+        return list(mesh_indices)
+
+    def snapshot(self, mesh_indices: Sequence[int] = None) -> SceneSnapshot:
+        """
+        Snapshots the vertex positions of the meshes and the transformations of the joints in the scene.
+
+        @type mesh_indices: Sequence[int]
+        @param mesh_indices: The indices of the meshes that should be snapshotted, all meshes if None
+
+        @rtype: SceneSnapshot
+        @returns: The state of the scene
+        """
+
+        snapshot = SceneSnapshot()
+        for mesh_index in self.get_mesh_indices(mesh_indices):
+            mesh_name = self.dna.get_mesh_name(mesh_index)
+            positions = SceneSync.get_mesh_positions(mesh_name)
+            if positions is None:
+                logging.info(f"{mesh_name} is missing, skipping it")
+                continue
+            snapshot.mesh_positions[mesh_index] = positions
+
+        joint_names = self.dna.definition.joints.names
+        snapshot.joint_translations = np.full((len(joint_names), 3), np.nan)
+        snapshot.joint_rotations = np.full((len(joint_names), 3), np.nan)
+        ui_unit = MDistance.uiUnit()
+        for joint_index, joint_name in enumerate(joint_names):
+            node = SceneSync.get_node(joint_name)
+            if node is None:
+                continue
+            fn_node = MFnDependencyNode(node)
+            translate = fn_node.findPlug(TRANSLATE_ATTRIBUTE, False)
+            orient = fn_node.findPlug(JOINT_ORIENT_ATTRIBUTE, False)
+            for axis in range(3):
+                snapshot.joint_translations[joint_index, axis] = (
+                    translate.child(axis).asMDistance().asUnits(ui_unit)
+                )
+                snapshot.joint_rotations[joint_index, axis] = (
+                    orient.child(axis).asMAngle().asDegrees()
+                )
+        return snapshot
+
+    def get_dna_joint_arrays(self) -> Sequence[np.ndarray]:
+        definition = self.dna.definition
+        translations = np.array(
+            [
+                [point.x, point.y, point.z]
+                for point in definition.neutral_joint_translations
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        rotations = np.array(
+            [
+                [point.x, point.y, point.z]
+                for point in definition.neutral_joint_rotations
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        return translations, rotations
+
+    def get_fixed_joint_index(self) -> Optional[int]:
+        joint_names = self.dna.definition.joints.names
+        if self.fixed_joint is None or self.fixed_joint not in joint_names:
+            return None
+        return joint_names.index(self.fixed_joint)
+
+    def get_scene_joint_arrays(
+        self, translations: np.ndarray, rotations: np.ndarray
+    ) -> Sequence[np.ndarray]:
+        """
+        Places the joint translations and rotations of the DNA like the builder does, scaled by the modifiers and with
+        the fixed joint turned.
+
+        @type translations: np.ndarray
+        @param translations: (J, 3) joint translations in DNA units
+
+        @type rotations: np.ndarray
+        @param rotations: (J, 3) joint rotations in DNA units
+
+        @rtype: Sequence[np.ndarray]
+        @returns: (J, 3) joint translations in scene units and (J, 3) joint orientations in degrees
+        """
+
+        translations = translations * self.linear_modifier
+        rotations = rotations * self.angle_modifier
+        joint_index = self.get_fixed_joint_index()
+        if joint_index is not None:
+            translations[joint_index] = Rotation.from_euler(
+                "xyz", FIXED_JOINT_TRANSLATION_ROTATION, degrees=True
+            ).apply(translations[joint_index])
+            rotations[joint_index] = (
+                Rotation.from_euler("xyz", rotations[joint_index], degrees=True)
+                * Rotation.from_euler("xyz", FIXED_JOINT_ORIENT_ROTATION, degrees=True)
+            ).as_euler("xyz", degrees=True)
+        return translations, rotations
+
+    def get_dna_joint_arrays_from_scene(
+        self, translations: np.ndarray, rotations: np.ndarray
+    ) -> Sequence[np.ndarray]:
+        """
+        Takes the joint translations and orientations of the scene back to the DNA, the inverse of get_scene_joint_arrays.
+
+        @type translations: np.ndarray
+        @param translations: (J, 3) joint translations in scene units
+
+        @type rotations: np.ndarray
+        @param rotations: (J, 3) joint orientations in degrees
+
+        @rtype: Sequence[np.ndarray]
+        @returns: (J, 3) joint translations and (J, 3) joint rotations in DNA units
+        """
+
+        translations = translations.copy()
+        rotations = rotations.copy()
+        joint_index = self.get_fixed_joint_index()
+        if joint_index is not None and np.isfinite(rotations[joint_index]).all():
+            translations[joint_index] = (
+                Rotation.from_euler(
+                    "xyz", FIXED_JOINT_TRANSLATION_ROTATION, degrees=True
+                )
+                .inv()
+                .apply(translations[joint_index])
+            )
+            rotations[joint_index] = (
+                Rotation.from_euler("xyz", rotations[joint_index], degrees=True)
+                * Rotation.from_euler(
+                    "xyz", FIXED_JOINT_ORIENT_ROTATION, degrees=True
+                ).inv()
+            ).as_euler("xyz", degrees=True)
+        return (
+            translations / self.linear_modifier,
+            rotations / self.angle_modifier,
+        )
+
+    @staticmethod
+    def get_angle_differences(
+        rotations: np.ndarray, other_rotations: np.ndarray
+    ) -> np.ndarray:
+        """
+        Gets the angles between pairs of orientations, so equal orientations written with other euler angles match.
+
+        @type rotations: np.ndarray
+        @param rotations: (J, 3) euler xyz orientations in degrees
+
+        @type other_rotations: np.ndarray
+        @param other_rotations: (J, 3) euler xyz orientations in degrees
+
+        @rtype: np.ndarray
+        @returns: (J,) angles in degrees
+        """
+
+        if not len(rotations):
+            return np.zeros(0, dtype=np.float64)
+        return np.degrees(
+            (
+                Rotation.from_euler("xyz", rotations, degrees=True).inv()
+                * Rotation.from_euler("xyz", other_rotations, degrees=True)
+            ).magnitude()
+        )
+
+    def get_dna_mesh_positions(self, mesh_index: int) -> np.ndarray:
+        """
+        Gets the vertex positions of a mesh in the DNA as they are placed in the scene.
+
+        @type mesh_index: int
+        @param mesh_index: The mesh index
+
+        @rtype: np.ndarray
+        @returns: (N, 3) vertex positions in scene units
+        """
+
+        positions = self.linear_modifier * np.asarray(
+            self.dna.get_vertex_position_array_for_mesh_index(mesh_index),
+            dtype=np.float64,
+        )
+        if self.mesh_rotation is not None:
+            positions = self.mesh_rotation.apply(positions)
+        return positions
+
+    def diff(
+        self, snapshot: SceneSnapshot, baseline: SceneSnapshot = None
+    ) -> SceneChanges:
+        """
+        Compares the snapshot against the baseline and collects the changed vertices and joints.
+
+        @type snapshot: SceneSnapshot
+        @param snapshot: The current state of the scene
+
+        @type baseline: SceneSnapshot
+        @param baseline: The state of the scene before the changes, vertex positions and joints are compared against the DNA placed like the builder does if None
+
+        @rtype: SceneChanges
+        @returns: The changes that should be applied to the DNA
+        """
+
+        changes = SceneChanges()
+        for mesh_index, positions in snapshot.mesh_positions.items():
+            if baseline is None:
+                base_positions = self.get_dna_mesh_positions(mesh_index)
+            else:
+                base_positions = baseline.mesh_positions.get(mesh_index)
+                if base_positions is None:
+                    continue
+            if base_positions.shape != positions.shape:
+                logging.warning(
+                    f"{self.dna.get_mesh_name(mesh_index)} has {len(positions)} vertices instead of {len(base_positions)}, skipping it"
+                )
+                continue
+
+            scene_deltas = positions - base_positions
+            vertex_indices = np.flatnonzero(
+                np.abs(scene_deltas).max(axis=1, initial=0.0) > self.tolerance
+            )
+            if not vertex_indices.size:
+                continue
+            deltas = scene_deltas[vertex_indices]
+            if self.mesh_rotation is not None:
+                deltas = self.mesh_rotation.inv().apply(deltas)
+            changes.meshes[mesh_index] = VertexChanges(
+                vertex_count=len(positions),
+                vertex_indices=vertex_indices,
+                deltas=deltas / self.linear_modifier,
+            )
+
+        translations, rotations = self.get_dna_joint_arrays()
+        if baseline is None:
+            base_translations, base_rotations = self.get_scene_joint_arrays(
+                translations, rotations
+            )
+        else:
+            base_translations = baseline.joint_translations
+            base_rotations = baseline.joint_rotations
+        if (
+            snapshot.joint_translations.shape
+            == base_translations.shape
+            == translations.shape
+        ):
+            # joints missing from the scene keep their DNA values
+            found = (
+                np.isfinite(snapshot.joint_translations).all(axis=1)
+                & np.isfinite(snapshot.joint_rotations).all(axis=1)
+                & np.isfinite(base_translations).all(axis=1)
+                & np.isfinite(base_rotations).all(axis=1)
+            )
+            changed = np.zeros(len(translations), dtype=bool)
+            changed[found] = (
+                np.abs(
+                    snapshot.joint_translations[found] - base_translations[found]
+                ).max(axis=1, initial=0.0)
+                > self.tolerance
+            ) | (
+                SceneSync.get_angle_differences(
+                    snapshot.joint_rotations[found], base_rotations[found]
+                )
+                > self.tolerance
+            )
+            changes.joint_indices = np.flatnonzero(changed)
+            if changes.joint_indices.size:
+                (
+                    scene_translations,
+                    scene_rotations,
+                ) = self.get_dna_joint_arrays_from_scene(
+                    snapshot.joint_translations, snapshot.joint_rotations
+                )
+                translations[changed] = scene_translations[changed]
+                rotations[changed] = scene_rotations[changed]
+                changes.joint_translations = translations
+                changes.joint_rotations = rotations
+        return changes
+
+    @staticmethod
+    def create_command_sequence(changes: SceneChanges) -> dnacalib.CommandSequence:
+        """
+        Creates the DNACalib commands for the changes. Vertex deltas are masked, so only the changed vertices of a mesh
+        are touched, and joints are only set if at least one of them changed.
+
+        @type changes: SceneChanges
+        @param changes: The changes that should be applied to the DNA
+
+        @rtype: dnacalib.CommandSequence
+        @returns: The sequence of commands
+        """
+
+        commands = dnacalib.CommandSequence()
+        if changes.joint_translations is not None:
+            commands.add(
+                dnacalib.SetNeutralJointTranslationsCommand(
+                    changes.joint_translations.tolist()
+                )
+            )
+            commands.add(
+                dnacalib.SetNeutralJointRotationsCommand(
+                    changes.joint_rotations.tolist()
+                )
+            )
+
+        for mesh_index, vertex_changes in changes.meshes.items():
+            deltas = np.zeros((vertex_changes.vertex_count, 3), dtype=np.float64)
+            deltas[vertex_changes.vertex_indices] = vertex_changes.deltas
+            masks = np.zeros(vertex_changes.vertex_count, dtype=np.float64)
+            masks[vertex_changes.vertex_indices] = 1.0
+            commands.add(
+                dnacalib.SetVertexPositionsCommand(
+                    mesh_index,
+                    deltas[:, 0].tolist(),
+                    deltas[:, 1].tolist(),
+                    deltas[:, 2].tolist(),
+                    masks.tolist(),
+                    dnacalib.VectorOperation_Add,
+                )
+            )
+        return commands
+
+    def apply(
+        self, calibrated: dnacalib.DNACalibDNAReader, changes: SceneChanges
+    ) -> None:
+        """
+        Runs the commands for the changes on the DNACalib reader.
+
+        @type calibrated: dnacalib.DNACalibDNAReader
+        @param calibrated: The reader the changes are applied to in place
+
+        @type changes: SceneChanges
+        @param changes: The changes that should be applied to the DNA
+        """
+
+        if changes.is_empty():
+            logging.info("No changes found in the scene")
+            return
+        logging.info(
+            f"Propagating {len(changes.meshes)} changed meshes and {changes.joint_indices.size} changed joints"
+        )
+        SceneSync.create_command_sequence(changes).run(calibrated)
+        if not dna.Status.isOk():
+            status = dna.Status.get()
+            raise RuntimeError(f"Error propagating scene changes: {status.message}")
@@ -0,0 +1,73 @@
+"""
+This example bakes control animation into per frame joint deltas, blend shape weights and animated map values without
+Maya. The animation is a .csv file with one frame per row (an optional header names the controls), a .npy file with a
+(frames, controls) array or a .npz file with "values" and optional "names".
+- usage in command line:
+    python dna_bake_animation.py <PATH TO DNA FILE> <PATH TO ANIMATION> <OUTPUT DIR> [--lod=<LOD>] [--raw] [--workers=<N>]
+
+    Expected: joints.npy, blend_shapes.npy, animated_maps.npy and bake.json in the output directory.
+
+NOTE: If running on Linux, please make sure to append the LD_LIBRARY_PATH with absolute path to the lib/linux directory before running the example:
+    export LD_LIBRARY_PATH=$LD_LIBRARY_PATH:<path-to-lib-linux-dir>
+"""
+
+import argparse
+from os import path as ospath
+from sys import path as syspath
+from sys import platform
+
+# if you use Maya, use absolute path
+ROOT_DIR = f"{ospath.dirname(ospath.abspath(__file__))}/..".replace("\\", "/")
+ROOT_LIB_DIR = f"{ROOT_DIR}/lib"
+if platform == "win32":
+    LIB_DIR = f"{ROOT_LIB_DIR}/windows"
+elif platform == "linux":
+    LIB_DIR = f"{ROOT_LIB_DIR}/linux"
+else:
+    raise OSError(
+        "OS not supported, please compile dependencies and add value to LIB_DIR"
+    )
+
+# Adds directories to path
+syspath.insert(0, ROOT_DIR)
+syspath.insert(0, LIB_DIR)
+
+from dna_viewer import AnimationBaker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bake control animation")
+    parser.add_argument("dna_path", help="Path of the DNA file")
+    parser.add_argument("animation_path", help="Path of the .csv, .npy or .npz file")
+    parser.add_argument("output_dir", help="Directory the outputs are saved to")
+    parser.add_argument("--lod", type=int, default=0, help="The baked LOD")
+    parser.add_argument(
+        "--raw", action="store_true", help="The animation holds raw controls"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0, help="Number of workers, all cores if 0"
+    )
+    parser.add_argument(
+        "--chunk_size", type=int, default=4096, help="Frames baked at once by a worker"
+    )
+    args = parser.parse_args()
+
+    baker = AnimationBaker(
+        args.dna_path,
+        args.output_dir,
+        lod=args.lod,
+        use_gui_controls=not args.raw,
+        chunk_size=args.chunk_size,
+    )
+    result = baker.run(
+        args.animation_path,
+        workers=args.workers,
+        progress=lambda baked, total: print(f"{baked} / {total}"),
+    )
+    print(
+        f"baked {result.frame_count} frames in {result.elapsed:.3f}s to {result.manifest_path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
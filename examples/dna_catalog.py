@@ -0,0 +1,170 @@
+"""
+This example demonstrates the DNA catalog, a local SQLite index of the descriptor and definition data of many DNA files.
+- usage in command line:
+    - scan directories, repeated scans only read new and changed files:
+        python dna_catalog.py scan <DNA DIRECTORY> [<DNA DIRECTORY> ...] [--workers=<N>] [--threads]
+    - find DNA files matching all given criteria, name criteria are glob patterns:
+        python dna_catalog.py find --mesh_name=head_lod0_mesh --min_joint_count=500
+        python dna_catalog.py find --db_name=MH.4 --name="A*"
+    - show everything catalogued for a single DNA file:
+        python dna_catalog.py show <PATH TO DNA FILE>
+
+        Expected: the catalog is stored in OUTPUT_DIR/dna_catalog.sqlite unless --catalog=<PATH TO CATALOG> is given.
+- usage in Maya:
+    1. copy whole content of this file to Maya Script Editor
+    2. delete "if __name__ == "__main__":
+            main()"
+    3. delete whole "def main" method
+    4. change value of ROOT_DIR to absolute path of dna_calibration, e.g. `c:/dna_calibration` in Windows or `/home/user/dna_calibration`. Important:
+    Use `/` (forward slash), because Maya uses forward slashes in path.
+    5. call method scan([<DNA DIRECTORY>], <PATH TO CATALOG>, use_processes=False) and use Catalog(<PATH TO CATALOG>).find(...)
+
+NOTE: If running on Linux, please make sure to append the LD_LIBRARY_PATH with absolute path to the lib/linux directory before running the example:
+    export LD_LIBRARY_PATH=$LD_LIBRARY_PATH:<path-to-lib-linux-dir>
+"""
+
+import argparse
+import logging
+from os import environ, makedirs
+from os import path as ospath
+from sys import path as syspath
+from sys import platform
+
+# if you use Maya, use absolute path
+ROOT_DIR = f"{ospath.dirname(ospath.abspath(__file__))}/..".replace("\\", "/")
+OUTPUT_DIR = f"{ROOT_DIR}/output"
+ROOT_LIB_DIR = f"{ROOT_DIR}/lib"
+if platform == "win32":
+    LIB_DIR = f"{ROOT_LIB_DIR}/windows"
+elif platform == "linux":
+    LIB_DIR = f"{ROOT_LIB_DIR}/linux"
+else:
+    raise OSError(
+        "OS not supported, please compile dependencies and add value to LIB_DIR"
+    )
+
+# Add bin directory to maya plugin path
+if "MAYA_PLUG_IN_PATH" in environ:
+    separator = ":" if platform == "linux" else ";"
+    environ["MAYA_PLUG_IN_PATH"] = separator.join(
+        [environ["MAYA_PLUG_IN_PATH"], LIB_DIR]
+    )
+else:
+    environ["MAYA_PLUG_IN_PATH"] = LIB_DIR
+
+# Adds directories to path
+syspath.insert(0, ROOT_DIR)
+syspath.insert(0, LIB_DIR)
+
+from dna_viewer import Catalog
+
+
+def scan(directories, catalog_path, workers=0, use_processes=True):
+    with Catalog(catalog_path) as catalog:
+        result = catalog.scan(directories, workers=workers, use_processes=use_processes)
+
+    print(f"Added: {len(result.added)}")
+    print(f"Updated: {len(result.updated)}")
+    print(f"Unchanged: {result.unchanged}")
+    print(f"Removed: {len(result.removed)}")
+    for path, error in result.failed.items():
+        print(f"Failed: {path}: {error}")
+
+
+def find(catalog_path, **criteria):
+    with Catalog(catalog_path) as catalog:
+        records = catalog.find(**criteria)
+
+    for record in records:
+        print(
+            f"{record.path}\tname={record.name}\tdb_name={record.db_name}\tlods={record.lod_count}"
+            f"\tmeshes={record.mesh_count}\tjoints={record.joint_count}"
+            f"\tblend_shape_channels={record.blend_shape_channel_count}"
+        )
+    print(f"{len(records)} DNA file(s) found")
+
+
+def show(catalog_path, dna_path):
+    with Catalog(catalog_path) as catalog:
+        record = catalog.get(dna_path)
+
+    if record is None:
+        raise RuntimeError(f"{dna_path} is not catalogued")
+    for key, value in vars(record).items():
+        if isinstance(value, list):
+            print(f"{key} ({len(value)}):")
+            for name in value:
+                print(f"\t{name}")
+        else:
+            print(f"{key}: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DNA catalog example")
+    parser.add_argument(
+        "--catalog",
+        metavar="catalog",
+        help="Path of the SQLite catalog",
+        default=f"{OUTPUT_DIR}/dna_catalog.sqlite",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scan_parser = subparsers.add_parser(
+        "scan", help="Catalog new and changed DNA files"
+    )
+    scan_parser.add_argument(
+        "directories", nargs="+", help="Directories containing DNA files"
+    )
+    scan_parser.add_argument(
+        "--workers", type=int, default=0, help="Number of workers, all CPU cores if 0"
+    )
+    scan_parser.add_argument(
+        "--threads", action="store_true", help="Use threads instead of processes"
+    )
+
+    find_parser = subparsers.add_parser(
+        "find", help="Find DNA files matching all given criteria"
+    )
+    for name in (
+        "name",
+        "db_name",
+        "mesh_name",
+        "joint_name",
+        "blend_shape_channel_name",
+    ):
+        find_parser.add_argument(f"--{name}", help="Glob pattern")
+    for name in (
+        "archetype",
+        "gender",
+        "min_joint_count",
+        "max_joint_count",
+        "min_mesh_count",
+        "max_mesh_count",
+        "min_lod_count",
+    ):
+        find_parser.add_argument(f"--{name}", type=int)
+
+    show_parser = subparsers.add_parser(
+        "show", help="Show the catalogued data of a DNA file"
+    )
+    show_parser.add_argument("dna_path", help="Path of the DNA file")
+
+    logging.basicConfig(level=logging.INFO)
+    makedirs(OUTPUT_DIR, exist_ok=True)
+    args = parser.parse_args()
+
+    if args.command == "scan":
+        scan(args.directories, args.catalog, args.workers, not args.threads)
+    elif args.command == "find":
+        criteria = {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("catalog", "command") and value is not None
+        }
+        find(args.catalog, **criteria)
+    else:
+        show(args.catalog, args.dna_path)
+
+
+if __name__ == "__main__":
+    main()
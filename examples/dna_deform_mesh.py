@@ -0,0 +1,86 @@
+"""
+This example evaluates a random pose of the rig and saves the deformed mesh as an OBJ file without Maya, which is
+useful for checking a DNA in any 3D viewer.
+- usage in command line:
+    python dna_deform_mesh.py <PATH TO DNA FILE> <OUTPUT OBJ> [--mesh=<MESH INDEX>] [--seed=<N>]
+
+    Expected: the OBJ file with the posed mesh, positions are in DNA space and units.
+
+NOTE: If running on Linux, please make sure to append the LD_LIBRARY_PATH with absolute path to the lib/linux directory before running the example:
+    export LD_LIBRARY_PATH=$LD_LIBRARY_PATH:<path-to-lib-linux-dir>
+"""
+
+import argparse
+from os import path as ospath
+from sys import path as syspath
+from sys import platform
+
+import numpy as np
+
+# if you use Maya, use absolute path
+ROOT_DIR = f"{ospath.dirname(ospath.abspath(__file__))}/..".replace("\\", "/")
+ROOT_LIB_DIR = f"{ROOT_DIR}/lib"
+if platform == "win32":
+    LIB_DIR = f"{ROOT_LIB_DIR}/windows"
+elif platform == "linux":
+    LIB_DIR = f"{ROOT_LIB_DIR}/linux"
+else:
+    raise OSError(
+        "OS not supported, please compile dependencies and add value to LIB_DIR"
+    )
+
+# Adds directories to path
+syspath.insert(0, ROOT_DIR)
+syspath.insert(0, LIB_DIR)
+
+from dna_viewer import DeformationEngine, RigLogicEvaluator, load_dna
+
+
+def save_obj(path, positions, polygon_faces, polygon_connects):
+    with open(path, "w", encoding="utf-8") as file:
+        for x, y, z in positions.tolist():
+            file.write(f"v {x} {y} {z}\n")
+        offsets = np.concatenate([[0], np.cumsum(polygon_faces)])
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            file.write(
+                "f "
+                + " ".join(str(index + 1) for index in polygon_connects[start:end])
+                + "\n"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a posed mesh")
+    parser.add_argument("dna_path", help="Path of the DNA file")
+    parser.add_argument("output_path", help="Path of the OBJ file")
+    parser.add_argument("--mesh", type=int, default=0, help="The mesh index")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random pose")
+    args = parser.parse_args()
+
+    dna = load_dna(args.dna_path)
+    lod = next(
+        lod
+        for lod in range(dna.get_lod_count())
+        if args.mesh in dna.get_mesh_indices_for_lod(lod)
+    )
+    evaluator = RigLogicEvaluator(dna)
+    gui_values = np.random.default_rng(args.seed).uniform(
+        0.0, 1.0, evaluator.gui_control_count
+    )
+    outputs = evaluator.evaluate(gui_values=gui_values, lod=lod)
+
+    positions = DeformationEngine(dna).deform(
+        args.mesh, outputs.blend_shapes, joint_deltas=outputs.joints
+    )
+    face_vertex_arrays = dna.get_face_vertex_arrays(args.mesh)
+    save_obj(
+        args.output_path,
+        positions,
+        face_vertex_arrays.polygon_faces,
+        face_vertex_arrays.polygon_connects,
+    )
+    print(f"saved {dna.get_mesh_name(args.mesh)} at LOD {lod} to {args.output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -62,7 +62,7 @@ else:
 syspath.insert(0, ROOT_DIR)
 syspath.insert(0, LIB_DIR)
 
-from dna import DataLayer_All, FileStream, Status, BinaryStreamReader, BinaryStreamWriter
+from dna import DataLayer_All, FileStream, MemoryMappedFileStream, Status, BinaryStreamReader, BinaryStreamWriter
 
 
 def create_dna(path):
@@ -86,8 +86,11 @@ def create_dna(path):
         raise RuntimeError(f"Error saving DNA: {status.message}")
 
 
-def load_dna(path):
-    stream = FileStream(path, FileStream.AccessMode_Read, FileStream.OpenMode_Binary)
+def load_dna(path, memory_mapped=False):
+    if memory_mapped:
+        stream = MemoryMappedFileStream(path, MemoryMappedFileStream.AccessMode_Read)
+    else:
+        stream = FileStream(path, FileStream.AccessMode_Read, FileStream.OpenMode_Binary)
     reader = BinaryStreamReader(stream, DataLayer_All)
     reader.read()
     if not Status.isOk():
@@ -119,9 +122,9 @@ def print_dna_summary(dna_reader):
             print(f"Mesh {mesh_idx} - Texture coordinate {tc_idx} : {tex_coord}")
 
 
-def create_new_dna(dna_path):
+def create_new_dna(dna_path, memory_mapped=False):
     create_dna(dna_path)
-    dna_reader = load_dna(dna_path)
+    dna_reader = load_dna(dna_path, memory_mapped)
     print_dna_summary(dna_reader)
 
 
@@ -130,10 +133,15 @@ def main():
     parser.add_argument(
         "--dna_path", metavar="--dna_path", help="Path where to save the DNA file", default=f"{OUTPUT_DIR}/CustomDNA.dna"
     )
+    parser.add_argument(
+        "--memory_mapped",
+        action="store_true",
+        help="Memory map the created DNA file instead of reading it through a file stream",
+    )
     makedirs(OUTPUT_DIR, exist_ok=True)
     args = parser.parse_args()
 
-    create_new_dna(args.dna_path)
+    create_new_dna(args.dna_path, args.memory_mapped)
 
 
 if __name__ == "__main__":
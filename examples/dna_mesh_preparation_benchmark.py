@@ -0,0 +1,154 @@
+"""
+This example measures the time spent preparing the face vertex data of each mesh (polygon faces and connects, texture
+coordinates, normals with their face and vertex ids) before it is handed to MFnMesh. It compares the previous per face
+vertex Python loops against the single NumPy pass of DNA.get_face_vertex_arrays. Maya is not needed.
+The "before" number only times the loops. They walk plain lists of faces, layouts, texture coordinates and normals,
+the layout the model used before it stored them in arrays, and these lists are built once, outside the timed region.
+- usage in command line:
+    python dna_mesh_preparation_benchmark.py <PATH TO DNA FILE> [--meshes 0 1 2] [--repeat=<N>]
+
+    Expected: a table with the time per mesh before and after, and the speedup.
+
+NOTE: If running on Linux, please make sure to append the LD_LIBRARY_PATH with absolute path to the lib/linux directory before running the example:
+    export LD_LIBRARY_PATH=$LD_LIBRARY_PATH:<path-to-lib-linux-dir>
+"""
+
+import argparse
+from os import path as ospath
+from sys import path as syspath
+from sys import platform
+from time import perf_counter
+
+# if you use Maya, use absolute path
+ROOT_DIR = f"{ospath.dirname(ospath.abspath(__file__))}/..".replace("\\", "/")
+ROOT_LIB_DIR = f"{ROOT_DIR}/lib"
+if platform == "win32":
+    LIB_DIR = f"{ROOT_LIB_DIR}/windows"
+elif platform == "linux":
+    LIB_DIR = f"{ROOT_LIB_DIR}/linux"
+else:
+    raise OSError(
+        "OS not supported, please compile dependencies and add value to LIB_DIR"
+    )
+
+# Adds directories to path
+syspath.insert(0, ROOT_DIR)
+syspath.insert(0, LIB_DIR)
+
+from dna_viewer import load_dna
+from dna_viewer.model.geometry import UV, Layout, Point3
+
+
+def get_list_topology(dna, mesh_index):
+    """The topology of a mesh as the plain lists the model held before"""
+
+    topology = dna.geometry.meshes[mesh_index].topology
+    faces = topology.face_vertex_layouts
+    layouts = [
+        Layout(
+            position_index=position, texture_coordinate_index=uv, normal_index=normal
+        )
+        for position, uv, normal in topology.layout_array.tolist()
+    ]
+    texture_coordinates = [
+        UV(u=u, v=v) for u, v in topology.texture_coordinate_array.tolist()
+    ]
+    normals = [Point3(x=x, y=y, z=z) for x, y, z in topology.normal_array.tolist()]
+    return faces, layouts, texture_coordinates, normals
+
+
+def prepare_mesh_with_loops(list_topology):
+    """The face vertex walk the mesh builder did before, without the maya types"""
+
+    dna_faces, layouts, texture_coordinates, vertex_normals = list_topology
+    layout_positions = [layout.position_index for layout in layouts]
+
+    polygon_faces = []
+    polygon_connects = []
+    for face in dna_faces:
+        polygon_faces.append(len(face))
+        for layout_index in face:
+            polygon_connects.append(layout_positions[layout_index])
+
+    coordinate_indices = []
+    for layout in layouts:
+        coordinate_indices.append(layout.texture_coordinate_index)
+    us, vs, uv_ids = [], [], []
+    for face in dna_faces:
+        for layout_index in face:
+            texture_coordinate = texture_coordinates[coordinate_indices[layout_index]]
+            us.append(texture_coordinate.u)
+            vs.append(texture_coordinate.v)
+            uv_ids.append(len(uv_ids))
+
+    layout_normals = [vertex_normals[layout.normal_index] for layout in layouts]
+    normals, face_ids, vertex_ids = [], [], []
+    for face_id, face in enumerate(dna_faces):
+        for layout_index in face:
+            normal = layout_normals[layout_index]
+            normals.append((normal.x, normal.y, normal.z))
+            face_ids.append(face_id)
+            vertex_ids.append(layout_positions[layout_index])
+
+
+def prepare_mesh_with_arrays(dna, mesh_index):
+    """The single NumPy pass used by the mesh builder now"""
+
+    face_vertex_arrays = dna.get_face_vertex_arrays(mesh_index)
+    face_vertex_arrays.polygon_faces.tolist()
+    face_vertex_arrays.polygon_connects.tolist()
+    dna.get_vertex_texture_coordinate_array_for_mesh(mesh_index)[
+        face_vertex_arrays.texture_coordinate_indices
+    ].tolist()
+    face_vertex_arrays.normals.tolist()
+    face_vertex_arrays.face_ids.tolist()
+
+
+def measure(function, repeat, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        function(*args)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesh preparation benchmark")
+    parser.add_argument("dna_path", help="Path of the DNA file")
+    parser.add_argument(
+        "--meshes", type=int, nargs="*", help="Mesh indices, all meshes if omitted"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="The best of this many runs is reported"
+    )
+    args = parser.parse_args()
+
+    dna = load_dna(args.dna_path)
+    mesh_indices = args.meshes
+    if not mesh_indices:
+        mesh_indices = list(range(dna.get_mesh_count()))
+
+    print(
+        f"{'mesh':<32}{'face vertices':>14}{'before ms':>12}{'after ms':>12}{'speedup':>10}"
+    )
+    total_before = total_after = 0.0
+    for mesh_index in mesh_indices:
+        face_vertex_count = len(dna.get_face_vertex_arrays(mesh_index).polygon_connects)
+        list_topology = get_list_topology(dna, mesh_index)
+        before = measure(prepare_mesh_with_loops, args.repeat, list_topology)
+        after = measure(prepare_mesh_with_arrays, args.repeat, dna, mesh_index)
+        total_before += before
+        total_after += after
+        print(
+            f"{dna.get_mesh_name(mesh_index):<32}{face_vertex_count:>14}"
+            f"{before * 1000:>12.2f}{after * 1000:>12.2f}{before / max(after, 1e-9):>9.1f}x"
+        )
+    print(
+        f"{'total':<32}{'':>14}{total_before * 1000:>12.2f}{total_after * 1000:>12.2f}"
+        f"{total_before / max(total_after, 1e-9):>9.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
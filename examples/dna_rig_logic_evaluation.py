@@ -0,0 +1,78 @@
+"""
+This example evaluates the behavior of a DNA for a batch of random GUI control poses without Maya, and reports how many
+frames per second are evaluated.
+- usage in command line:
+    python dna_rig_logic_evaluation.py <PATH TO DNA FILE> [--lod=<LOD>] [--frames=<N>]
+
+    Expected: the shapes of the outputs, the number of active outputs of the first pose and the evaluation speed.
+
+NOTE: If running on Linux, please make sure to append the LD_LIBRARY_PATH with absolute path to the lib/linux directory before running the example:
+    export LD_LIBRARY_PATH=$LD_LIBRARY_PATH:<path-to-lib-linux-dir>
+"""
+
+import argparse
+from os import path as ospath
+from sys import path as syspath
+from sys import platform
+from time import perf_counter
+
+import numpy as np
+
+# if you use Maya, use absolute path
+ROOT_DIR = f"{ospath.dirname(ospath.abspath(__file__))}/..".replace("\\", "/")
+ROOT_LIB_DIR = f"{ROOT_DIR}/lib"
+if platform == "win32":
+    LIB_DIR = f"{ROOT_LIB_DIR}/windows"
+elif platform == "linux":
+    LIB_DIR = f"{ROOT_LIB_DIR}/linux"
+else:
+    raise OSError(
+        "OS not supported, please compile dependencies and add value to LIB_DIR"
+    )
+
+# Adds directories to path
+syspath.insert(0, ROOT_DIR)
+syspath.insert(0, LIB_DIR)
+
+from dna_viewer import DataLayer, RigLogicEvaluator, load_dna
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RigLogic evaluation without Maya")
+    parser.add_argument("dna_path", help="Path of the DNA file")
+    parser.add_argument("--lod", type=int, default=0, help="The evaluated LOD")
+    parser.add_argument(
+        "--frames", type=int, default=10000, help="The number of evaluated poses"
+    )
+    args = parser.parse_args()
+
+    dna = load_dna(args.dna_path, layers=[DataLayer.definition, DataLayer.behavior])
+    evaluator = RigLogicEvaluator(dna)
+
+    start = perf_counter()
+    evaluator.get_lod(args.lod)
+    print(f"compiled LOD {args.lod} in {(perf_counter() - start) * 1000:.2f} ms")
+
+    gui_values = np.random.default_rng(0).uniform(
+        0.0, 1.0, (args.frames, evaluator.gui_control_count)
+    )
+    start = perf_counter()
+    outputs = evaluator.evaluate(gui_values=gui_values, lod=args.lod)
+    elapsed = perf_counter() - start
+
+    print(
+        f"joints: {outputs.joints.shape}, active: {np.count_nonzero(outputs.joints[0])}"
+    )
+    print(
+        f"blend shapes: {outputs.blend_shapes.shape}, active: {np.count_nonzero(outputs.blend_shapes[0])}"
+    )
+    print(
+        f"animated maps: {outputs.animated_maps.shape}, active: {np.count_nonzero(outputs.animated_maps[0])}"
+    )
+    print(
+        f"evaluated {args.frames} frames in {elapsed:.3f}s, {args.frames / elapsed:.0f} frames/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -41,7 +41,6 @@ NOTE: If running on Linux, please make sure to append the LD_LIBRARY_PATH with a
 
 import logging
 
-import maya.OpenMaya as om
 from maya import cmds
 
 from os import environ, makedirs
@@ -89,24 +88,16 @@ if ROOT_DIR not in syspath:
 if LIB_DIR not in syspath:
     syspath.insert(0, LIB_DIR)  
 
-from dna import DataLayer_All, FileStream, Status, BinaryStreamReader, BinaryStreamWriter
-from dnacalib import (
-    CommandSequence,
-    DNACalibDNAReader,
-    RenameJointCommand,
-    ScaleCommand,
-    SetBlendShapeTargetDeltasCommand,
-    SetVertexPositionsCommand,
-    VectorOperation_Add,
-    VectorOperation_Interpolate,
-    SetNeutralJointTranslationsCommand,
-    SetNeutralJointRotationsCommand
-)
-from dna_viewer import assemble_rig, load_dna
-
-
-def load_dna_reader(path):
-    stream = FileStream(path, FileStream.AccessMode_Read, FileStream.OpenMode_Binary)
+from dna import DataLayer_All, FileStream, MemoryMappedFileStream, Status, BinaryStreamReader, BinaryStreamWriter
+from dnacalib import DNACalibDNAReader
+from dna_viewer import SceneSync, assemble_rig, load_dna
+
+
+def load_dna_reader(path, memory_mapped=False):
+    if memory_mapped:
+        stream = MemoryMappedFileStream(path, MemoryMappedFileStream.AccessMode_Read)
+    else:
+        stream = FileStream(path, FileStream.AccessMode_Read, FileStream.OpenMode_Binary)
     reader = BinaryStreamReader(stream, DataLayer_All)
     reader.read()
     if not Status.isOk():
@@ -126,78 +117,6 @@ def save_dna(reader):
         raise RuntimeError(f"Error saving DNA: {status.message}")
 
 
-def get_mesh_vertex_positions_from_scene(meshName):
-    try:
-        sel = om.MSelectionList()
-        sel.add(meshName)
-
-        dag_path = om.MDagPath()
-        sel.getDagPath(0, dag_path)
-
-        mf_mesh = om.MFnMesh(dag_path)
-        positions = om.MPointArray()
-
-        mf_mesh.getPoints(positions, om.MSpace.kObject)
-        return [[positions[i].x, positions[i].y, positions[i].z] for i in range(positions.length())]
-    except RuntimeError:
-        print(f"{meshName} is missing, skipping it")
-        return None
-
-
-def run_joints_command(reader, calibrated):
-    # Making arrays for joints' transformations and their corresponding mapping arrays
-    joint_translations = []
-    joint_rotations = []
-
-    for i in range(reader.getJointCount()):
-        joint_name = reader.getJointName(i)
-
-        translation = cmds.xform(joint_name, query=True, translation=True)
-        joint_translations.append(translation)
-
-        rotation = cmds.joint(joint_name, query=True, orientation=True)
-        joint_rotations.append(rotation)
-
-    # this is step 5 sub-step a
-    set_new_joints_translations = SetNeutralJointTranslationsCommand(joint_translations)
-    # this is step 5 sub-step b
-    set_new_joints_rotations = SetNeutralJointRotationsCommand(joint_rotations)
-
-    # Abstraction to collect all commands into a sequence, and run them with only one invocation
-    commands = CommandSequence()
-    # Add vertex position deltas (NOT ABSOLUTE VALUES) onto existing vertex positions
-    commands.add(set_new_joints_translations)
-    commands.add(set_new_joints_rotations)
-
-    commands.run(calibrated)
-    # verify that everything went fine
-    if not Status.isOk():
-        status = Status.get()
-        raise RuntimeError(f"Error run_joints_command: {status.message}")
-
-
-def run_vertices_command(calibrated, old_vertices_positions, new_vertices_positions, mesh_index):
-    # making deltas between old vertices positions and new one
-    deltas = []
-    for new_vertex, old_vertex in zip(new_vertices_positions, old_vertices_positions):
-        delta = []
-        for new, old in zip(new_vertex, old_vertex):
-            delta.append(new - old)
-        deltas.append(delta)
-
-    # this is step 5 sub-step c
-    new_neutral_mesh = SetVertexPositionsCommand(mesh_index, deltas, VectorOperation_Add)
-    commands = CommandSequence()
-    # Add nex vertex position deltas (NOT ABSOLUTE VALUES) onto existing vertex positions
-    commands.add(new_neutral_mesh)
-    commands.run(calibrated)
-
-    # verify that everything went fine
-    if not Status.isOk():
-        status = Status.get()
-        raise RuntimeError(f"Error run_vertices_command: {status.message}")
-
-
 def assemble_maya_scene():
     dna = load_dna(f"{MODIFIED_CHARACTER_DNA}.dna")
     assemble_rig(dna=dna,
@@ -214,15 +133,11 @@ def assemble_maya_scene():
 makedirs(OUTPUT_DIR, exist_ok=True)
 
 dna = load_dna(CHARACTER_DNA)
+# only vertices and joints that moved by more than the tolerance are propagated
+scene_sync = SceneSync(dna, tolerance=1e-4)
 
 # this is step 3 sub-step a
-current_vertices_positions = {}
-mesh_indices = []
-for mesh_index, name in enumerate(dna.get_mesh_names()):
-    current_vertices_positions[name] = {
-        "mesh_index": mesh_index,
-        "positions": get_mesh_vertex_positions_from_scene(name)
-    }
+current_scene = scene_sync.snapshot()
 # loaded data - end of 3rd step
 ##################################
 
@@ -238,11 +153,10 @@ for mesh_index, name in enumerate(dna.get_mesh_names()):
 reader = load_dna_reader(CHARACTER_DNA)
 calibrated = DNACalibDNAReader(reader)
 
-run_joints_command(reader, calibrated)
+# this is step 5 sub-steps a, b and c, vertex deltas are taken against the snapshot from step 3,
+# joints are compared against the DNA
+changes = scene_sync.diff(scene_sync.snapshot(), baseline=current_scene)
+scene_sync.apply(calibrated, changes)
 
-for name, item in current_vertices_positions.items():
-    new_vertices_positions = get_mesh_vertex_positions_from_scene(name)
-    if new_vertices_positions:
-        run_vertices_command(calibrated, item["positions"], new_vertices_positions, item["mesh_index"])
 save_dna(calibrated)
 assemble_maya_scene()
@@ -0,0 +1,156 @@
+"""
+This example demonstrates running the same DNACalib commands over many DNA files in parallel.
+The commands are listed in a JSON (or, with PyYAML installed, YAML) file, see dnacalib_batch_commands.json.
+- usage in command line:
+    - call without arguments:
+        python dnacalib_batch.py
+        Expected: Script will run the commands from dnacalib_batch_commands.json on every DNA in data/dna and save the
+        results in OUTPUT_DIR/calibrated.
+    - call with arguments:
+        python dnacalib_batch.py --commands=<PATH TO COMMANDS FILE> --output_dir=<OUTPUT DIRECTORY> [--workers=<N>] <DNA FILES OR DIRECTORIES>
+        Expected: script will save calibrated DNA files with the same names in <OUTPUT DIRECTORY>.
+        A second run skips the files completed by the first one, use --no_resume to calibrate all files again.
+- usage in Maya:
+    1. copy whole content of this file to Maya Script Editor
+    2. delete "if __name__ == "__main__":
+            main()"
+    3. delete whole "def main" method
+    4. change value of ROOT_DIR to absolute path of dna_calibration, e.g. `c:/dna_calibration` in Windows or `/home/user/dna_calibration`. Important:
+    Use `/` (forward slash), because Maya uses forward slashes in path.
+    5. call method calibrate_all([<DNA FILES OR DIRECTORIES>], <PATH TO COMMANDS FILE>, <OUTPUT DIRECTORY>, use_processes=False)
+
+NOTE: If running on Linux, please make sure to append the LD_LIBRARY_PATH with absolute path to the lib/linux directory before running the example:
+    export LD_LIBRARY_PATH=$LD_LIBRARY_PATH:<path-to-lib-linux-dir>
+"""
+
+import argparse
+import logging
+from os import environ
+from os import path as ospath
+from sys import path as syspath
+from sys import platform
+
+# if you use Maya, use absolute path
+ROOT_DIR = f"{ospath.dirname(ospath.abspath(__file__))}/..".replace("\\", "/")
+OUTPUT_DIR = f"{ROOT_DIR}/output"
+ROOT_LIB_DIR = f"{ROOT_DIR}/lib"
+if platform == "win32":
+    LIB_DIR = f"{ROOT_LIB_DIR}/windows"
+elif platform == "linux":
+    LIB_DIR = f"{ROOT_LIB_DIR}/linux"
+else:
+    raise OSError(
+        "OS not supported, please compile dependencies and add value to LIB_DIR"
+    )
+
+# Add bin directory to maya plugin path
+if "MAYA_PLUG_IN_PATH" in environ:
+    separator = ":" if platform == "linux" else ";"
+    environ["MAYA_PLUG_IN_PATH"] = separator.join(
+        [environ["MAYA_PLUG_IN_PATH"], LIB_DIR]
+    )
+else:
+    environ["MAYA_PLUG_IN_PATH"] = LIB_DIR
+
+# Adds directories to path
+syspath.insert(0, ROOT_DIR)
+syspath.insert(0, LIB_DIR)
+
+from dna_viewer import BatchCalibration, Catalog, load_command_specs
+
+
+def print_progress(done, total, path, error):
+    if error is None:
+        print(f"[{done}/{total}] {path}")
+    else:
+        print(f"[{done}/{total}] {path} failed: {error}")
+
+
+def calibrate_all(
+    inputs,
+    commands_path,
+    output_dir,
+    workers=0,
+    use_processes=True,
+    resume=True,
+    memory_mapped=False,
+):
+    # Directories are searched for DNA files, files are used as given
+    paths = [path for path in inputs if ospath.isfile(path)]
+    paths.extend(
+        Catalog.find_dna_files([path for path in inputs if ospath.isdir(path)])
+    )
+
+    batch = BatchCalibration(load_command_specs(commands_path), output_dir)
+    result = batch.run(
+        paths,
+        workers=workers,
+        use_processes=use_processes,
+        memory_mapped=memory_mapped,
+        resume=resume,
+        progress=print_progress,
+    )
+
+    print(f"Completed: {len(result.completed)}")
+    print(f"Skipped (already completed): {len(result.skipped)}")
+    print(f"Failed: {len(result.failed)}")
+    for path, error in result.failed.items():
+        print(f"\t{path}: {error}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DNACalib batch runner")
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        help="DNA files or directories containing DNA files",
+        default=[f"{ROOT_DIR}/data/dna"],
+    )
+    parser.add_argument(
+        "--commands",
+        metavar="commands",
+        help="Path to JSON or YAML file with the commands",
+        default=f"{ROOT_DIR}/examples/dnacalib_batch_commands.json",
+    )
+    parser.add_argument(
+        "--output_dir",
+        metavar="output_dir",
+        help="Directory where to save the calibrated DNA files",
+        default=f"{OUTPUT_DIR}/calibrated",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0, help="Number of workers, all CPU cores if 0"
+    )
+    parser.add_argument(
+        "--threads", action="store_true", help="Use threads instead of processes"
+    )
+    parser.add_argument(
+        "--no_resume",
+        action="store_true",
+        help="Calibrate files completed by an earlier run again",
+    )
+    parser.add_argument(
+        "--memory_mapped",
+        action="store_true",
+        help="Memory map the input DNA files instead of reading them through a file stream",
+    )
+
+    logging.basicConfig(level=logging.INFO)
+    args = parser.parse_args()
+
+    result = calibrate_all(
+        args.inputs,
+        args.commands,
+        args.output_dir,
+        args.workers,
+        not args.threads,
+        not args.no_resume,
+        args.memory_mapped,
+    )
+    if result.failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,7 +19,7 @@ This example demonstrates a few DNACalib's commands.
     3. delete whole "def main" method
     4. change value of ROOT_DIR to absolute path of dna_calibration, e.g. `c:/dna_calibration` in Windows or `/home/user/dna_calibration`. Important:
     Use `/` (forward slash), because Maya uses forward slashes in path.
-    5. call method calibrate_dna(<PATH TO INPUT FILE>, <PATH TO NEW FILE>)
+    5. call method calibrate_dna(<PATH TO INPUT FILE>, <PATH TO NEW FILE>), optionally with memory_mapped=True to memory map the input DNA
 
     Expected: script will generate <PATH TO NEW FILE>.
     NOTE: The directory referenced by the given path must exist. If the directory does not exist, the script is going to fail.
@@ -59,7 +59,7 @@ else:
 syspath.insert(0, ROOT_DIR)
 syspath.insert(0, LIB_DIR)
 
-from dna import DataLayer_All, FileStream, Status, BinaryStreamReader, BinaryStreamWriter
+from dna import DataLayer_All, FileStream, MemoryMappedFileStream, Status, BinaryStreamReader, BinaryStreamWriter
 from dnacalib import (
     CommandSequence,
     DNACalibDNAReader,
@@ -72,8 +72,11 @@ from dnacalib import (
 )
 
 
-def load_dna(path):
-    stream = FileStream(path, FileStream.AccessMode_Read, FileStream.OpenMode_Binary)
+def load_dna(path, memory_mapped=False):
+    if memory_mapped:
+        stream = MemoryMappedFileStream(path, MemoryMappedFileStream.AccessMode_Read)
+    else:
+        stream = FileStream(path, FileStream.AccessMode_Read, FileStream.OpenMode_Binary)
     reader = BinaryStreamReader(stream, DataLayer_All)
     reader.read()
     if not Status.isOk():
@@ -156,8 +159,8 @@ def build_command_list():
     return commands
 
 
-def calibrate_dna(input_path, output_path):
-    dna = load_dna(input_path)
+def calibrate_dna(input_path, output_path, memory_mapped=False):
+    dna = load_dna(input_path, memory_mapped)
 
     # Copies DNA contents and will serve as input/output parameter to commands
     calibrated = DNACalibDNAReader(dna)
@@ -184,11 +187,16 @@ def main():
         help="Path where to save modified DNA file",
         default=f"{OUTPUT_DIR}/Ada_new.dna"
     )
+    parser.add_argument(
+        "--memory_mapped",
+        action="store_true",
+        help="Memory map the input DNA file instead of reading it through a file stream",
+    )
 
     makedirs(OUTPUT_DIR, exist_ok=True)
     args = parser.parse_args()
 
-    calibrate_dna(args.input_dna, args.output_dna)
+    calibrate_dna(args.input_dna, args.output_dna, args.memory_mapped)
 
 
 if __name__ == "__main__":
@@ -89,9 +89,12 @@ def run_SetLODsCommand(reader):
     save_dna(calibrated, DNA_NEW)
     print("Done.")
     
-def load_dna_calib(dna_path: str):
-    # Load the DNA
-    stream = dna.FileStream(dna_path, dna.FileStream.AccessMode_Read, dna.FileStream.OpenMode_Binary)
+def load_dna_calib(dna_path: str, memory_mapped: bool = False):
+    # Load the DNA, memory mapped files are paged in on demand instead of copied
+    if memory_mapped:
+        stream = dna.MemoryMappedFileStream(dna_path, dna.MemoryMappedFileStream.AccessMode_Read)
+    else:
+        stream = dna.FileStream(dna_path, dna.FileStream.AccessMode_Read, dna.FileStream.OpenMode_Binary)
     reader = dna.BinaryStreamReader(stream, dna.DataLayer_All)
     reader.read()
     return reader
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation
+
+pytest.importorskip("maya.api.OpenMaya")
+pytest.importorskip("dnacalib")
+
+from dna_viewer.const.space import DEFAULT_MESH_ROTATION, FIXED_JOINT_NAME
+from dna_viewer.model.definition import Definition
+from dna_viewer.model.dna import DNA
+from dna_viewer.model.geometry import Geometry, Mesh, Point3, Topology
+from dna_viewer.util.scene_sync import SceneSnapshot, SceneSync
+
+LINEAR_MODIFIER = 2.0
+JOINT_NAMES = ["root", FIXED_JOINT_NAME, "neck_01"]
+JOINT_TRANSLATIONS = [(0.0, 0.0, 0.0), (1.5, 2.0, -3.0), (0.5, -1.0, 4.0)]
+# the middle angle is outside [-90, 90], so the euler angles of the turned joint are written differently in the scene
+JOINT_ROTATIONS = [(0.0, 0.0, 0.0), (10.0, 170.0, -30.0), (5.0, -20.0, 45.0)]
+
+
+def create_dna() -> DNA:
+    dna = DNA("scene_sync.dna")
+    dna.definition = Definition()
+    dna.definition.joints.names = list(JOINT_NAMES)
+    dna.definition.meshes.names = ["head_lod0_mesh"]
+    dna.definition.neutral_joint_translations = [
+        Point3(x=x, y=y, z=z) for x, y, z in JOINT_TRANSLATIONS
+    ]
+    dna.definition.neutral_joint_rotations = [
+        Point3(x=x, y=y, z=z) for x, y, z in JOINT_ROTATIONS
+    ]
+    mesh = Mesh()
+    mesh.topology = Topology(
+        position_array=np.arange(30, dtype=np.float32).reshape(10, 3)
+    )
+    dna.geometry = Geometry()
+    dna.geometry.meshes = {0: mesh}
+    return dna
+
+
+def create_built_scene(dna: DNA) -> SceneSnapshot:
+    """The scene as the builder leaves it, with Character.fix_joint_position replayed on Maya's row vector matrices"""
+
+    positions = np.asarray(dna.get_vertex_position_array_for_mesh_index(0), dtype=np.float64)
+    translations = LINEAR_MODIFIER * np.array(JOINT_TRANSLATIONS)
+    rotations = np.array(JOINT_ROTATIONS)
+
+    joint_index = JOINT_NAMES.index(FIXED_JOINT_NAME)
+    x, y, z = translations[joint_index]
+    translations[joint_index] = (x, -z, y)
+    joint_orient = Rotation.from_euler("xyz", rotations[joint_index], degrees=True)
+    rotate = Rotation.from_euler("xyz", (0.0, 0.0, -90.0), degrees=True)
+    # makeIdentity freezes rotate * jointOrient into the joint orient
+    frozen = rotate.as_matrix().T @ joint_orient.as_matrix().T
+    rotations[joint_index] = Rotation.from_matrix(frozen.T).as_euler("xyz", degrees=True)
+
+    return SceneSnapshot(
+        mesh_positions={
+            0: Rotation.from_euler("xyz", DEFAULT_MESH_ROTATION, degrees=True).apply(
+                LINEAR_MODIFIER * positions
+            )
+        },
+        joint_translations=translations,
+        joint_rotations=rotations,
+    )
+
+
+def test_unmodified_scene_has_no_changes():
+    dna = create_dna()
+    scene_sync = SceneSync(dna, linear_modifier=LINEAR_MODIFIER, angle_modifier=1.0)
+    snapshot = create_built_scene(dna)
+
+    assert scene_sync.diff(snapshot).is_empty()
+    assert scene_sync.diff(snapshot, baseline=snapshot).is_empty()
+
+
+def test_moved_fixed_joint_is_written_back_in_dna_space():
+    dna = create_dna()
+    scene_sync = SceneSync(dna, linear_modifier=LINEAR_MODIFIER, angle_modifier=1.0)
+    baseline = create_built_scene(dna)
+    snapshot = create_built_scene(dna)
+    joint_index = JOINT_NAMES.index(FIXED_JOINT_NAME)
+    snapshot.joint_translations[joint_index, 1] += LINEAR_MODIFIER
+
+    for changes in (scene_sync.diff(snapshot), scene_sync.diff(snapshot, baseline)):
+        assert not changes.meshes
+        assert changes.joint_indices.tolist() == [joint_index]
+        expected = np.array(JOINT_TRANSLATIONS)
+        expected[joint_index, 2] -= 1.0
+        np.testing.assert_allclose(changes.joint_translations, expected, atol=1e-9)
+        assert (
+            SceneSync.get_angle_differences(
+                changes.joint_rotations, np.array(JOINT_ROTATIONS)
+            ).max()
+            < 1e-6
+        )